@@ -5,25 +5,124 @@ from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_swagger_ui import get_swaggerui_blueprint
 from dotenv import load_dotenv
+from app.utils.db_routing import RoutingSession
 
 load_dotenv()
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 jwt = JWTManager()
 
 def create_app(config_class=None):
+    from app.utils.response_cache import create_response_cache, parse_route_ttls
+    from app.utils.db_pool import build_engine_options, configure_engine
+    from app.utils.db_routing import build_replica_binds, init_replicas
+    from app.utils.json_provider import json_provider_class
+    
     app = Flask(__name__)
     
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'default-secret-key')
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI', 'sqlite:///restaurant_reviews.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Параметры пула соединений и таймаутов из переменных окружения DB_*
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    # Реплики для чтения (URI через запятую), используются обработчиками с декоратором use_replica
+    app.config['SQLALCHEMY_BINDS'] = build_replica_binds(os.getenv('DATABASE_REPLICA_URIS'), build_engine_options)
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'default-jwt-secret-key')
+    # Готовый файл спецификации API (flask swagger build), по умолчанию спецификация собирается в памяти
+    app.config['SWAGGER_SPEC_PATH'] = os.getenv('SWAGGER_SPEC_PATH')
+    app.config['PAGINATION_DEFAULT_LIMIT'] = int(os.getenv('PAGINATION_DEFAULT_LIMIT', 50))
+    app.config['PAGINATION_MAX_LIMIT'] = int(os.getenv('PAGINATION_MAX_LIMIT', 100))
+    # Алгоритм и стоимость хэширования паролей в формате werkzeug (например, scrypt:32768:8:1 или pbkdf2:sha256:600000)
+    app.config['PASSWORD_HASH_METHOD'] = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+    # Размер пула потоков для хэширования (0 - в потоке запроса) и время ожидания результата в секундах
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', 4))
+    app.config['PASSWORD_HASH_TIMEOUT'] = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+    # Ограничения пакетной загрузки отзывов
+    app.config['REVIEWS_BULK_MAX_ITEMS'] = int(os.getenv('REVIEWS_BULK_MAX_ITEMS', 10000))
+    app.config['REVIEWS_BULK_CHUNK_SIZE'] = int(os.getenv('REVIEWS_BULK_CHUNK_SIZE', 500))
+    # Кэш ролей и версий токенов пользователей между запросами (0 - кэш отключен)
+    # Кэш у каждого процесса свой: в остальных процессах отзыв токенов срабатывает с задержкой до USER_CACHE_TTL секунд
+    app.config['USER_CACHE_TTL'] = int(os.getenv('USER_CACHE_TTL', 30))
+    app.config['USER_CACHE_SIZE'] = int(os.getenv('USER_CACHE_SIZE', 10000))
+    # Кэш ответов публичных эндпоинтов: локальный LRU и, опционально, общий SQLite файл
+    # Без RESPONSE_CACHE_SHARED_PATH инвалидация после записи действует только в обработавшем ее процессе,
+    # остальные воркеры отдают прежние ответы до истечения TTL
+    app.config['RESPONSE_CACHE_ENABLED'] = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    app.config['RESPONSE_CACHE_SIZE'] = int(os.getenv('RESPONSE_CACHE_SIZE', 1024))
+    app.config['RESPONSE_CACHE_DEFAULT_TTL'] = int(os.getenv('RESPONSE_CACHE_DEFAULT_TTL', 60))
+    app.config['RESPONSE_CACHE_SHARED_PATH'] = os.getenv('RESPONSE_CACHE_SHARED_PATH')
+    app.config['RESPONSE_CACHE_ROUTE_TTLS'] = parse_route_ttls(os.getenv('RESPONSE_CACHE_ROUTE_TTLS'))
+    # Сериализация JSON: auto (orjson или msgspec, если установлены), orjson, msgspec или stdlib
+    app.config['JSON_PROVIDER'] = os.getenv('JSON_PROVIDER', 'auto')
+    # Метрики запросов на /metrics, заголовок Server-Timing и порог числа SQL запросов для предупреждения (0 - без проверки)
+    app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    # Токен для сборщика метрик (Authorization: Bearer), без него /metrics доступен только администраторам
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+    app.config['SERVER_TIMING_ENABLED'] = os.getenv('SERVER_TIMING_ENABLED', 'false').lower() == 'true'
+    app.config['METRICS_QUERY_WARN_THRESHOLD'] = int(os.getenv('METRICS_QUERY_WARN_THRESHOLD', 20))
+    # Фоновое формирование отчетов: размер пула, каталог готовых файлов, время, после которого задание считается упавшим,
+    # и срок хранения завершенных заданий с файлами в секундах (0 - хранятся всегда)
+    app.config['REPORT_JOB_WORKERS'] = int(os.getenv('REPORT_JOB_WORKERS', 2))
+    app.config['REPORT_JOB_DIR'] = os.getenv('REPORT_JOB_DIR')
+    app.config['REPORT_JOB_TIMEOUT'] = int(os.getenv('REPORT_JOB_TIMEOUT', 3600))
+    app.config['REPORT_JOB_RETENTION'] = int(os.getenv('REPORT_JOB_RETENTION', 86400))
+    # Снимки отчетов по версиям данных: каталог и количество хранимых версий каждого отчета
+    app.config['REPORT_SNAPSHOTS_ENABLED'] = os.getenv('REPORT_SNAPSHOTS_ENABLED', 'true').lower() == 'true'
+    app.config['REPORT_SNAPSHOT_DIR'] = os.getenv('REPORT_SNAPSHOT_DIR')
+    app.config['REPORT_SNAPSHOT_KEEP'] = int(os.getenv('REPORT_SNAPSHOT_KEEP', 3))
+    
+    app.json = json_provider_class(app.config['JSON_PROVIDER'])(app)
     
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     
+    # Настройки соединений (WAL, busy_timeout и synchronous=NORMAL для SQLite)
+    with app.app_context():
+        for engine in db.engines.values():
+            configure_engine(engine)
+        
+        # Время обработки, число SQL запросов и размер ответов по эндпоинтам
+        if app.config['METRICS_ENABLED']:
+            from app.utils.metrics import init_metrics
+            init_metrics(app, db.engines.values())
+    init_replicas(app)
+    
+    # Хэширование паролей в ограниченном пуле потоков
+    from app.utils.passwords import PasswordHasher, PasswordHasherBusy, handle_password_hasher_busy
+    app.extensions['password_hasher'] = PasswordHasher(
+        app.config['PASSWORD_HASH_METHOD'],
+        app.config['PASSWORD_HASH_WORKERS'],
+        app.config['PASSWORD_HASH_TIMEOUT']
+    )
+    app.register_error_handler(PasswordHasherBusy, handle_password_hasher_busy)
+    
+    # Кэш данных пользователей для проверки прав
+    from app.utils.cache import TTLCache
+    if app.config['USER_CACHE_TTL'] > 0:
+        app.extensions['user_cache'] = TTLCache(app.config['USER_CACHE_SIZE'], app.config['USER_CACHE_TTL'])
+    
+    # Кэш ответов публичных эндпоинтов
+    app.extensions['response_cache'] = create_response_cache(app.config)
+    
+    # Очередь фонового формирования отчетов
+    from app.services.report_jobs import ReportJobQueue
+    app.extensions['report_jobs'] = ReportJobQueue(
+        app,
+        app.config['REPORT_JOB_WORKERS'],
+        app.config['REPORT_JOB_DIR'],
+        app.config['REPORT_JOB_TIMEOUT'],
+        app.config['REPORT_JOB_RETENTION']
+    )
+    
+    # Снимки отчетов, действительные до следующего изменения ресторанов или отзывов
+    from app.services.report_snapshots import ReportSnapshotStore
+    app.extensions['report_snapshots'] = ReportSnapshotStore(
+        app.config['REPORT_SNAPSHOT_DIR'] or os.path.join(app.instance_path, 'report_snapshots'),
+        app.config['REPORT_SNAPSHOT_KEEP']
+    ) if app.config['REPORT_SNAPSHOTS_ENABLED'] else None
+    
     # Регистрация Swagger UI
     SWAGGER_URL = '/api/docs'
     API_URL = '/static/swagger.json'
@@ -41,16 +140,27 @@ def create_app(config_class=None):
     from app.api.users import users_bp
     from app.api.restaurants import restaurants_bp
     from app.api.reviews import reviews_bp
+    from app.api.admin import admin_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/v1/auth')
     app.register_blueprint(users_bp, url_prefix='/api/v1/users')
     app.register_blueprint(restaurants_bp, url_prefix='/api/v1/restaurants')
     app.register_blueprint(reviews_bp, url_prefix='/api/v1/reviews')
+    app.register_blueprint(admin_bp, url_prefix='/api/v1/admin')
     
-    os.makedirs(os.path.join(app.root_path, 'static'), exist_ok=True)
+    # Инкрементальное обновление агрегатов оценок, версия данных, полнотекстовые индексы и CLI команды
+    from app.services.rating_stats import register_rating_stats_listeners
+    from app.services.data_version import register_data_version_listeners
+    from app.services.search import register_search_listeners
+    from app.commands import register_commands
     
-    from app.utils.swagger import generate_swagger_spec
-    with app.app_context():
-        generate_swagger_spec(app)
+    register_rating_stats_listeners()
+    register_data_version_listeners()
+    register_search_listeners()
+    register_commands(app)
+    
+    # Спецификация API собирается при первом запросе и хранится в памяти
+    from app.utils.swagger import swagger_spec_view
+    app.add_url_rule(API_URL, 'swagger_spec', swagger_spec_view)
     
     return app
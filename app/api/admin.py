@@ -0,0 +1,41 @@
+from flask import Blueprint, jsonify, current_app
+from app import db
+from app.utils.auth import admin_required
+from app.utils.db_pool import pool_status
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.route('/cache', methods=['GET'])
+@admin_required()
+def get_cache_stats():
+    """
+    Счетчики кэша ответов текущего процесса (только для администраторов)
+    """
+    cache = current_app.extensions.get('response_cache')
+    if cache is None:
+        return jsonify({'enabled': False}), 200
+    
+    return jsonify({'enabled': True, **cache.stats()}), 200
+
+@admin_bp.route('/cache', methods=['DELETE'])
+@admin_required()
+def clear_cache():
+    """
+    Очистка кэша ответов (только для администраторов)
+    """
+    cache = current_app.extensions.get('response_cache')
+    if cache is not None:
+        cache.clear()
+    
+    return '', 204
+
+@admin_bp.route('/db-pool', methods=['GET'])
+@admin_required()
+def get_db_pool_status():
+    """
+    Состояние пулов соединений с БД текущего процесса (только для администраторов)
+    """
+    return jsonify({
+        bind or 'default': pool_status(engine)
+        for bind, engine in db.engines.items()
+    }), 200
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token
 from app import db
 from app.models import User, UserRole
+from app.utils.auth import create_user_token
 from email_validator import validate_email, EmailNotValidError
 
 auth_bp = Blueprint('auth', __name__)
@@ -54,7 +54,12 @@ def login():
     if not user or not user.check_password(data['password']):
         return jsonify({'message': 'Неверное имя пользователя или пароль'}), 401
     
-    access_token = create_access_token(identity=str(user.id))
+    # Пароль захэширован с устаревшими параметрами - пересчитываем хэш
+    if user.password_needs_rehash():
+        user.set_password(data['password'])
+        db.session.commit()
+    
+    access_token = create_user_token(user)
     
     return jsonify({
         'access_token': access_token,
@@ -1,30 +1,189 @@
-from flask import Blueprint, request, jsonify, Response
+import io
+import json
+from flask import Blueprint, current_app, request, jsonify, Response, send_file, stream_with_context, url_for
 from flask_jwt_extended import jwt_required
+from sqlalchemy import func
+from sqlalchemy.orm import contains_eager, joinedload, load_only
 from app import db
-from app.models import Restaurant
-from app.utils.auth import admin_required
-from app.utils.report_generator import generate_restaurants_report
+from app.models import Restaurant, RestaurantRatingStats, ReportJob, ReportJobStatus, Review, User
+from app.utils.auth import admin_required, get_current_identity
+from app.utils.db_routing import use_replica
+from app.utils.report_generator import ReportParamsError, report_period_params
+from app.utils.pagination import (
+    PaginationError, get_limit_arg, get_pagination_args, get_sort_arg, paginate_query, paginated_response
+)
+from app.utils.http_cache import make_etag, not_modified_response, set_validators
+from app.utils.response_cache import cached_response, invalidate_response_cache
+from app.services.search import SearchError, decode_search_cursor, search_restaurants
+from app.services.report_jobs import ReportJobError
+from app.services.report_export import ReportFormatError, check_report_format, generate_report, report_file_info
+from app.services.data_version import get_data_version
+from app.services.restaurant_sync import (
+    SYNC_FORMATS, RestaurantSyncError, iter_restaurant_records, import_restaurants, export_restaurants
+)
 
 restaurants_bp = Blueprint('restaurants', __name__)
 
+# Поля сортировки рейтинга ресторанов
+TOP_RATING_FIELDS = {
+    'food': RestaurantRatingStats.avg_food_rating,
+    'drinks': RestaurantRatingStats.avg_drinks_rating,
+    'overall': RestaurantRatingStats.avg_overall_rating
+}
+TOP_DEFAULT_LIMIT = 10
+
 @restaurants_bp.route('', methods=['GET'])
+@cached_response('restaurants', ttl=30)
+@use_replica
 def get_restaurants():
     """
-    Получение списка всех ресторанов (доступно всем)
+    Получение списка ресторанов постранично (доступно всем)
+    """
+    try:
+        limit, position = get_pagination_args()
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    # Версия каталога: время последнего изменения ресторанов и их оценок и количество ресторанов
+    restaurants_updated_at, restaurants_count, ratings_updated_at = db.session.query(
+        func.max(Restaurant.updated_at),
+        func.count(Restaurant.id),
+        func.max(RestaurantRatingStats.updated_at)
+    ).outerjoin(RestaurantRatingStats).one()
+    
+    last_modified = max(filter(None, [restaurants_updated_at, ratings_updated_at]), default=None)
+    etag = make_etag(restaurants_updated_at, restaurants_count, ratings_updated_at)
+    
+    not_modified = not_modified_response(etag, last_modified)
+    if not_modified:
+        return not_modified
+    
+    # Список только читается, поэтому выбираются колонки без построения ORM объектов
+    restaurants, next_cursor = paginate_query(Restaurant.list_query(), Restaurant, limit, position)
+    
+    response = jsonify(paginated_response(restaurants, next_cursor, Restaurant.row_to_dict))
+    return set_validators(response, etag, last_modified), 200
+
+@restaurants_bp.route('/top', methods=['GET'])
+@cached_response('restaurants', ttl=30)
+@use_replica
+def get_top_restaurants():
+    """
+    Лучшие рестораны по средней оценке (доступно всем)
+    Параметры: by=food|drinks|overall, min_reviews - минимальное число отзывов, limit
+    Выборка идет по индексу на сохраненных средних оценках и не зависит от размера каталога
     """
-    restaurants = Restaurant.query.all()
-    return jsonify([restaurant.to_dict() for restaurant in restaurants]), 200
+    by = request.args.get('by', 'overall')
+    if by not in TOP_RATING_FIELDS:
+        return jsonify({'message': f"Параметр by должен быть одним из: {', '.join(TOP_RATING_FIELDS)}"}), 400
+    
+    max_limit = current_app.config['PAGINATION_MAX_LIMIT']
+    try:
+        limit = int(request.args.get('limit', TOP_DEFAULT_LIMIT))
+        min_reviews = int(request.args.get('min_reviews', 1))
+    except ValueError:
+        return jsonify({'message': 'Параметры limit и min_reviews должны быть целыми числами'}), 400
+    if limit < 1 or limit > max_limit:
+        return jsonify({'message': f'Параметр limit должен быть от 1 до {max_limit}'}), 400
+    if min_reviews < 1:
+        return jsonify({'message': 'Параметр min_reviews должен быть не меньше 1'}), 400
+    
+    average = TOP_RATING_FIELDS[by]
+    restaurants = (
+        Restaurant.query
+        .join(Restaurant.rating_stats)
+        .options(contains_eager(Restaurant.rating_stats))
+        .filter(RestaurantRatingStats.reviews_count >= min_reviews)
+        .order_by(average.desc(), RestaurantRatingStats.reviews_count.desc(), Restaurant.id)
+        .limit(limit)
+        .all()
+    )
+    
+    return jsonify({
+        'by': by,
+        'min_reviews': min_reviews,
+        'items': [restaurant.to_dict() for restaurant in restaurants]
+    }), 200
+
+@restaurants_bp.route('/search', methods=['GET'])
+@cached_response('restaurants', ttl=30)
+@use_replica
+def search_restaurants_view():
+    """
+    Полнотекстовый поиск ресторанов по названию и описанию (доступно всем)
+    Результаты упорядочены по релевантности и отдаются постранично
+    """
+    try:
+        limit = get_limit_arg()
+        offset = decode_search_cursor(request.args.get('cursor'))
+        restaurants, next_cursor = search_restaurants(request.args.get('q'), limit, offset)
+    except (PaginationError, SearchError) as e:
+        return jsonify({'message': str(e)}), 400
+    
+    return jsonify(paginated_response(restaurants, next_cursor)), 200
 
 @restaurants_bp.route('/<int:restaurant_id>', methods=['GET'])
+@cached_response('restaurants', ttl=60)
+@use_replica
 def get_restaurant(restaurant_id):
     """
     Получение данных ресторана (доступно всем)
     """
+    # Проверяем актуальность данных у клиента до загрузки и сериализации ресторана
+    version = db.session.query(
+        Restaurant.updated_at,
+        RestaurantRatingStats.updated_at
+    ).outerjoin(RestaurantRatingStats).filter(Restaurant.id == restaurant_id).first()
+    if not version:
+        return jsonify({'message': 'Ресторан не найден'}), 404
+    
+    restaurant_updated_at, ratings_updated_at = version
+    last_modified = max(filter(None, [restaurant_updated_at, ratings_updated_at]), default=None)
+    etag = make_etag(restaurant_id, restaurant_updated_at, ratings_updated_at)
+    
+    not_modified = not_modified_response(etag, last_modified)
+    if not_modified:
+        return not_modified
+    
     restaurant = Restaurant.query.get(restaurant_id)
     if not restaurant:
         return jsonify({'message': 'Ресторан не найден'}), 404
     
-    return jsonify(restaurant.to_dict()), 200
+    response = jsonify(restaurant.to_dict())
+    return set_validators(response, etag, last_modified), 200
+
+@restaurants_bp.route('/<int:restaurant_id>/reviews', methods=['GET'])
+@use_replica
+@admin_required()
+def get_restaurant_reviews(restaurant_id):
+    """
+    Отзывы ресторана постранично с именами авторов (только для администраторов)
+    Авторы загружаются тем же запросом, что и отзывы (joinedload); с include_ratings=true
+    в ответ добавляются средние оценки ресторана. Доступ как у списка отзывов: отзывы
+    видны только их авторам и администраторам
+    """
+    try:
+        limit, position = get_pagination_args()
+        descending = get_sort_arg()
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    restaurant = Restaurant.query.get(restaurant_id)
+    if not restaurant:
+        return jsonify({'message': 'Ресторан не найден'}), 404
+    
+    query = Review.query.options(joinedload(Review.user).load_only(User.username)).filter(
+        Review.restaurant_id == restaurant_id
+    )
+    reviews, next_cursor = paginate_query(query, Review, limit, position, descending)
+    
+    result = paginated_response(
+        reviews, next_cursor, lambda review: {**review.to_dict(), 'username': review.user.username}
+    )
+    if request.args.get('include_ratings', 'false').lower() in ('1', 'true', 'yes'):
+        result['ratings'] = restaurant.ratings_dict()
+    
+    return jsonify(result), 200
 
 @restaurants_bp.route('', methods=['POST'])
 @admin_required()
@@ -38,15 +197,21 @@ def create_restaurant():
     if 'name' not in data:
         return jsonify({'message': 'Отсутствует обязательное поле "name"'}), 400
     
+    # Проверка уникальности внешнего идентификатора
+    if data.get('external_id') and Restaurant.query.filter_by(external_id=data['external_id']).first():
+        return jsonify({'message': 'Ресторан с таким external_id уже существует'}), 400
+    
     # Создание нового ресторана
     restaurant = Restaurant(
         name=data['name'],
         address=data.get('address'),
-        description=data.get('description')
+        description=data.get('description'),
+        external_id=data.get('external_id')
     )
     
     db.session.add(restaurant)
     db.session.commit()
+    invalidate_response_cache('restaurants')
     
     return jsonify(restaurant.to_dict()), 201
 
@@ -75,6 +240,7 @@ def update_restaurant(restaurant_id):
         restaurant.description = data['description']
     
     db.session.commit()
+    invalidate_response_cache('restaurants')
     
     return jsonify(restaurant.to_dict()), 200
 
@@ -90,19 +256,150 @@ def delete_restaurant(restaurant_id):
     
     db.session.delete(restaurant)
     db.session.commit()
+    invalidate_response_cache('restaurants')
     
     return '', 204
 
 @restaurants_bp.route('/report', methods=['GET'])
+@use_replica
 @admin_required()
 def get_restaurants_report():
     """
     Выгрузка сводного отчета по всем ресторанам (только для администраторов)
+    Пока рестораны и отзывы не менялись, отчет отдается из сохраненного снимка
+    """
+    try:
+        fmt = check_report_format(request.args.get('format', 'csv'))
+        params = report_period_params(request.args)
+    except (ReportFormatError, ReportParamsError) as e:
+        return jsonify({'message': str(e)}), 400
+    
+    mimetype, filename = report_file_info('restaurants', fmt)
+    snapshots = current_app.extensions['report_snapshots']
+    if snapshots is None:
+        # Отчет формируется и отправляется клиенту по частям
+        response = Response(stream_with_context(generate_report('restaurants', fmt, **params)), mimetype=mimetype)
+        response.headers.set('Content-Disposition', 'attachment', filename=filename)
+        return response
+    
+    version = get_data_version()
+    etag = make_etag('restaurants_report', version, fmt, params.get('date_from'), params.get('date_to'))
+    not_modified = not_modified_response(etag)
+    if not_modified is not None:
+        return not_modified
+    
+    name = f"restaurants_{fmt}_{params.get('date_from', '')}_{params.get('date_to', '')}"
+    path = snapshots.find(name, version)
+    if path is None:
+        # Первая выгрузка для этой версии данных формирует отчет и попутно сохраняет снимок
+        stream = stream_with_context(snapshots.write_through(name, version, generate_report('restaurants', fmt, **params)))
+        response = Response(stream, mimetype=mimetype)
+    elif request.accept_encodings['gzip']:
+        response = send_file(path, mimetype=mimetype, etag=False, conditional=False)
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(snapshots.read(path), mimetype=mimetype)
+    
+    response.headers.set('Content-Disposition', 'attachment', filename=filename)
+    response.vary.add('Accept-Encoding')
+    return set_validators(response, etag)
+
+def report_job_response(job, status_code=200):
+    data = job.to_dict()
+    data['status_url'] = url_for('restaurants.get_report_job', job_id=job.id)
+    if job.status == ReportJobStatus.DONE:
+        data['download_url'] = url_for('restaurants.download_report_job', job_id=job.id)
+    return jsonify(data), status_code
+
+@restaurants_bp.route('/report/jobs', methods=['POST'])
+@admin_required()
+def create_report_job():
+    """
+    Постановка формирования отчета в фоновую очередь (только для администраторов)
+    Если такой же отчет уже формируется, возвращается существующее задание
+    """
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        return jsonify({'message': 'Ожидается JSON объект с параметрами отчета'}), 400
+    
+    try:
+        params = {**report_period_params(data), 'format': check_report_format(data.get('format', 'csv'))}
+        job, created = current_app.extensions['report_jobs'].submit(
+            data.get('kind', 'restaurants'), params, user_id=get_current_identity().id
+        )
+    except (ReportJobError, ReportFormatError, ReportParamsError) as e:
+        return jsonify({'message': str(e)}), 400
+    
+    response, status_code = report_job_response(job, 202)
+    response.headers['Location'] = url_for('restaurants.get_report_job', job_id=job.id)
+    return response, status_code
+
+@restaurants_bp.route('/report/jobs/<job_id>', methods=['GET'])
+@admin_required()
+def get_report_job(job_id):
+    """
+    Состояние задания на формирование отчета (только для администраторов)
+    """
+    job = db.session.get(ReportJob, job_id)
+    if not job:
+        return jsonify({'message': 'Задание не найдено'}), 404
+    
+    return report_job_response(job)
+
+@restaurants_bp.route('/report/jobs/<job_id>/download', methods=['GET'])
+@admin_required()
+def download_report_job(job_id):
+    """
+    Скачивание готового отчета (только для администраторов)
+    """
+    job = db.session.get(ReportJob, job_id)
+    if not job:
+        return jsonify({'message': 'Задание не найдено'}), 404
+    if job.status != ReportJobStatus.DONE:
+        return jsonify({'message': 'Отчет еще не готов', 'status': job.status, 'error': job.error}), 409
+    
+    mimetype, filename = report_file_info(job.kind, json.loads(job.params).get('format', 'csv'))
+    try:
+        return send_file(job.file_path, mimetype=mimetype, as_attachment=True, download_name=filename)
+    except FileNotFoundError:
+        return jsonify({'message': 'Файл отчета удален'}), 410
+
+@restaurants_bp.route('/import', methods=['POST'])
+@admin_required()
+def import_restaurants_bulk():
+    """
+    Пакетный импорт ресторанов из CSV или NDJSON с обновлением по external_id (только для администраторов)
+    Тело запроса читается потоком и записывается порциями
+    """
+    fmt = request.args.get('format', 'csv')
+    if fmt not in SYNC_FORMATS:
+        return jsonify({'message': f"Неподдерживаемый формат. Допустимые значения: {', '.join(SYNC_FORMATS)}"}), 400
+    
+    text_stream = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+    
+    try:
+        summary = import_restaurants(iter_restaurant_records(text_stream, fmt))
+    except RestaurantSyncError as e:
+        return jsonify({'message': str(e)}), 400
+    finally:
+        invalidate_response_cache('restaurants')
+    
+    return jsonify(summary), 200
+
+@restaurants_bp.route('/export', methods=['GET'])
+@admin_required()
+def export_restaurants_bulk():
+    """
+    Потоковая выгрузка ресторанов в CSV или NDJSON (только для администраторов)
     """
-    csv_data = generate_restaurants_report()
+    fmt = request.args.get('format', 'csv')
+    if fmt not in SYNC_FORMATS:
+        return jsonify({'message': f"Неподдерживаемый формат. Допустимые значения: {', '.join(SYNC_FORMATS)}"}), 400
     
-    # Создание ответа с CSV файлом
-    response = Response(csv_data, mimetype='text/csv')
-    response.headers.set('Content-Disposition', 'attachment', filename='restaurants_report.csv')
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(export_restaurants(fmt)), mimetype=mimetype)
+    response.headers.set('Content-Disposition', 'attachment', filename=f'restaurants.{fmt}')
     
     return response
@@ -1,31 +1,125 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+from flask_jwt_extended import jwt_required
 from sqlalchemy.exc import IntegrityError
 from app import db
-from app.models import Review, Restaurant, User
-from app.utils.auth import admin_required, user_can_view_review
+from app.models import Review, Restaurant
+from app.utils.auth import admin_required, user_can_view_review, get_current_identity
+from app.utils.response_cache import invalidate_response_cache
+from app.utils.db_routing import use_replica
+from app.services.review_import import ReviewImportError, validate_review_data, parse_review_batch, import_reviews
+from app.services.search import SearchError, decode_search_cursor, search_reviews
+from app.services.report_export import ReportFormatError, check_report_format, generate_report, report_file_info
+from app.utils.report_generator import ReportParamsError, report_period_params
+from app.utils.pagination import (
+    PaginationError, get_limit_arg, get_pagination_args, get_sort_arg, paginate_query, paginated_response, row_to_dict
+)
+from app.utils.filters import FilterError, get_int_arg, get_datetime_arg
 
 reviews_bp = Blueprint('reviews', __name__)
 
+RATING_FIELDS = ('food_rating', 'drinks_rating', 'overall_rating')
+
+def filter_reviews(query, allow_user_filter=True):
+    """
+    Фильтры списка отзывов из строки запроса:
+    restaurant_id, user_id, min_/max_ для каждой оценки, created_after / created_before
+    """
+    restaurant_id = get_int_arg('restaurant_id')
+    if restaurant_id is not None:
+        query = query.filter(Review.restaurant_id == restaurant_id)
+    
+    if allow_user_filter:
+        user_id = get_int_arg('user_id')
+        if user_id is not None:
+            query = query.filter(Review.user_id == user_id)
+    
+    for field in RATING_FIELDS:
+        column = getattr(Review, field)
+        minimum = get_int_arg(f'min_{field}', 1, 5)
+        maximum = get_int_arg(f'max_{field}', 1, 5)
+        if minimum is not None:
+            query = query.filter(column >= minimum)
+        if maximum is not None:
+            query = query.filter(column <= maximum)
+    
+    created_after = get_datetime_arg('created_after')
+    created_before = get_datetime_arg('created_before')
+    if created_after is not None:
+        query = query.filter(Review.created_at >= created_after)
+    if created_before is not None:
+        query = query.filter(Review.created_at < created_before)
+    
+    return query
+
 @reviews_bp.route('', methods=['GET'])
+@use_replica
 @jwt_required()
 def get_reviews():
     """
-    Получение списка отзывов
+    Получение списка отзывов постранично с фильтрами и сортировкой по дате создания
     Администраторы могут получать все отзывы
     Респонденты могут получать только свои отзывы
     """
-    current_user = User.query.get(int(get_jwt_identity()))
+    try:
+        limit, position = get_pagination_args()
+        descending = get_sort_arg()
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    current_user = get_current_identity()
     
     if not current_user:
         return jsonify({'message': 'Пользователь не найден'}), 404
     
-    if current_user.is_admin():
-        reviews = Review.query.all()
-    else:
-        reviews = Review.query.filter_by(user_id=current_user.id).all()
+    # Список только читается, поэтому выбираются колонки без построения ORM объектов
+    query = Review.list_query()
+    if not current_user.is_admin():
+        query = query.filter(Review.user_id == current_user.id)
+    
+    try:
+        query = filter_reviews(query, allow_user_filter=current_user.is_admin())
+    except FilterError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    reviews, next_cursor = paginate_query(query, Review, limit, position, descending)
+    return jsonify(paginated_response(reviews, next_cursor, row_to_dict)), 200
+
+@reviews_bp.route('/search', methods=['GET'])
+@use_replica
+@admin_required()
+def search_reviews_view():
+    """
+    Полнотекстовый поиск по комментариям отзывов (только для администраторов)
+    Результаты упорядочены по релевантности и отдаются постранично
+    """
+    try:
+        limit = get_limit_arg()
+        offset = decode_search_cursor(request.args.get('cursor'))
+        reviews, next_cursor = search_reviews(request.args.get('q'), limit, offset)
+    except (PaginationError, SearchError) as e:
+        return jsonify({'message': str(e)}), 400
+    
+    return jsonify(paginated_response(reviews, next_cursor)), 200
+
+@reviews_bp.route('/export', methods=['GET'])
+@use_replica
+@admin_required()
+def export_reviews():
+    """
+    Потоковая выгрузка всех отзывов по одному в строке (только для администраторов)
+    Форматы: csv, ndjson, а при установленном pyarrow - arrow и parquet
+    """
+    try:
+        fmt = check_report_format(request.args.get('format', 'csv'))
+        params = report_period_params(request.args)
+    except (ReportFormatError, ReportParamsError) as e:
+        return jsonify({'message': str(e)}), 400
+    
+    mimetype, filename = report_file_info('reviews', fmt)
+    response = Response(stream_with_context(generate_report('reviews', fmt, **params)), mimetype=mimetype)
+    response.headers.set('Content-Disposition', 'attachment', filename=filename)
     
-    return jsonify([review.to_dict() for review in reviews]), 200
+    return response
 
 @reviews_bp.route('/<int:review_id>', methods=['GET'])
 @jwt_required()
@@ -53,20 +147,16 @@ def create_review():
     """
     data = request.get_json()
     
-    if not all(k in data for k in ('restaurant_id', 'food_rating', 'drinks_rating', 'overall_rating')):
-        return jsonify({'message': 'Отсутствуют обязательные поля'}), 400
-    
-    # Проверка валидности оценок
-    for rating_field in ['food_rating', 'drinks_rating', 'overall_rating']:
-        rating = data.get(rating_field)
-        if not isinstance(rating, int) or rating < 1 or rating > 5:
-            return jsonify({'message': f'Поле {rating_field} должно быть целым числом от 1 до 5'}), 400
+    # Проверка обязательных полей и валидности оценок
+    error = validate_review_data(data)
+    if error:
+        return jsonify({'message': error}), 400
     
     restaurant = Restaurant.query.get(data['restaurant_id'])
     if not restaurant:
         return jsonify({'message': 'Ресторан не найден'}), 404
     
-    current_user = User.query.get(int(get_jwt_identity()))
+    current_user = get_current_identity()
     
     if not current_user:
         return jsonify({'message': 'Пользователь не найден'}), 404
@@ -83,7 +173,40 @@ def create_review():
     try:
         db.session.add(review)
         db.session.commit()
+        # Оценки ресторана входят в ответы каталога
+        invalidate_response_cache('restaurants')
         return jsonify(review.to_dict()), 201
     except IntegrityError:
         db.session.rollback()
         return jsonify({'message': 'Вы уже оставили отзыв для этого ресторана'}), 400
+
+@reviews_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def create_reviews_bulk():
+    """
+    Пакетное создание отзывов (JSON массив или NDJSON)
+    Все отзывы создаются от имени текущего пользователя
+    Ошибки отдельных отзывов возвращаются в результатах и не прерывают пакет
+    """
+    current_user = get_current_identity()
+    
+    if not current_user:
+        return jsonify({'message': 'Пользователь не найден'}), 404
+    
+    try:
+        items = parse_review_batch(request.stream, request.content_type, current_app.config['REVIEWS_BULK_MAX_ITEMS'])
+    except ReviewImportError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    results = import_reviews(items, current_user, current_app.config['REVIEWS_BULK_CHUNK_SIZE'])
+    created = sum(1 for result in results if result['status'] == 'created')
+    
+    if created:
+        # Оценки ресторанов входят в ответы каталога
+        invalidate_response_cache('restaurants')
+    
+    return jsonify({
+        'created': created,
+        'failed': len(results) - created,
+        'results': results
+    }), 200
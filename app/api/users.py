@@ -1,8 +1,11 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from app import db
 from app.models import User, UserRole
-from app.utils.auth import admin_required, user_can_view_user
+from app.utils.auth import admin_required, user_can_view_user, get_current_identity, invalidate_user_cache
+from app.utils.response_cache import invalidate_response_cache
+from app.utils.db_routing import use_replica
+from app.utils.pagination import PaginationError, get_pagination_args, paginate_query, paginated_response
 from email_validator import validate_email, EmailNotValidError
 
 users_bp = Blueprint('users', __name__)
@@ -11,12 +14,18 @@ users_bp = Blueprint('users', __name__)
 @admin_required()
 def get_users():
     """
-    Получение списка всех пользователей (только для администраторов)
+    Получение списка пользователей постранично (только для администраторов)
     """
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users]), 200
+    try:
+        limit, position = get_pagination_args()
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    users, next_cursor = paginate_query(User.query, User, limit, position)
+    return jsonify(paginated_response(users, next_cursor)), 200
 
 @users_bp.route('/<int:user_id>', methods=['GET'])
+@use_replica
 @jwt_required()
 def get_user(user_id):
     """
@@ -115,17 +124,25 @@ def update_user(user_id):
         user.email = data['email']
     
     # Обновление пароля
+    revoke_tokens = False
     if 'password' in data:
         user.set_password(data['password'])
+        revoke_tokens = True
     
     # Обновление роли
     if 'role' in data:
         # Проверка валидности роли
         if data['role'] not in [role.value for role in UserRole]:
             return jsonify({'message': 'Некорректная роль'}), 400
+        revoke_tokens = revoke_tokens or user.role != data['role']
         user.role = data['role']
     
+    # Ранее выданные токены с устаревшей ролью или паролем перестают приниматься
+    if revoke_tokens:
+        user.token_version = (user.token_version or 0) + 1
+    
     db.session.commit()
+    invalidate_user_cache(user_id)
     
     return jsonify(user.to_dict()), 200
 
@@ -142,11 +159,14 @@ def delete_user(user_id):
         return jsonify({'message': 'Пользователь не найден'}), 404
     
     # Проверка, что пользователь не является администратором, который выполняет запрос
-    current_user = User.query.get(int(get_jwt_identity()))
+    current_user = get_current_identity()
     if current_user.id == user_id:
         return jsonify({'message': 'Нельзя удалить самого себя'}), 400
     
     db.session.delete(user)
     db.session.commit()
+    invalidate_user_cache(user_id)
+    # Вместе с пользователем удалены его отзывы, оценки ресторанов изменились
+    invalidate_response_cache('restaurants')
     
     return jsonify({'message': 'Пользователь успешно удален'}), 200
@@ -0,0 +1,118 @@
+import click
+from flask.cli import AppGroup
+
+rating_stats_cli = AppGroup('rating-stats', help='Обслуживание агрегированных оценок ресторанов')
+restaurants_cli = AppGroup('restaurants', help='Синхронизация каталога ресторанов')
+swagger_cli = AppGroup('swagger', help='Спецификация API')
+search_cli = AppGroup('search', help='Полнотекстовый поиск')
+
+@rating_stats_cli.command('check')
+def check_rating_stats_command():
+    """
+    Проверка согласованности агрегатов с таблицей отзывов
+    """
+    from app.services.rating_stats import check_rating_stats
+    
+    mismatched = check_rating_stats()
+    if mismatched:
+        click.echo(f"Агрегаты расходятся для ресторанов: {', '.join(map(str, mismatched))}")
+        raise SystemExit(1)
+    
+    click.echo("Агрегаты согласованы с таблицей отзывов.")
+
+@rating_stats_cli.command('rebuild')
+def rebuild_rating_stats_command():
+    """
+    Пересчет агрегатов всех ресторанов с нуля
+    """
+    from app.services.rating_stats import rebuild_rating_stats
+    
+    count = rebuild_rating_stats()
+    click.echo(f"Агрегаты пересчитаны для {count} ресторанов.")
+
+@restaurants_cli.command('import')
+@click.argument('source', type=click.File('r', encoding='utf-8', lazy=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default='csv', show_default=True)
+def import_restaurants_command(source, fmt):
+    """
+    Импорт ресторанов из файла (или "-" для stdin) с обновлением по external_id
+    """
+    from app.services.restaurant_sync import RestaurantSyncError, iter_restaurant_records, import_restaurants
+    from app.utils.response_cache import invalidate_response_cache
+    
+    try:
+        summary = import_restaurants(iter_restaurant_records(source, fmt))
+    except RestaurantSyncError as e:
+        raise click.ClickException(str(e))
+    finally:
+        invalidate_response_cache('restaurants')
+    
+    click.echo(f"Обработано строк: {summary['processed']}, с ошибками: {summary['failed']}")
+    for error in summary['errors']:
+        click.echo(f"  строка {error['line']}: {error['message']}")
+
+@restaurants_cli.command('export')
+@click.argument('target', type=click.File('w', encoding='utf-8'), default='-')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default='csv', show_default=True)
+def export_restaurants_command(target, fmt):
+    """
+    Выгрузка ресторанов в файл (по умолчанию в stdout)
+    """
+    from app.services.restaurant_sync import export_restaurants
+    
+    for chunk in export_restaurants(fmt):
+        target.write(chunk)
+
+@swagger_cli.command('build')
+@click.option('--output', type=click.Path(dir_okay=False), default=None, help='Путь к файлу (по умолчанию static/swagger.json)')
+def build_swagger_command(output):
+    """
+    Сборка спецификации API в JSON файл
+    """
+    from flask import current_app
+    from app.utils.swagger import generate_swagger_spec
+    
+    path = generate_swagger_spec(current_app, output)
+    click.echo(f"Спецификация сохранена в {path}")
+
+@search_cli.command('rebuild')
+def rebuild_search_command():
+    """
+    Переиндексация ресторанов и отзывов для полнотекстового поиска
+    """
+    from app.services.search import rebuild_search_index
+    
+    rebuild_search_index()
+    click.echo("Поисковый индекс перестроен.")
+
+@click.command('seed')
+@click.option('--users', type=click.IntRange(min=0), default=1000, show_default=True)
+@click.option('--restaurants', type=click.IntRange(min=0), default=100, show_default=True)
+@click.option('--reviews', type=click.IntRange(min=0), default=10000, show_default=True)
+@click.option('--password', default='user123', show_default=True, help='Пароль всех созданных пользователей')
+@click.option('--seed', 'random_seed', type=int, default=None, help='Начальное значение генератора для воспроизводимости')
+def seed_command(users, restaurants, reviews, password, random_seed):
+    """
+    Генерация синтетических пользователей, ресторанов и отзывов для нагрузочного тестирования
+    """
+    from app.utils.init_db import seed_synthetic_data
+    from app.utils.response_cache import invalidate_response_cache
+    
+    try:
+        created = seed_synthetic_data(users, restaurants, reviews, password=password, seed=random_seed)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    finally:
+        invalidate_response_cache('restaurants')
+    
+    click.echo("Создано пользователей: {}, ресторанов: {}, отзывов: {}".format(*created))
+
+def register_commands(app):
+    """
+    Регистрация CLI команд приложения
+    """
+    app.cli.add_command(rating_stats_cli)
+    app.cli.add_command(restaurants_cli)
+    app.cli.add_command(swagger_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(seed_command)
@@ -1,3 +1,6 @@
 from app.models.user import User, UserRole
 from app.models.restaurant import Restaurant
 from app.models.review import Review
+from app.models.rating_stats import RestaurantRatingStats, RestaurantDailyRatingStats
+from app.models.report_job import ReportJob, ReportJobStatus
+from app.models.data_version import DataVersion
@@ -0,0 +1,17 @@
+from app import db
+from datetime import datetime
+
+class DataVersion(db.Model):
+    """
+    Счетчик изменений данных
+    Увеличивается в той же транзакции, что и запись ресторанов и отзывов,
+    см. app.services.data_version; служит ключом кэшированных снимков отчетов
+    """
+    __tablename__ = 'data_versions'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<DataVersion {self.name} {self.version}>'
@@ -0,0 +1,68 @@
+from app import db
+from datetime import datetime
+
+class RestaurantRatingStats(db.Model):
+    """
+    Агрегированные оценки ресторана (количество отзывов и суммы оценок)
+    Поддерживаются инкрементально при записи отзывов, см. app.services.rating_stats
+    """
+    __tablename__ = 'restaurant_rating_stats'
+    
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurants.id'), primary_key=True)
+    reviews_count = db.Column(db.Integer, nullable=False, default=0)
+    food_rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    drinks_rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    overall_rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    # Средние оценки хранятся явно, чтобы рейтинг ресторанов читался по индексу
+    avg_food_rating = db.Column(db.Float, nullable=True)
+    avg_drinks_rating = db.Column(db.Float, nullable=True)
+    avg_overall_rating = db.Column(db.Float, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_restaurant_rating_stats_food', 'avg_food_rating', 'reviews_count'),
+        db.Index('ix_restaurant_rating_stats_drinks', 'avg_drinks_rating', 'reviews_count'),
+        db.Index('ix_restaurant_rating_stats_overall', 'avg_overall_rating', 'reviews_count'),
+    )
+    
+    @staticmethod
+    def average(rating_sum, reviews_count):
+        """
+        Средняя оценка по сумме и количеству (None, если отзывов нет)
+        """
+        if not reviews_count:
+            return None
+        return round(rating_sum / reviews_count, 2)
+    
+    def to_dict(self):
+        return {
+            'reviews_count': self.reviews_count or 0,
+            'avg_food_rating': self.average(self.food_rating_sum, self.reviews_count),
+            'avg_drinks_rating': self.average(self.drinks_rating_sum, self.reviews_count),
+            'avg_overall_rating': self.average(self.overall_rating_sum, self.reviews_count)
+        }
+    
+    def __repr__(self):
+        return f'<RestaurantRatingStats for Restaurant {self.restaurant_id}>'
+
+class RestaurantDailyRatingStats(db.Model):
+    """
+    Количество отзывов и суммы оценок ресторана за сутки (по дате создания отзыва в UTC)
+    Поддерживаются вместе с RestaurantRatingStats, позволяют считать средние за период
+    по строкам дней, не обходя таблицу отзывов
+    """
+    __tablename__ = 'restaurant_daily_rating_stats'
+    
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurants.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    reviews_count = db.Column(db.Integer, nullable=False, default=0)
+    food_rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    drinks_rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    overall_rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.Index('ix_restaurant_daily_rating_stats_day', 'day', 'restaurant_id'),
+    )
+    
+    def __repr__(self):
+        return f'<RestaurantDailyRatingStats for Restaurant {self.restaurant_id} on {self.day}>'
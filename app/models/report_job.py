@@ -0,0 +1,44 @@
+from app import db
+from datetime import datetime
+
+class ReportJobStatus:
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+class ReportJob(db.Model):
+    """
+    Задание на фоновое формирование отчета
+    Пока задание ожидает или выполняется, active_key содержит ключ параметров отчета:
+    уникальный индекс по нему не дает поставить в очередь два одинаковых задания
+    """
+    __tablename__ = 'report_jobs'
+    
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    params = db.Column(db.Text, nullable=False, default='{}')
+    active_key = db.Column(db.String(64), nullable=True, unique=True)
+    status = db.Column(db.String(20), nullable=False, default=ReportJobStatus.PENDING)
+    file_path = db.Column(db.String(500), nullable=True)
+    file_size = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'file_size': self.file_size,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+    
+    def __repr__(self):
+        return f'<ReportJob {self.id} {self.kind} {self.status}>'
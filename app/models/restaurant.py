@@ -1,10 +1,13 @@
 from app import db
 from datetime import datetime
+from app.models.rating_stats import RestaurantRatingStats
 
 class Restaurant(db.Model):
     __tablename__ = 'restaurants'
     
     id = db.Column(db.Integer, primary_key=True)
+    # Идентификатор ресторана во внешнем реестре, ключ для пакетной синхронизации
+    external_id = db.Column(db.String(64), nullable=True, unique=True, index=True)
     name = db.Column(db.String(100), nullable=False, index=True)
     address = db.Column(db.String(200), nullable=True)
     description = db.Column(db.Text, nullable=True)
@@ -14,20 +17,76 @@ class Restaurant(db.Model):
     # Отношение с отзывами
     reviews = db.relationship('Review', back_populates='restaurant', cascade='all, delete-orphan')
     
-    def __init__(self, name, address=None, description=None):
+    # Агрегированные оценки, поддерживаются app.services.rating_stats
+    rating_stats = db.relationship('RestaurantRatingStats', uselist=False, lazy='joined', viewonly=True)
+    
+    # Индекс для keyset-пагинации по (created_at, id)
+    __table_args__ = (
+        db.Index('ix_restaurants_created_at_id', 'created_at', 'id'),
+    )
+    
+    def __init__(self, name, address=None, description=None, external_id=None):
         self.name = name
         self.address = address
         self.description = description
+        self.external_id = external_id
     
     def to_dict(self):
         return {
             'id': self.id,
+            'external_id': self.external_id,
             'name': self.name,
             'address': self.address,
             'description': self.description,
+            'ratings': self.ratings_dict(),
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
     
+    @classmethod
+    def list_query(cls):
+        """
+        Запрос по колонкам для списков только для чтения: строки без построения ORM объектов
+        """
+        return db.session.query(
+            *cls.__table__.columns,
+            RestaurantRatingStats.reviews_count,
+            RestaurantRatingStats.food_rating_sum,
+            RestaurantRatingStats.drinks_rating_sum,
+            RestaurantRatingStats.overall_rating_sum
+        ).outerjoin(RestaurantRatingStats, RestaurantRatingStats.restaurant_id == cls.id)
+    
+    @staticmethod
+    def row_to_dict(row):
+        """
+        Строка list_query в том же виде, что и to_dict
+        """
+        reviews_count = row.reviews_count or 0
+        return {
+            'id': row.id,
+            'external_id': row.external_id,
+            'name': row.name,
+            'address': row.address,
+            'description': row.description,
+            'ratings': {
+                'reviews_count': reviews_count,
+                'avg_food_rating': RestaurantRatingStats.average(row.food_rating_sum, reviews_count),
+                'avg_drinks_rating': RestaurantRatingStats.average(row.drinks_rating_sum, reviews_count),
+                'avg_overall_rating': RestaurantRatingStats.average(row.overall_rating_sum, reviews_count)
+            },
+            'created_at': row.created_at,
+            'updated_at': row.updated_at
+        }
+    
+    def ratings_dict(self):
+        if self.rating_stats is None:
+            return {
+                'reviews_count': 0,
+                'avg_food_rating': None,
+                'avg_drinks_rating': None,
+                'avg_overall_rating': None
+            }
+        return self.rating_stats.to_dict()
+    
     def __repr__(self):
         return f'<Restaurant {self.name}>'
@@ -25,6 +25,10 @@ class Review(db.Model):
         CheckConstraint('drinks_rating >= 1 AND drinks_rating <= 5', name='check_drinks_rating'),
         CheckConstraint('overall_rating >= 1 AND overall_rating <= 5', name='check_overall_rating'),
         UniqueConstraint('user_id', 'restaurant_id', name='unique_user_restaurant_review'),
+        db.Index('ix_reviews_created_at_id', 'created_at', 'id'),
+        # Индексы для выборок отзывов ресторана и пользователя в порядке создания
+        db.Index('ix_reviews_restaurant_id_created_at', 'restaurant_id', 'created_at', 'id'),
+        db.Index('ix_reviews_user_id_created_at', 'user_id', 'created_at', 'id'),
     )
     
     def __init__(self, restaurant_id, user_id, food_rating, drinks_rating, overall_rating, comment=None):
@@ -35,6 +39,14 @@ class Review(db.Model):
         self.overall_rating = overall_rating
         self.comment = comment
     
+    @classmethod
+    def list_query(cls, *extra_columns):
+        """
+        Запрос по колонкам для списков только для чтения: строки без построения ORM объектов
+        Ключи строк совпадают с to_dict (плюс extra_columns)
+        """
+        return db.session.query(*cls.__table__.columns, *extra_columns)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -1,5 +1,5 @@
 from app import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import current_app
 from datetime import datetime
 from enum import Enum
 
@@ -13,13 +13,20 @@ class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(64), unique=True, nullable=False, index=True)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(256), nullable=False)
     role = db.Column(db.String(20), nullable=False, default=UserRole.RESPONDENT.value)
+    # Увеличивается при смене роли или пароля, токены с другой версией отклоняются
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     reviews = db.relationship('Review', back_populates='user', cascade='all, delete-orphan')
     
+    # Индекс для keyset-пагинации по (created_at, id)
+    __table_args__ = (
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
+    
     def __init__(self, username, email, password, role=UserRole.RESPONDENT.value):
         self.username = username
         self.email = email
@@ -27,10 +34,13 @@ class User(db.Model):
         self.role = role
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = current_app.extensions['password_hasher'].hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return current_app.extensions['password_hasher'].verify(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        return current_app.extensions['password_hasher'].needs_rehash(self.password_hash)
     
     def is_admin(self):
         return self.role == UserRole.ADMIN.value
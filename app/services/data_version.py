@@ -0,0 +1,59 @@
+from datetime import datetime
+from sqlalchemy import event, insert, select, update
+from app import db
+from app.models import DataVersion, Restaurant, Review
+from app.utils.db_routing import RoutingSession
+
+# Версия данных, от которых зависят отчеты по ресторанам
+GLOBAL_DATA_VERSION = 'global'
+VERSIONED_MODELS = (Restaurant, Review)
+VERSIONED_TABLES = frozenset(model.__tablename__ for model in VERSIONED_MODELS)
+
+version_table = DataVersion.__table__
+
+def bump_data_version(connection, name=GLOBAL_DATA_VERSION):
+    """
+    Увеличение версии данных в текущей транзакции
+    """
+    result = connection.execute(
+        update(version_table)
+        .where(version_table.c.name == name)
+        .values(version=version_table.c.version + 1, updated_at=datetime.utcnow())
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(version_table).values(name=name, version=1, updated_at=datetime.utcnow()))
+
+def get_data_version(name=GLOBAL_DATA_VERSION):
+    """
+    Текущая версия данных (0, если данные еще не менялись)
+    """
+    return db.session.scalar(select(DataVersion.version).where(DataVersion.name == name)) or 0
+
+def _after_flush(session, flush_context):
+    changed = any(isinstance(instance, VERSIONED_MODELS) for instance in session.new) or \
+        any(isinstance(instance, VERSIONED_MODELS) for instance in session.deleted) or \
+        any(isinstance(instance, VERSIONED_MODELS) and session.is_modified(instance) for instance in session.dirty)
+    if changed:
+        bump_data_version(session.connection())
+
+def _do_orm_execute(orm_execute_state):
+    # Пакетные INSERT/UPDATE/DELETE через session.execute проходят мимо flush
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, 'table', None)
+    if table is not None and table.name in VERSIONED_TABLES:
+        bump_data_version(orm_execute_state.session.connection())
+
+_LISTENERS = (
+    (RoutingSession, 'after_flush', _after_flush),
+    (RoutingSession, 'do_orm_execute', _do_orm_execute),
+)
+
+def register_data_version_listeners():
+    """
+    Подключает обработчики, увеличивающие версию данных при записи ресторанов и отзывов
+    Запись через connection.execute в обход сессии должна вызывать bump_data_version самостоятельно
+    """
+    for target, identifier, fn in _LISTENERS:
+        if not event.contains(target, identifier, fn):
+            event.listen(target, identifier, fn)
@@ -0,0 +1,251 @@
+from datetime import datetime
+from sqlalchemy import event, func, inspect, insert, update, delete, select, case, cast, Float
+from app import db
+from app.models import Restaurant, Review, RestaurantRatingStats, RestaurantDailyRatingStats
+
+RATING_FIELDS = ('food_rating', 'drinks_rating', 'overall_rating')
+
+stats_table = RestaurantRatingStats.__table__
+daily_stats_table = RestaurantDailyRatingStats.__table__
+
+def average_expression(rating_sum, reviews_count):
+    """
+    SQL выражение средней оценки (NULL, если отзывов нет)
+    """
+    return case((reviews_count > 0, cast(rating_sum, Float) / reviews_count), else_=None)
+
+def apply_rating_delta(connection, restaurant_id, count, food, drinks, overall):
+    """
+    Применяет приращение к агрегатам ресторана в текущей транзакции
+    Если строки агрегатов еще нет, она создается
+    """
+    reviews_count = stats_table.c.reviews_count + count
+    food_rating_sum = stats_table.c.food_rating_sum + food
+    drinks_rating_sum = stats_table.c.drinks_rating_sum + drinks
+    overall_rating_sum = stats_table.c.overall_rating_sum + overall
+    
+    result = connection.execute(
+        update(stats_table)
+        .where(stats_table.c.restaurant_id == restaurant_id)
+        .values(
+            reviews_count=reviews_count,
+            food_rating_sum=food_rating_sum,
+            drinks_rating_sum=drinks_rating_sum,
+            overall_rating_sum=overall_rating_sum,
+            avg_food_rating=average_expression(food_rating_sum, reviews_count),
+            avg_drinks_rating=average_expression(drinks_rating_sum, reviews_count),
+            avg_overall_rating=average_expression(overall_rating_sum, reviews_count),
+            updated_at=datetime.utcnow()
+        )
+    )
+    
+    if result.rowcount == 0:
+        connection.execute(insert(stats_table).values(
+            restaurant_id=restaurant_id,
+            reviews_count=count,
+            food_rating_sum=food,
+            drinks_rating_sum=drinks,
+            overall_rating_sum=overall,
+            avg_food_rating=food / count if count > 0 else None,
+            avg_drinks_rating=drinks / count if count > 0 else None,
+            avg_overall_rating=overall / count if count > 0 else None,
+            updated_at=datetime.utcnow()
+        ))
+
+def apply_daily_rating_delta(connection, restaurant_id, day, count, food, drinks, overall):
+    """
+    Применяет приращение к суточным агрегатам ресторана в текущей транзакции
+    Если строки за этот день еще нет, она создается
+    """
+    result = connection.execute(
+        update(daily_stats_table)
+        .where(daily_stats_table.c.restaurant_id == restaurant_id, daily_stats_table.c.day == day)
+        .values(
+            reviews_count=daily_stats_table.c.reviews_count + count,
+            food_rating_sum=daily_stats_table.c.food_rating_sum + food,
+            drinks_rating_sum=daily_stats_table.c.drinks_rating_sum + drinks,
+            overall_rating_sum=daily_stats_table.c.overall_rating_sum + overall
+        )
+    )
+    
+    if result.rowcount == 0:
+        connection.execute(insert(daily_stats_table).values(
+            restaurant_id=restaurant_id,
+            day=day,
+            reviews_count=count,
+            food_rating_sum=food,
+            drinks_rating_sum=drinks,
+            overall_rating_sum=overall
+        ))
+
+def review_day(created_at):
+    """
+    День отзыва для суточных агрегатов (дата создания в UTC)
+    """
+    return (created_at or datetime.utcnow()).date()
+
+def _apply_review(connection, restaurant_id, created_at, delta):
+    apply_rating_delta(connection, restaurant_id, *delta)
+    apply_daily_rating_delta(connection, restaurant_id, review_day(created_at), *delta)
+
+def _review_delta(review, sign):
+    return (sign, sign * review.food_rating, sign * review.drinks_rating, sign * review.overall_rating)
+
+def _old_value(state, field):
+    history = state.attrs[field].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(state.object, field)
+
+def _on_review_insert(mapper, connection, review):
+    _apply_review(connection, review.restaurant_id, review.created_at, _review_delta(review, 1))
+
+def _on_review_delete(mapper, connection, review):
+    # Берем исходные значения на случай, если объект изменили перед удалением
+    state = inspect(review)
+    _apply_review(
+        connection,
+        _old_value(state, 'restaurant_id'),
+        _old_value(state, 'created_at'),
+        (-1, *(-_old_value(state, field) for field in RATING_FIELDS))
+    )
+
+def _on_review_update(mapper, connection, review):
+    state = inspect(review)
+    if not any(state.attrs[field].history.has_changes() for field in ('restaurant_id', 'created_at') + RATING_FIELDS):
+        return
+    
+    _apply_review(
+        connection,
+        _old_value(state, 'restaurant_id'),
+        _old_value(state, 'created_at'),
+        (-1, *(-_old_value(state, field) for field in RATING_FIELDS))
+    )
+    _apply_review(connection, review.restaurant_id, review.created_at, _review_delta(review, 1))
+
+def _on_restaurant_insert(mapper, connection, restaurant):
+    connection.execute(insert(stats_table).values(restaurant_id=restaurant.id, updated_at=datetime.utcnow()))
+
+def _on_restaurant_delete(mapper, connection, restaurant):
+    connection.execute(delete(stats_table).where(stats_table.c.restaurant_id == restaurant.id))
+    connection.execute(delete(daily_stats_table).where(daily_stats_table.c.restaurant_id == restaurant.id))
+
+_LISTENERS = (
+    (Review, 'after_insert', _on_review_insert),
+    (Review, 'after_update', _on_review_update),
+    (Review, 'after_delete', _on_review_delete),
+    (Restaurant, 'after_insert', _on_restaurant_insert),
+    (Restaurant, 'before_delete', _on_restaurant_delete),
+)
+
+def register_rating_stats_listeners():
+    """
+    Подключает обработчики, поддерживающие агрегаты при записи отзывов и ресторанов через ORM
+    Массовые вставки в обход ORM должны вызывать apply_rating_delta и apply_daily_rating_delta самостоятельно
+    """
+    for target, identifier, fn in _LISTENERS:
+        if not event.contains(target, identifier, fn):
+            event.listen(target, identifier, fn)
+
+def _aggregate_query():
+    """
+    Агрегаты, посчитанные заново по таблице отзывов
+    """
+    return select(
+        Restaurant.id.label('restaurant_id'),
+        func.count(Review.id).label('reviews_count'),
+        func.coalesce(func.sum(Review.food_rating), 0).label('food_rating_sum'),
+        func.coalesce(func.sum(Review.drinks_rating), 0).label('drinks_rating_sum'),
+        func.coalesce(func.sum(Review.overall_rating), 0).label('overall_rating_sum')
+    ).select_from(Restaurant).outerjoin(Review).group_by(Restaurant.id)
+
+def _daily_aggregate_query():
+    """
+    Суточные агрегаты, посчитанные заново по таблице отзывов
+    """
+    day = func.date(Review.created_at)
+    return select(
+        Review.restaurant_id,
+        day.label('day'),
+        func.count(Review.id).label('reviews_count'),
+        func.sum(Review.food_rating).label('food_rating_sum'),
+        func.sum(Review.drinks_rating).label('drinks_rating_sum'),
+        func.sum(Review.overall_rating).label('overall_rating_sum')
+    ).group_by(Review.restaurant_id, day)
+
+def rebuild_rating_stats():
+    """
+    Пересчитывает агрегаты всех ресторанов с нуля
+    Возвращает количество ресторанов
+    """
+    aggregates = _aggregate_query().subquery()
+    
+    db.session.execute(delete(stats_table))
+    result = db.session.execute(insert(stats_table).from_select(
+        [
+            'restaurant_id', 'reviews_count', 'food_rating_sum', 'drinks_rating_sum', 'overall_rating_sum',
+            'avg_food_rating', 'avg_drinks_rating', 'avg_overall_rating', 'updated_at'
+        ],
+        select(
+            aggregates.c.restaurant_id,
+            aggregates.c.reviews_count,
+            aggregates.c.food_rating_sum,
+            aggregates.c.drinks_rating_sum,
+            aggregates.c.overall_rating_sum,
+            average_expression(aggregates.c.food_rating_sum, aggregates.c.reviews_count),
+            average_expression(aggregates.c.drinks_rating_sum, aggregates.c.reviews_count),
+            average_expression(aggregates.c.overall_rating_sum, aggregates.c.reviews_count),
+            func.current_timestamp()
+        )
+    ))
+    
+    db.session.execute(delete(daily_stats_table))
+    db.session.execute(insert(daily_stats_table).from_select(
+        ['restaurant_id', 'day', 'reviews_count', 'food_rating_sum', 'drinks_rating_sum', 'overall_rating_sum'],
+        _daily_aggregate_query()
+    ))
+    db.session.commit()
+    
+    return result.rowcount
+
+def check_rating_stats():
+    """
+    Сравнивает сохраненные агрегаты с пересчитанными
+    Возвращает список ID ресторанов с расхождениями
+    """
+    expected = {row.restaurant_id: tuple(row)[1:] for row in db.session.execute(_aggregate_query())}
+    stored = {
+        row.restaurant_id: tuple(row)[1:]
+        for row in db.session.execute(select(
+            stats_table.c.restaurant_id,
+            stats_table.c.reviews_count,
+            stats_table.c.food_rating_sum,
+            stats_table.c.drinks_rating_sum,
+            stats_table.c.overall_rating_sum
+        ))
+    }
+    
+    mismatched = {
+        restaurant_id
+        for restaurant_id in set(expected) | set(stored)
+        if expected.get(restaurant_id) != stored.get(restaurant_id)
+    }
+    
+    # Суточные агрегаты; строки дней, где все отзывы удалены, остаются с нулями
+    expected_daily = {
+        (row.restaurant_id, str(row.day)): tuple(row)[2:]
+        for row in db.session.execute(_daily_aggregate_query())
+    }
+    stored_daily = {
+        (row.restaurant_id, str(row.day)): tuple(row)[2:]
+        for row in db.session.execute(
+            select(daily_stats_table).where(daily_stats_table.c.reviews_count != 0)
+        )
+    }
+    mismatched.update(
+        key[0]
+        for key in set(expected_daily) | set(stored_daily)
+        if expected_daily.get(key) != stored_daily.get(key)
+    )
+    
+    return sorted(mismatched)
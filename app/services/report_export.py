@@ -0,0 +1,231 @@
+import csv
+import io
+from datetime import datetime, time, timedelta
+from flask import current_app
+from app import db
+from app.models import RestaurantRatingStats, Review
+from app.utils.report_generator import parse_report_date, generate_restaurants_report, restaurants_report_rows
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - необязательная зависимость
+    pyarrow = None
+
+# Форматы выгрузки: тип содержимого и расширение файла
+REPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+# Колоночные форматы, для которых нужен pyarrow
+ARROW_FORMATS = ('arrow', 'parquet')
+
+# Виды отчетов и имена файлов для скачивания (без расширения)
+REPORT_KINDS = {
+    'restaurants': 'restaurants_report',
+    'reviews': 'reviews_export',
+}
+
+# Строк в одной порции (record batch) типизированной выгрузки
+EXPORT_BATCH_SIZE = 10000
+
+# Колонки выгрузок: имя и тип
+RESTAURANT_REPORT_COLUMNS = (
+    ('restaurant_id', 'int64'),
+    ('restaurant_name', 'string'),
+    ('reviews_count', 'int64'),
+    ('avg_food_rating', 'float64'),
+    ('avg_drinks_rating', 'float64'),
+    ('avg_overall_rating', 'float64'),
+)
+REVIEW_EXPORT_COLUMNS = (
+    ('review_id', 'int64'),
+    ('restaurant_id', 'int64'),
+    ('user_id', 'int64'),
+    ('food_rating', 'int64'),
+    ('drinks_rating', 'int64'),
+    ('overall_rating', 'int64'),
+    ('comment', 'string'),
+    ('created_at', 'timestamp'),
+    ('updated_at', 'timestamp'),
+)
+
+class ReportFormatError(ValueError):
+    """
+    Неизвестный или недоступный формат выгрузки
+    """
+
+def available_report_formats():
+    """
+    Форматы, доступные с установленными библиотеками
+    """
+    return tuple(fmt for fmt in REPORT_FORMATS if pyarrow is not None or fmt not in ARROW_FORMATS)
+
+def check_report_format(fmt):
+    if not isinstance(fmt, str) or fmt not in REPORT_FORMATS:
+        raise ReportFormatError(
+            f"Неподдерживаемый формат. Допустимые значения: {', '.join(available_report_formats())}"
+        )
+    if fmt in ARROW_FORMATS and pyarrow is None:
+        raise ReportFormatError(f'Формат {fmt} недоступен: библиотека pyarrow не установлена')
+    return fmt
+
+def report_file_info(kind, fmt):
+    """
+    Тип содержимого и имя файла выгрузки
+    """
+    mimetype, extension = REPORT_FORMATS[fmt]
+    return mimetype, f'{REPORT_KINDS[kind]}.{extension}'
+
+def _batched(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(tuple(row))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def restaurant_report_batches(date_from=None, date_to=None, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Порции строк сводного отчета с числовыми средними (None, если отзывов нет)
+    """
+    rows = restaurants_report_rows(batch_size, date_from, date_to)
+    for batch in _batched(rows, batch_size):
+        yield [
+            (
+                restaurant_id,
+                name,
+                reviews_count or 0,
+                RestaurantRatingStats.average(food, reviews_count),
+                RestaurantRatingStats.average(drinks, reviews_count),
+                RestaurantRatingStats.average(overall, reviews_count)
+            )
+            for restaurant_id, name, reviews_count, food, drinks, overall in batch
+        ]
+
+def review_export_batches(date_from=None, date_to=None, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Порции отзывов в порядке создания; период ограничивает дату создания (даты включительно)
+    """
+    date_from = parse_report_date('date_from', date_from)
+    date_to = parse_report_date('date_to', date_to)
+    
+    query = db.session.query(
+        Review.id,
+        Review.restaurant_id,
+        Review.user_id,
+        Review.food_rating,
+        Review.drinks_rating,
+        Review.overall_rating,
+        Review.comment,
+        Review.created_at,
+        Review.updated_at
+    )
+    if date_from:
+        query = query.filter(Review.created_at >= datetime.combine(date_from, time.min))
+    if date_to:
+        query = query.filter(Review.created_at < datetime.combine(date_to + timedelta(days=1), time.min))
+    
+    yield from _batched(query.order_by(Review.created_at, Review.id).yield_per(batch_size), batch_size)
+
+class _DrainBuffer:
+    """
+    Поток для записи pyarrow: накапливает байты до очередной выдачи клиенту
+    """
+    
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+        self.closed = False
+    
+    def write(self, data):
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self._position
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+    
+    def drain(self):
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+def _arrow_schema(columns):
+    types = {
+        'int64': pyarrow.int64(),
+        'float64': pyarrow.float64(),
+        'string': pyarrow.string(),
+        'timestamp': pyarrow.timestamp('us'),
+    }
+    return pyarrow.schema([(name, types[type_name]) for name, type_name in columns])
+
+def _encode_arrow(fmt, columns, batches):
+    schema = _arrow_schema(columns)
+    sink = _DrainBuffer()
+    writer = pyarrow.ipc.new_stream(sink, schema) if fmt == 'arrow' else pyarrow.parquet.ParquetWriter(sink, schema)
+    
+    # Каждая порция становится record batch (в Parquet - группой строк)
+    for batch in batches:
+        arrays = [pyarrow.array(values, type=field.type) for values, field in zip(zip(*batch), schema)]
+        writer.write_batch(pyarrow.RecordBatch.from_arrays(arrays, schema=schema))
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    
+    writer.close()
+    yield sink.drain()
+
+def _encode_text(fmt, columns, batches):
+    names = [name for name, _ in columns]
+    output = io.StringIO()
+    writer = csv.writer(output) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(names)
+    
+    for batch in batches:
+        for row in batch:
+            if writer:
+                writer.writerow(value.isoformat() if isinstance(value, datetime) else value for value in row)
+            else:
+                output.write(current_app.json.dumps(dict(zip(names, row))))
+                output.write('\n')
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate(0)
+    
+    if output.getvalue():
+        yield output.getvalue()
+
+def encode_batches(fmt, columns, batches):
+    """
+    Потоковая сериализация порций строк в заданный формат
+    Одновременно в памяти находится одна порция
+    """
+    if fmt in ARROW_FORMATS:
+        return _encode_arrow(fmt, columns, batches)
+    return _encode_text(fmt, columns, batches)
+
+def generate_report(kind, fmt='csv', date_from=None, date_to=None):
+    """
+    Выгрузка отчета вида kind в формате fmt по частям (str для текстовых форматов, bytes для колоночных)
+    CSV сводного отчета остается в прежнем виде с русскими заголовками
+    """
+    check_report_format(fmt)
+    if kind == 'restaurants':
+        if fmt == 'csv':
+            return generate_restaurants_report(date_from=date_from, date_to=date_to)
+        return encode_batches(fmt, RESTAURANT_REPORT_COLUMNS, restaurant_report_batches(date_from, date_to))
+    if kind == 'reviews':
+        return encode_batches(fmt, REVIEW_EXPORT_COLUMNS, review_export_batches(date_from, date_to))
+    raise ValueError(f'Неизвестный вид отчета {kind}')
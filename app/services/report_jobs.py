@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import ReportJob, ReportJobStatus
+from app.services.report_export import REPORT_FORMATS, REPORT_KINDS, generate_report
+
+class ReportJobError(ValueError):
+    """
+    Некорректные параметры задания на формирование отчета
+    """
+
+def job_key(kind, params):
+    """
+    Ключ для поиска одинаковых заданий: вид отчета и параметры в каноническом виде
+    """
+    canonical = json.dumps([kind, params], sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class ReportJobQueue:
+    """
+    Очередь заданий на формирование отчетов в локальном пуле потоков
+    
+    Состояние заданий хранится в таблице report_jobs, готовые файлы - в каталоге directory,
+    поэтому внешний брокер не нужен, а статус и файл доступны из любого процесса приложения.
+    Одинаковые задания, пока они ожидают или выполняются, объединяются в одно.
+    Задания, не завершенные за timeout секунд (например, после перезапуска процесса),
+    считаются упавшими и не мешают поставить такое же задание заново.
+    Завершенные задания старше retention секунд удаляются вместе с файлами (0 - хранятся всегда).
+    """
+    
+    def __init__(self, app, workers=2, directory=None, timeout=3600, retention=86400):
+        self.app = app
+        self.directory = os.path.abspath(directory or os.path.join(app.instance_path, 'reports'))
+        self.timeout = timeout
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report-job')
+    
+    def _is_stale(self, job):
+        return job.created_at < datetime.utcnow() - timedelta(seconds=self.timeout)
+    
+    def _fail(self, job, error):
+        job.status = ReportJobStatus.FAILED
+        job.error = error
+        job.active_key = None
+        job.finished_at = datetime.utcnow()
+    
+    def submit(self, kind, params=None, user_id=None):
+        """
+        Постановка задания в очередь
+        Возвращает задание и признак того, что оно создано, а не найдено среди выполняющихся
+        """
+        if not isinstance(kind, str) or kind not in REPORT_KINDS:
+            raise ReportJobError(f'Неизвестный вид отчета {kind!r}')
+        params = params or {}
+        key = job_key(kind, params)
+        
+        existing = ReportJob.query.filter_by(active_key=key).first()
+        if existing is not None:
+            if not self._is_stale(existing):
+                return existing, False
+            self._fail(existing, 'Задание не завершилось вовремя')
+            db.session.commit()
+        
+        job = ReportJob(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            params=json.dumps(params, ensure_ascii=False),
+            active_key=key,
+            status=ReportJobStatus.PENDING,
+            created_by=user_id
+        )
+        db.session.add(job)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Такое же задание одновременно поставил другой запрос
+            db.session.rollback()
+            return ReportJob.query.filter_by(active_key=key).one(), False
+        
+        self._executor.submit(self._run, job.id)
+        return job, True
+    
+    def _run(self, job_id):
+        with self.app.app_context():
+            job = db.session.get(ReportJob, job_id)
+            job.status = ReportJobStatus.RUNNING
+            job.started_at = datetime.utcnow()
+            db.session.commit()
+            
+            params = json.loads(job.params)
+            fmt = params.pop('format', 'csv')
+            path = os.path.join(self.directory, f'{job.id}.{REPORT_FORMATS[fmt][1]}')
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                # Файл появляется под итоговым именем только целиком
+                with open(path + '.tmp', 'wb') as output:
+                    for chunk in generate_report(job.kind, fmt, **params):
+                        output.write(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+                os.replace(path + '.tmp', path)
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.exception('Не удалось сформировать отчет %s', job_id)
+                if os.path.exists(path + '.tmp'):
+                    os.remove(path + '.tmp')
+                job = db.session.get(ReportJob, job_id)
+                self._fail(job, str(e) or type(e).__name__)
+                db.session.commit()
+                return
+            
+            job.status = ReportJobStatus.DONE
+            job.file_path = path
+            job.file_size = os.path.getsize(path)
+            job.active_key = None
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            
+            self.prune()
+    
+    def prune(self):
+        """
+        Удаление завершенных заданий старше retention секунд и их файлов
+        Возвращает количество удаленных заданий
+        """
+        if self.retention <= 0:
+            return 0
+        
+        expired = ReportJob.query.filter(
+            ReportJob.status.in_((ReportJobStatus.DONE, ReportJobStatus.FAILED)),
+            ReportJob.finished_at < datetime.utcnow() - timedelta(seconds=self.retention)
+        ).all()
+        for job in expired:
+            if job.file_path:
+                try:
+                    os.remove(job.file_path)
+                except FileNotFoundError:
+                    pass
+            db.session.delete(job)
+        db.session.commit()
+        return len(expired)
+    
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait)
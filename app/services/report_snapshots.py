@@ -0,0 +1,82 @@
+import glob
+import gzip
+import os
+import uuid
+
+# Размер порции при распаковке снимка для клиентов без поддержки gzip
+READ_CHUNK_SIZE = 64 * 1024
+
+class ReportSnapshotStore:
+    """
+    Сжатые gzip снимки отчетов в каталоге directory, по файлу на отчет и версию данных
+    
+    Снимок записывается попутно с первой выгрузкой отчета для данной версии и
+    появляется под итоговым именем только целиком. Хранятся снимки keep последних
+    версий данных, более старые удаляются после записи нового снимка.
+    """
+    
+    def __init__(self, directory, keep=3, compresslevel=6):
+        self.directory = os.path.abspath(directory)
+        self.keep = keep
+        self.compresslevel = compresslevel
+    
+    def _path(self, name, version):
+        # Номер версии с ведущими нулями, чтобы имена файлов сортировались по версии
+        return os.path.join(self.directory, f'{name}-{version:012d}.gz')
+    
+    def find(self, name, version):
+        """
+        Путь к снимку отчета для версии данных или None, если снимка нет
+        """
+        path = self._path(name, version)
+        return path if os.path.exists(path) else None
+    
+    def write_through(self, name, version, chunks):
+        """
+        Отдает части отчета дальше без изменений и одновременно сохраняет их в снимок
+        Если выгрузка прервана, снимок не сохраняется
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(name, version)
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        
+        try:
+            with gzip.open(tmp_path, 'wb', compresslevel=self.compresslevel) as output:
+                for chunk in chunks:
+                    output.write(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+                    yield chunk
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        
+        self.prune()
+    
+    def read(self, path):
+        """
+        Распакованное содержимое снимка по частям
+        """
+        with gzip.open(path, 'rb') as source:
+            while True:
+                chunk = source.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    
+    def prune(self):
+        """
+        Удаление снимков всех отчетов, кроме снимков keep последних версий данных
+        """
+        snapshots = [
+            (int(os.path.basename(path)[:-len('.gz')].rsplit('-', 1)[1]), path)
+            for path in glob.glob(os.path.join(self.directory, '*-*.gz'))
+        ]
+        versions = sorted({version for version, _ in snapshots})
+        kept = set(versions[-self.keep:]) if self.keep > 0 else set()
+        for version, path in snapshots:
+            if version in kept:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,201 @@
+import csv
+import io
+import json
+from datetime import datetime
+from sqlalchemy import insert, select, update, bindparam
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models import Restaurant, RestaurantRatingStats
+
+SYNC_FORMATS = ('csv', 'ndjson')
+SYNC_FIELDS = ('external_id', 'name', 'address', 'description')
+
+# Количество строк в одной пакетной записи или выборке
+SYNC_CHUNK_SIZE = 1000
+
+# Сколько ошибок отдельных строк возвращать в итогах импорта
+MAX_REPORTED_ERRORS = 100
+
+class RestaurantSyncError(ValueError):
+    """
+    Ошибка формата данных импорта
+    """
+
+def iter_restaurant_records(text_stream, fmt):
+    """
+    Построчное чтение ресторанов из текстового потока без загрузки файла в память
+    Возвращает пары (номер строки, запись)
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(text_stream)
+        if not reader.fieldnames or 'external_id' not in reader.fieldnames or 'name' not in reader.fieldnames:
+            raise RestaurantSyncError('CSV должен содержать заголовок с колонками external_id и name')
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == 'ndjson':
+        for line_number, line in enumerate(text_stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield line_number, record
+    else:
+        raise RestaurantSyncError(f"Неподдерживаемый формат. Допустимые значения: {', '.join(SYNC_FORMATS)}")
+
+def _validate_record(record):
+    if not isinstance(record, dict):
+        return 'Некорректная запись'
+    if not record.get('external_id'):
+        return 'Отсутствует обязательное поле "external_id"'
+    if not isinstance(record['external_id'], (str, int)) or isinstance(record['external_id'], bool):
+        return 'Поле "external_id" должно быть строкой или целым числом'
+    if not record.get('name') or not isinstance(record['name'], str):
+        return 'Отсутствует обязательное поле "name"'
+    for field in ('address', 'description'):
+        if record.get(field) is not None and not isinstance(record[field], str):
+            return f'Поле "{field}" должно быть строкой'
+    if len(str(record['external_id'])) > 64 or len(record['name']) > 100 or len(record.get('address') or '') > 200:
+        return 'Превышена допустимая длина поля'
+    return None
+
+def _upsert_chunk(rows):
+    """
+    Вставка или обновление порции ресторанов по external_id
+    Для SQLite и PostgreSQL используется INSERT ... ON CONFLICT, для остальных СУБД -
+    выборка существующих ключей и раздельные пакетные INSERT и UPDATE
+    """
+    table = Restaurant.__table__
+    dialect = db.session.get_bind().dialect.name
+    
+    if dialect in ('sqlite', 'postgresql'):
+        dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        statement = dialect_insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.external_id],
+            set_={
+                'name': statement.excluded.name,
+                'address': statement.excluded.address,
+                'description': statement.excluded.description,
+                'updated_at': statement.excluded.updated_at
+            }
+        )
+        db.session.execute(statement)
+    else:
+        existing = {
+            external_id: restaurant_id
+            for external_id, restaurant_id in db.session.execute(
+                select(table.c.external_id, table.c.id)
+                .where(table.c.external_id.in_([row['external_id'] for row in rows]))
+            )
+        }
+        
+        new_rows = [row for row in rows if row['external_id'] not in existing]
+        changed_rows = [
+            {**row, 'restaurant_id': existing[row['external_id']]}
+            for row in rows if row['external_id'] in existing
+        ]
+        
+        if new_rows:
+            db.session.execute(insert(table), new_rows)
+        if changed_rows:
+            db.session.execute(
+                update(table)
+                .where(table.c.id == bindparam('restaurant_id'))
+                .values(
+                    name=bindparam('name'),
+                    address=bindparam('address'),
+                    description=bindparam('description'),
+                    updated_at=bindparam('updated_at')
+                ),
+                changed_rows
+            )
+    
+    # Для новых ресторанов создаем пустые агрегаты оценок (ORM события при пакетной вставке не срабатывают)
+    stats_table = RestaurantRatingStats.__table__
+    db.session.execute(insert(stats_table).from_select(
+        ['restaurant_id', 'reviews_count', 'food_rating_sum', 'drinks_rating_sum', 'overall_rating_sum', 'updated_at'],
+        select(table.c.id, 0, 0, 0, 0, table.c.created_at)
+        .outerjoin(stats_table, stats_table.c.restaurant_id == table.c.id)
+        .where(stats_table.c.restaurant_id.is_(None), table.c.external_id.in_([row['external_id'] for row in rows]))
+    ))
+
+def import_restaurants(records, chunk_size=SYNC_CHUNK_SIZE):
+    """
+    Потоковый импорт ресторанов с upsert по external_id
+    Записи обрабатываются порциями по chunk_size, каждая порция фиксируется отдельно
+    Возвращает итоги: количество обработанных и ошибочных строк и первые ошибки
+    """
+    summary = {'processed': 0, 'failed': 0, 'errors': []}
+    chunk = {}
+    
+    def flush():
+        if chunk:
+            _upsert_chunk(list(chunk.values()))
+            db.session.commit()
+            summary['processed'] += len(chunk)
+            chunk.clear()
+    
+    for line_number, record in records:
+        error = _validate_record(record)
+        if error:
+            summary['failed'] += 1
+            if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                summary['errors'].append({'line': line_number, 'message': error})
+            continue
+        
+        now = datetime.utcnow()
+        # Повторы ключа внутри порции схлопываются, побеждает последняя запись
+        chunk[str(record['external_id'])] = {
+            'external_id': str(record['external_id']),
+            'name': record['name'],
+            'address': record.get('address') or None,
+            'description': record.get('description') or None,
+            'created_at': now,
+            'updated_at': now
+        }
+        
+        if len(chunk) >= chunk_size:
+            flush()
+    
+    flush()
+    
+    return summary
+
+def export_restaurants(fmt, chunk_size=SYNC_CHUNK_SIZE):
+    """
+    Потоковая выгрузка всех ресторанов в формате CSV или NDJSON
+    Строки читаются серверным курсором и отдаются порциями по chunk_size
+    """
+    if fmt not in SYNC_FORMATS:
+        raise RestaurantSyncError(f"Неподдерживаемый формат. Допустимые значения: {', '.join(SYNC_FORMATS)}")
+    
+    rows = db.session.query(
+        Restaurant.id,
+        Restaurant.external_id,
+        Restaurant.name,
+        Restaurant.address,
+        Restaurant.description
+    ).order_by(Restaurant.id).yield_per(chunk_size)
+    
+    output = io.StringIO()
+    writer = csv.writer(output) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(('id',) + SYNC_FIELDS)
+    
+    for index, row in enumerate(rows, start=1):
+        if writer:
+            writer.writerow(row)
+        else:
+            output.write(json.dumps(row._asdict(), ensure_ascii=False))
+            output.write('\n')
+        
+        if index % chunk_size == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+    
+    if output.getvalue():
+        yield output.getvalue()
@@ -0,0 +1,172 @@
+import json
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import Review, Restaurant
+from app.services.rating_stats import apply_daily_rating_delta, apply_rating_delta, review_day
+
+REQUIRED_FIELDS = ('restaurant_id', 'food_rating', 'drinks_rating', 'overall_rating')
+RATING_FIELDS = ('food_rating', 'drinks_rating', 'overall_rating')
+
+class ReviewImportError(ValueError):
+    """
+    Ошибка разбора пакета отзывов целиком
+    """
+
+def validate_review_data(data):
+    """
+    Проверка полей отзыва
+    Возвращает текст ошибки или None, если данные корректны
+    """
+    if not isinstance(data, dict) or not all(k in data for k in REQUIRED_FIELDS):
+        return 'Отсутствуют обязательные поля'
+    
+    restaurant_id = data['restaurant_id']
+    if not isinstance(restaurant_id, int) or isinstance(restaurant_id, bool):
+        return 'Поле restaurant_id должно быть целым числом'
+    
+    for rating_field in RATING_FIELDS:
+        rating = data.get(rating_field)
+        if not isinstance(rating, int) or rating < 1 or rating > 5:
+            return f'Поле {rating_field} должно быть целым числом от 1 до 5'
+    
+    return None
+
+def parse_review_batch(stream, content_type, max_items):
+    """
+    Чтение пакета отзывов: JSON массив или NDJSON (по одному отзыву в строке)
+    """
+    if content_type and content_type.startswith(('application/x-ndjson', 'application/jsonl')):
+        items = []
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if len(items) >= max_items:
+                raise ReviewImportError(f'Пакет не может содержать больше {max_items} отзывов')
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                raise ReviewImportError(f'Некорректный JSON в строке {line_number}')
+        return items
+    
+    try:
+        items = json.load(stream)
+    except ValueError:
+        raise ReviewImportError('Некорректный JSON')
+    
+    if not isinstance(items, list):
+        raise ReviewImportError('Ожидается массив отзывов')
+    if len(items) > max_items:
+        raise ReviewImportError(f'Пакет не может содержать больше {max_items} отзывов')
+    
+    return items
+
+def _insert_chunk(rows):
+    """
+    Многострочная вставка порции отзывов, возвращает ID в порядке rows
+    """
+    result = db.session.execute(
+        insert(Review.__table__).returning(Review.__table__.c.id, sort_by_parameter_order=True),
+        rows
+    )
+    return [row.id for row in result]
+
+def _apply_stats(connection, rows):
+    deltas = defaultdict(lambda: [0, 0, 0, 0])
+    daily_deltas = defaultdict(lambda: [0, 0, 0, 0])
+    for row in rows:
+        for delta in (deltas[row['restaurant_id']], daily_deltas[(row['restaurant_id'], review_day(row['created_at']))]):
+            delta[0] += 1
+            delta[1] += row['food_rating']
+            delta[2] += row['drinks_rating']
+            delta[3] += row['overall_rating']
+    
+    for restaurant_id, (count, food, drinks, overall) in deltas.items():
+        apply_rating_delta(connection, restaurant_id, count, food, drinks, overall)
+    for (restaurant_id, day), (count, food, drinks, overall) in daily_deltas.items():
+        apply_daily_rating_delta(connection, restaurant_id, day, count, food, drinks, overall)
+
+def import_reviews(items, current_user, chunk_size=500):
+    """
+    Пакетное создание отзывов от имени current_user (как и одиночный отзыв)
+    
+    Все элементы проверяются заранее, существование ресторанов и уже оставленные
+    пользователем отзывы определяются одним запросом каждое, затем отзывы
+    вставляются многострочными INSERT по chunk_size строк. Повторные отзывы
+    (unique_user_restaurant_review) не прерывают пакет, а попадают в результаты
+    с ошибкой. Агрегаты оценок обновляются в той же транзакции.
+    
+    Возвращает список результатов по каждому элементу в исходном порядке.
+    """
+    results = [None] * len(items)
+    candidates = []
+    
+    for index, data in enumerate(items):
+        error = validate_review_data(data)
+        if error is not None:
+            results[index] = {'index': index, 'status': 'error', 'message': error}
+            continue
+        candidates.append((index, data))
+    
+    restaurant_ids = {data['restaurant_id'] for _, data in candidates}
+    
+    existing_restaurants = set(db.session.scalars(
+        select(Restaurant.id).where(Restaurant.id.in_(restaurant_ids))
+    )) if restaurant_ids else set()
+    reviewed_restaurants = set(db.session.scalars(
+        select(Review.restaurant_id)
+        .where(Review.user_id == current_user.id, Review.restaurant_id.in_(restaurant_ids))
+    )) if restaurant_ids else set()
+    
+    now = datetime.utcnow()
+    pending = []
+    for index, data in candidates:
+        if data['restaurant_id'] not in existing_restaurants:
+            results[index] = {'index': index, 'status': 'error', 'message': 'Ресторан не найден'}
+            continue
+        if data['restaurant_id'] in reviewed_restaurants:
+            results[index] = {'index': index, 'status': 'error', 'message': 'Отзыв для этого ресторана уже существует'}
+            continue
+        
+        reviewed_restaurants.add(data['restaurant_id'])
+        pending.append((index, {
+            'restaurant_id': data['restaurant_id'],
+            'user_id': current_user.id,
+            'food_rating': data['food_rating'],
+            'drinks_rating': data['drinks_rating'],
+            'overall_rating': data['overall_rating'],
+            'comment': data.get('comment', ''),
+            'created_at': now,
+            'updated_at': now
+        }))
+    
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        rows = [row for _, row in chunk]
+        
+        try:
+            with db.session.begin_nested():
+                ids = _insert_chunk(rows)
+                _apply_stats(db.session.connection(), rows)
+            for (index, _), review_id in zip(chunk, ids):
+                results[index] = {'index': index, 'status': 'created', 'id': review_id}
+            continue
+        except IntegrityError:
+            # Отзыв успели создать параллельно - вставляем порцию построчно
+            pass
+        
+        for index, row in chunk:
+            try:
+                with db.session.begin_nested():
+                    review_id = _insert_chunk([row])[0]
+                    _apply_stats(db.session.connection(), [row])
+                results[index] = {'index': index, 'status': 'created', 'id': review_id}
+            except IntegrityError:
+                results[index] = {'index': index, 'status': 'error', 'message': 'Отзыв для этого ресторана уже существует'}
+    
+    db.session.commit()
+    
+    return results
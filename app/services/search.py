@@ -0,0 +1,203 @@
+import base64
+import json
+import re
+from sqlalchemy import event, func, literal_column, or_, table, column, text
+from app import db
+from app.models import Restaurant, Review
+from app.utils.pagination import PaginationError
+
+# Не больше стольких слов из поискового запроса попадает в выражение поиска
+MAX_QUERY_TERMS = 16
+
+# Веса полей ресторана при ранжировании: совпадение в названии важнее описания
+RESTAURANT_NAME_WEIGHT = 10.0
+RESTAURANT_DESCRIPTION_WEIGHT = 1.0
+
+# "ё" не раскладывается токенизатором unicode61, поэтому приводится к "е" и в индексе, и в запросе
+_NORMALIZE_SQL = "replace(replace({}, 'ё', 'е'), 'Ё', 'Е')"
+
+class SearchError(ValueError):
+    """
+    Некорректный поисковый запрос
+    """
+
+# Полнотекстовые индексы SQLite: внешние FTS5 таблицы над restaurants и reviews,
+# синхронизируемые триггерами при любой записи (ORM, пакетные вставки, upsert)
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS restaurants_fts USING fts5("
+    "name, description, content='restaurants', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5("
+    "comment, content='reviews', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+
+    "CREATE TRIGGER IF NOT EXISTS restaurants_fts_ai AFTER INSERT ON restaurants BEGIN "
+    "INSERT INTO restaurants_fts (rowid, name, description) VALUES "
+    f"(new.id, {_NORMALIZE_SQL.format('new.name')}, {_NORMALIZE_SQL.format('new.description')}); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS restaurants_fts_ad AFTER DELETE ON restaurants BEGIN "
+    "INSERT INTO restaurants_fts (restaurants_fts, rowid, name, description) VALUES "
+    f"('delete', old.id, {_NORMALIZE_SQL.format('old.name')}, {_NORMALIZE_SQL.format('old.description')}); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS restaurants_fts_au AFTER UPDATE OF name, description ON restaurants BEGIN "
+    "INSERT INTO restaurants_fts (restaurants_fts, rowid, name, description) VALUES "
+    f"('delete', old.id, {_NORMALIZE_SQL.format('old.name')}, {_NORMALIZE_SQL.format('old.description')}); "
+    "INSERT INTO restaurants_fts (rowid, name, description) VALUES "
+    f"(new.id, {_NORMALIZE_SQL.format('new.name')}, {_NORMALIZE_SQL.format('new.description')}); "
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_ai AFTER INSERT ON reviews BEGIN "
+    f"INSERT INTO reviews_fts (rowid, comment) VALUES (new.id, {_NORMALIZE_SQL.format('new.comment')}); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_ad AFTER DELETE ON reviews BEGIN "
+    "INSERT INTO reviews_fts (reviews_fts, rowid, comment) VALUES "
+    f"('delete', old.id, {_NORMALIZE_SQL.format('old.comment')}); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_au AFTER UPDATE OF comment ON reviews BEGIN "
+    "INSERT INTO reviews_fts (reviews_fts, rowid, comment) VALUES "
+    f"('delete', old.id, {_NORMALIZE_SQL.format('old.comment')}); "
+    f"INSERT INTO reviews_fts (rowid, comment) VALUES (new.id, {_NORMALIZE_SQL.format('new.comment')}); "
+    "END",
+]
+
+# Заполнение индексов SQLite по уже существующим данным
+SQLITE_SEARCH_REBUILD = [
+    "INSERT INTO restaurants_fts (restaurants_fts) VALUES ('delete-all')",
+    "INSERT INTO restaurants_fts (rowid, name, description) "
+    f"SELECT id, {_NORMALIZE_SQL.format('name')}, {_NORMALIZE_SQL.format('description')} FROM restaurants",
+    "INSERT INTO reviews_fts (reviews_fts) VALUES ('delete-all')",
+    f"INSERT INTO reviews_fts (rowid, comment) SELECT id, {_NORMALIZE_SQL.format('comment')} FROM reviews",
+]
+
+# PostgreSQL: вычисляемые tsvector колонки (обновляются самой СУБД) и GIN индексы
+POSTGRESQL_SEARCH_DDL = [
+    "ALTER TABLE restaurants ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_restaurants_search_vector ON restaurants USING GIN (search_vector)",
+    "ALTER TABLE reviews ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "to_tsvector('russian', coalesce(comment, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_reviews_search_vector ON reviews USING GIN (search_vector)",
+]
+
+def create_search_index(connection):
+    """
+    Создание полнотекстовых индексов для текущей СУБД (повторный вызов безопасен)
+    """
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            connection.execute(text(statement))
+    elif dialect == 'postgresql':
+        for statement in POSTGRESQL_SEARCH_DDL:
+            connection.execute(text(statement))
+
+def _on_metadata_create(target, connection, **kw):
+    create_search_index(connection)
+
+def register_search_listeners():
+    """
+    Создание полнотекстовых индексов вместе с таблицами при db.create_all()
+    В развернутых базах индексы создаются миграцией
+    """
+    if not event.contains(db.metadata, 'after_create', _on_metadata_create):
+        event.listen(db.metadata, 'after_create', _on_metadata_create)
+
+def rebuild_search_index():
+    """
+    Полная переиндексация ресторанов и отзывов (для SQLite)
+    В PostgreSQL tsvector колонки вычисляются СУБД и переиндексация не требуется
+    """
+    connection = db.session.connection()
+    if connection.dialect.name == 'sqlite':
+        create_search_index(connection)
+        for statement in SQLITE_SEARCH_REBUILD:
+            connection.execute(text(statement))
+    db.session.commit()
+
+def search_terms(query):
+    """
+    Разбиение поискового запроса на слова
+    Служебный синтаксис FTS5 и tsquery не пропускается: в поиск попадают только буквы и цифры
+    """
+    terms = re.findall(r'\w+', (query or '').replace('ё', 'е').replace('Ё', 'Е'))
+    if not terms:
+        raise SearchError('Поисковый запрос не должен быть пустым')
+    return terms[:MAX_QUERY_TERMS]
+
+def encode_search_cursor(offset):
+    """
+    Курсор страницы результатов поиска: результаты упорядочены по релевантности,
+    поэтому позиция задается смещением
+    """
+    payload = json.dumps({'offset': offset})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_search_cursor(cursor):
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        offset = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))['offset']
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError
+    except (ValueError, TypeError, KeyError, UnicodeError):
+        raise PaginationError('Некорректный курсор')
+    return offset
+
+def _ranked_query(query, model, fts_name, terms, fields, weights=()):
+    """
+    Добавляет к запросу полнотекстовое условие и сортировку по релевантности
+    """
+    dialect = db.session.get_bind().dialect.name
+    
+    if dialect == 'sqlite':
+        fts = table(fts_name, column('rowid'))
+        # Каждое слово ищется как префикс, слова объединяются по И
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return (
+            query.join(fts, fts.c.rowid == model.id)
+            .filter(literal_column(fts_name).op('MATCH')(match))
+            .order_by(func.bm25(literal_column(fts_name), *weights), model.id)
+        )
+    
+    if dialect == 'postgresql':
+        search_vector = literal_column(f'{model.__tablename__}.search_vector')
+        tsquery = func.to_tsquery('russian', ' & '.join(f'{term}:*' for term in terms))
+        return (
+            query.filter(search_vector.op('@@')(tsquery))
+            .order_by(func.ts_rank_cd(search_vector, tsquery).desc(), model.id)
+        )
+    
+    # Прочие СУБД: поиск подстрокой без ранжирования
+    return query.filter(*(
+        or_(*(field.ilike(f'%{term}%') for field in fields))
+        for term in terms
+    )).order_by(model.id)
+
+def _paginate(query, limit, offset):
+    items = query.limit(limit + 1).offset(offset).all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_search_cursor(offset + limit)
+    return items, next_cursor
+
+def search_restaurants(query, limit, offset=0):
+    """
+    Поиск ресторанов по названию и описанию, результаты упорядочены по релевантности
+    Возвращает элементы страницы и курсор следующей страницы (или None)
+    """
+    ranked = _ranked_query(
+        Restaurant.query, Restaurant, 'restaurants_fts', search_terms(query),
+        (Restaurant.name, Restaurant.description),
+        (RESTAURANT_NAME_WEIGHT, RESTAURANT_DESCRIPTION_WEIGHT)
+    )
+    return _paginate(ranked, limit, offset)
+
+def search_reviews(query, limit, offset=0):
+    """
+    Поиск отзывов по тексту комментария, результаты упорядочены по релевантности
+    """
+    ranked = _ranked_query(Review.query, Review, 'reviews_fts', search_terms(query), (Review.comment,))
+    return _paginate(ranked, limit, offset)
@@ -0,0 +1,162 @@
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+# Тело запроса до этого размера держится в памяти, больше - во временном файле
+MAX_BODY_IN_MEMORY = 1024 * 1024
+
+class ClientDisconnected(Exception):
+    """
+    Клиент закрыл соединение, пока приложение формировало ответ
+    """
+
+def build_environ(scope, body):
+    """
+    WSGI окружение из ASGI scope
+    """
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    
+    if scope.get('client'):
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+    
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = name
+        else:
+            key = f'HTTP_{name}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    
+    return environ
+
+class WSGIToASGI:
+    """
+    ASGI приложение, обслуживающее WSGI приложение в пуле потоков
+    
+    Тело запроса полностью читается в цикле событий до передачи запроса в поток,
+    а ответ отправляется клиенту асинхронно, поэтому медленные клиенты держат только
+    соединение, но не поток обработчика. Потоков в пуле нужно столько, сколько
+    запросов одновременно ждут базу данных. Тело больше MAX_CONTENT_LENGTH приложения
+    не дочитывается, клиент получает 413.
+    """
+    
+    def __init__(self, wsgi_app, workers=32):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='wsgi')
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f"Неподдерживаемый тип соединения {scope['type']}")
+        
+        max_size = self._max_body_size()
+        with SpooledTemporaryFile(max_size=MAX_BODY_IN_MEMORY) as body:
+            size = 0
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    return
+                chunk = message.get('body', b'')
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    await self._send_too_large(send)
+                    return
+                body.write(chunk)
+                if not message.get('more_body'):
+                    break
+            body.seek(0)
+            
+            # Тело прочитано целиком: длина известна и для запросов с Transfer-Encoding: chunked
+            environ = build_environ(scope, body)
+            environ['CONTENT_LENGTH'] = str(size)
+            environ['wsgi.input_terminated'] = True
+            
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, self._run, environ, send, loop)
+    
+    def _max_body_size(self):
+        """
+        Ограничение размера тела запроса из MAX_CONTENT_LENGTH приложения (None - без ограничения)
+        """
+        config = getattr(self.wsgi_app, 'config', None)
+        return config.get('MAX_CONTENT_LENGTH') if config is not None else None
+    
+    async def _send_too_large(self, send):
+        body = '{"message": "Размер запроса превышает допустимый"}'.encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': 413,
+            'headers': [(b'content-type', b'application/json; charset=utf-8'), (b'content-length', str(len(body)).encode('latin-1'))]
+        })
+        await send({'type': 'http.response.body', 'body': body, 'more_body': False})
+    
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    def _run(self, environ, send, loop):
+        """
+        Выполнение WSGI приложения в потоке пула; каждое сообщение ответа
+        передается в цикл событий и отправляется до следующего фрагмента
+        """
+        response = {}
+        
+        def send_message(message):
+            try:
+                asyncio.run_coroutine_threadsafe(send(message), loop).result()
+            except (OSError, RuntimeError) as e:
+                raise ClientDisconnected() from e
+        
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response.get('sent'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+        
+        def send_start():
+            if not response.get('sent'):
+                response['sent'] = True
+                send_message({'type': 'http.response.start', 'status': response['status'], 'headers': response['headers']})
+        
+        iterable = self.wsgi_app(environ, start_response)
+        try:
+            for chunk in iterable:
+                if chunk:
+                    send_start()
+                    send_message({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            send_start()
+            send_message({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        except ClientDisconnected:
+            pass
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
@@ -1,8 +1,98 @@
+from collections import namedtuple
 from functools import wraps
-from flask import jsonify, request
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask import jsonify, request, current_app, g
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt, create_access_token
+from app import db, jwt
 from app.models import User, UserRole
 
+class CurrentUser(namedtuple('CurrentUser', ['id', 'role', 'token_version'])):
+    """
+    Минимальные данные пользователя, достаточные для проверки прав и актуальности токена
+    """
+    
+    def is_admin(self):
+        return self.role == UserRole.ADMIN.value
+
+def _get_user_cache():
+    return current_app.extensions.get('user_cache')
+
+def load_user_state(user_id):
+    """
+    Получение роли и версии токенов пользователя
+    Данные берутся из кэша процесса (USER_CACHE_TTL секунд), чтобы не обращаться к БД на каждом запросе.
+    Кэш не общий: invalidate_user_cache сбрасывает его только в текущем процессе, остальные
+    процессы видят смену роли или пароля не позже чем через USER_CACHE_TTL секунд
+    """
+    cache = _get_user_cache()
+    if cache is not None:
+        state = cache.get(user_id)
+        if state is not None:
+            return state
+    
+    row = db.session.query(User.id, User.role, User.token_version).filter_by(id=user_id).first()
+    if not row:
+        return None
+    
+    state = CurrentUser(row.id, row.role, row.token_version)
+    if cache is not None:
+        cache.set(user_id, state)
+    
+    return state
+
+def create_user_token(user):
+    """
+    Выдача JWT токена с ролью и версией токенов пользователя в дополнительных claims
+    """
+    return create_access_token(
+        identity=str(user.id),
+        additional_claims={'role': user.role, 'ver': user.token_version or 0}
+    )
+
+@jwt.token_in_blocklist_loader
+def is_token_revoked(jwt_header, jwt_payload):
+    """
+    Токен отозван, если пользователь удален, версия его токенов изменилась
+    (смена роли или пароля) или роль в токене не совпадает с текущей
+    (например, ID удаленного пользователя достался новому)
+    Проверка идет по данным из load_user_state, поэтому в других процессах
+    отзыв вступает в силу с задержкой до USER_CACHE_TTL секунд
+    """
+    state = load_user_state(int(jwt_payload['sub']))
+    if state is None or jwt_payload.get('ver', 0) != state.token_version:
+        return True
+    return 'role' in jwt_payload and jwt_payload['role'] != state.role
+
+@jwt.revoked_token_loader
+def revoked_token_response(jwt_header, jwt_payload):
+    return jsonify({'message': 'Токен отозван. Выполните вход повторно.'}), 401
+
+def get_current_identity():
+    """
+    Получение id и роли текущего пользователя из JWT токена
+    Роль берется из проверенных claims токена, для токенов без роли - из кэша или БД
+    Результат вычисляется не более одного раза за запрос и хранится в flask.g
+    """
+    if '_current_identity' not in g:
+        verify_jwt_in_request()
+        claims = get_jwt()
+        if 'role' in claims:
+            g._current_identity = CurrentUser(int(claims['sub']), claims['role'], claims.get('ver', 0))
+        else:
+            g._current_identity = load_user_state(int(get_jwt_identity()))
+    
+    return g._current_identity
+
+def invalidate_user_cache(user_id):
+    """
+    Сброс закэшированных данных пользователя (после изменения или удаления)
+    """
+    cache = _get_user_cache()
+    if cache is not None:
+        cache.delete(user_id)
+    
+    g.pop('_current_identity', None)
+    g.pop('_current_user', None)
+
 def admin_required():
     """
     Декоратор для проверки, что пользователь является администратором
@@ -11,10 +101,9 @@ def admin_required():
         @wraps(fn)
         def decorator(*args, **kwargs):
             verify_jwt_in_request()
-            user_id = get_jwt_identity()
-            user = User.query.get(int(user_id))
+            user = get_current_identity()
             
-            if not user or user.role != UserRole.ADMIN.value:
+            if not user or not user.is_admin():
                 return jsonify({"message": "Доступ запрещен. Требуются права администратора."}), 403
             
             return fn(*args, **kwargs)
@@ -26,9 +115,10 @@ def get_current_user():
     Получение текущего пользователя из JWT токена
     """
     try:
-        verify_jwt_in_request()
-        user_id = get_jwt_identity()
-        return User.query.get(int(user_id))
+        if '_current_user' not in g:
+            verify_jwt_in_request()
+            g._current_user = db.session.get(User, int(get_jwt_identity()))
+        return g._current_user
     except:
         return None
 
@@ -36,7 +126,10 @@ def user_can_view_user(user_id):
     """
     Проверка, может ли текущий пользователь просматривать информацию о пользователе с указанным ID
     """
-    current_user = get_current_user()
+    try:
+        current_user = get_current_identity()
+    except:
+        return False
     
     if not current_user:
         return False
@@ -50,7 +143,10 @@ def user_can_view_review(review):
     """
     Проверка, может ли текущий пользователь просматривать отзыв
     """
-    current_user = get_current_user()
+    try:
+        current_user = get_current_identity()
+    except:
+        return False
     
     if not current_user:
         return False
@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+def _env_flag(name, default):
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes')
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool, который учитывает время ожидания свободного соединения
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.wait_count += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+def build_engine_options(database_uri):
+    """
+    Параметры движка SQLAlchemy из переменных окружения
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING,
+    DB_STATEMENT_TIMEOUT (мс, для PostgreSQL)
+    """
+    url = make_url(database_uri)
+    if _is_memory_sqlite(url):
+        # Для базы в памяти Flask-SQLAlchemy использует StaticPool с одним соединением
+        return {}
+    
+    options = {
+        'poolclass': TimedQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': _env_flag('DB_POOL_PRE_PING', 'true'),
+    }
+    
+    statement_timeout = os.getenv('DB_STATEMENT_TIMEOUT')
+    if statement_timeout and url.get_backend_name() == 'postgresql':
+        options['connect_args'] = {'options': f'-c statement_timeout={int(statement_timeout)}'}
+    
+    return options
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute(f"PRAGMA busy_timeout={int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))}")
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.close()
+
+def configure_engine(engine):
+    """
+    Настройки, применяемые к соединениям: для файловых SQLite баз включаются WAL,
+    busy_timeout и synchronous=NORMAL
+    """
+    if engine.dialect.name == 'sqlite' and not _is_memory_sqlite(engine.url):
+        if not event.contains(engine, 'connect', _set_sqlite_pragmas):
+            event.listen(engine, 'connect', _set_sqlite_pragmas)
+
+def pool_status(engine):
+    """
+    Состояние пула соединений: занятые, свободные и сверх лимита соединения, время ожидания
+    """
+    pool = engine.pool
+    status = {
+        'engine': engine.url.render_as_string(hide_password=True),
+        'pool_class': type(pool).__name__,
+    }
+    
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+        })
+    
+    if isinstance(pool, TimedQueuePool):
+        status.update({
+            'wait_count': pool.wait_count,
+            'wait_total_seconds': round(pool.wait_total, 6),
+            'wait_max_seconds': round(pool.wait_max, 6),
+            'wait_avg_seconds': round(pool.wait_total / pool.wait_count, 6) if pool.wait_count else 0.0,
+            'timeouts': pool.timeouts,
+        })
+    
+    return status
@@ -0,0 +1,77 @@
+import itertools
+import threading
+from functools import wraps
+from flask import g, has_app_context, current_app
+from flask_sqlalchemy.session import Session
+
+# Префикс ключей SQLALCHEMY_BINDS для реплик
+REPLICA_BIND_PREFIX = 'replica_'
+
+class RoutingSession(Session):
+    """
+    Сессия, направляющая чтения в обработчиках, помеченных use_replica, на реплики
+    
+    Запись (flush, INSERT/UPDATE/DELETE) всегда идет в основную БД и помечает запрос,
+    после чего все последующие чтения в этом же запросе тоже идут в основную БД
+    (чтение собственных записей).
+    """
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is not None:
+            return bind
+        
+        is_read = clause is not None and getattr(clause, 'is_select', False) and not self._flushing
+        
+        if not is_read:
+            if has_app_context() and (self._flushing or clause is not None):
+                g._db_wrote = True
+        elif _replica_allowed():
+            engine = _next_replica()
+            if engine is not None:
+                return engine
+        
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def _replica_allowed():
+    return has_app_context() and g.get('_db_read_only', False) and not g.get('_db_wrote', False)
+
+_replica_lock = threading.Lock()
+
+def _next_replica():
+    """
+    Выбор реплики по кругу
+    """
+    replicas = current_app.extensions.get('db_replicas')
+    if not replicas:
+        return None
+    
+    with _replica_lock:
+        key = next(replicas)
+    return current_app.extensions['sqlalchemy'].engines[key]
+
+def build_replica_binds(replica_uris, engine_options_factory):
+    """
+    SQLALCHEMY_BINDS для списка URI реплик (через запятую)
+    """
+    uris = [uri.strip() for uri in (replica_uris or '').split(',') if uri.strip()]
+    return {
+        f'{REPLICA_BIND_PREFIX}{index}': {'url': uri, **engine_options_factory(uri)}
+        for index, uri in enumerate(uris, start=1)
+    }
+
+def init_replicas(app):
+    """
+    Регистрация реплик, заданных в SQLALCHEMY_BINDS
+    """
+    keys = sorted(key for key in app.config.get('SQLALCHEMY_BINDS', {}) if key.startswith(REPLICA_BIND_PREFIX))
+    app.extensions['db_replicas'] = itertools.cycle(keys) if keys else None
+
+def use_replica(fn):
+    """
+    Декоратор для обработчиков только на чтение: их запросы могут обслуживаться репликами
+    """
+    @wraps(fn)
+    def decorator(*args, **kwargs):
+        g._db_read_only = True
+        return fn(*args, **kwargs)
+    return decorator
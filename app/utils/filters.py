@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+from flask import request
+
+class FilterError(ValueError):
+    """
+    Ошибка разбора параметров фильтрации
+    """
+
+def get_int_arg(name, minimum=None, maximum=None):
+    """
+    Целочисленный параметр строки запроса (None, если не передан)
+    """
+    value = request.args.get(name)
+    if value is None or value == '':
+        return None
+    
+    try:
+        value = int(value)
+    except ValueError:
+        raise FilterError(f'Параметр {name} должен быть целым числом')
+    
+    if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+        raise FilterError(f'Параметр {name} должен быть от {minimum} до {maximum}')
+    
+    return value
+
+def get_datetime_arg(name):
+    """
+    Параметр строки запроса с датой и временем в формате ISO 8601 (None, если не передан)
+    """
+    value = request.args.get(name)
+    if not value:
+        return None
+    
+    try:
+        value = datetime.fromisoformat(value)
+    except ValueError:
+        raise FilterError(f'Параметр {name} должен быть датой в формате ISO 8601')
+    
+    # Даты в базе хранятся в UTC без часового пояса
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    return value
@@ -0,0 +1,46 @@
+import hashlib
+from datetime import timezone
+from flask import request, current_app
+
+def make_etag(*parts):
+    """
+    Строгий ETag из значений, определяющих версию данных
+    """
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+def _as_utc(value):
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+def not_modified_response(etag, last_modified=None):
+    """
+    Возвращает ответ 304, если данные у клиента актуальны (If-None-Match / If-Modified-Since)
+    Иначе возвращает None, и запрос обрабатывается как обычно
+    If-Modified-Since учитывается только при отсутствии If-None-Match
+    """
+    last_modified = _as_utc(last_modified)
+    
+    if request.if_none_match:
+        fresh = request.if_none_match.contains(etag)
+    elif request.if_modified_since and last_modified:
+        fresh = last_modified <= request.if_modified_since
+    else:
+        fresh = False
+    
+    if not fresh:
+        return None
+    
+    response = current_app.response_class(status=304)
+    set_validators(response, etag, last_modified)
+    return response
+
+def set_validators(response, etag, last_modified=None):
+    """
+    Добавляет к ответу ETag, Last-Modified и требование перепроверки перед использованием кэша
+    """
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = _as_utc(last_modified)
+    response.cache_control.no_cache = True
+    return response
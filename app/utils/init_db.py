@@ -1,6 +1,22 @@
+import random
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import insert, func
 from app import db, create_app
 from app.models import User, Restaurant, Review, UserRole
 
+# Словари для названий и комментариев синтетических данных
+CUISINES = ('Итальянская', 'Японская', 'Грузинская', 'Русская', 'Французская', 'Индийская', 'Мексиканская', 'Вьетнамская')
+PLACES = ('кухня', 'таверна', 'бистро', 'траттория', 'столовая', 'кофейня', 'бар', 'дворик')
+STREETS = ('Пушкина', 'Ленина', 'Гагарина', 'Тверская', 'Садовая', 'Мира', 'Лесная', 'Советская')
+COMMENTS = (
+    'Отличная кухня, вернемся еще', 'Долго ждали заказ', 'Уютно и недорого', 'Вкусные десерты',
+    'Обслуживание могло быть лучше', 'Большие порции', 'Хорошая винная карта', 'Шумно, но вкусно'
+)
+
+# Количество строк в одном многострочном INSERT при генерации данных
+SEED_CHUNK_SIZE = 5000
+
 def init_db():
     """
     Инициализация базы данных тестовыми данными
@@ -95,5 +111,82 @@ def init_db():
         
         print("База данных успешно инициализирована тестовыми данными.")
 
+def _insert_returning_ids(table, rows, chunk_size):
+    ids = []
+    for start in range(0, len(rows), chunk_size):
+        result = db.session.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True),
+            rows[start:start + chunk_size]
+        )
+        ids.extend(row.id for row in result)
+    return ids
+
+def seed_synthetic_data(users, restaurants, reviews, password='user123', seed=None, chunk_size=SEED_CHUNK_SIZE):
+    """
+    Генерация N пользователей, M ресторанов и K отзывов многострочными вставками
+    
+    Отзывы распределяются по случайным различным парам (пользователь, ресторан) среди
+    созданных записей, поэтому unique_user_restaurant_review не нарушается; оценки
+    лежат в диапазоне 1-5. Все пользователи получают один пароль (хэш считается один раз).
+    Возвращает количество созданных пользователей, ресторанов и отзывов.
+    """
+    if reviews > users * restaurants:
+        raise ValueError(f'Отзывов не может быть больше, чем пар пользователь-ресторан ({users * restaurants})')
+    
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    # Номера продолжают уже существующих пользователей, чтобы повторный запуск не нарушал уникальность имен
+    offset = (db.session.query(func.max(User.id)).scalar() or 0) + 1
+    password_hash = current_app.extensions['password_hasher'].hash(password)
+    
+    user_ids = _insert_returning_ids(User.__table__, [
+        {
+            'username': f'user_{offset + index}',
+            'email': f'user_{offset + index}@example.com',
+            'password_hash': password_hash,
+            'role': UserRole.RESPONDENT.value,
+            'token_version': 0,
+            'created_at': now - timedelta(seconds=users - index),
+            'updated_at': now
+        }
+        for index in range(users)
+    ], chunk_size)
+    
+    restaurant_ids = _insert_returning_ids(Restaurant.__table__, [
+        {
+            'name': f'{rng.choice(CUISINES)} {rng.choice(PLACES)} №{index + 1}',
+            'address': f'ул. {rng.choice(STREETS)}, {rng.randint(1, 200)}',
+            'description': f'{rng.choice(CUISINES)} кухня, {rng.choice(PLACES)}',
+            'created_at': now - timedelta(seconds=restaurants - index),
+            'updated_at': now
+        }
+        for index in range(restaurants)
+    ], chunk_size)
+    
+    # Номер пары i соответствует пользователю i // M и ресторану i % M
+    pairs = rng.sample(range(users * restaurants), reviews)
+    review_table = Review.__table__
+    for start in range(0, reviews, chunk_size):
+        db.session.execute(insert(review_table), [
+            {
+                'user_id': user_ids[pair // restaurants],
+                'restaurant_id': restaurant_ids[pair % restaurants],
+                'food_rating': rng.randint(1, 5),
+                'drinks_rating': rng.randint(1, 5),
+                'overall_rating': rng.randint(1, 5),
+                'comment': rng.choice(COMMENTS),
+                'created_at': now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+                'updated_at': now
+            }
+            for pair in pairs[start:start + chunk_size]
+        ])
+    db.session.commit()
+    
+    # Отзывы вставлены в обход ORM, поэтому агрегаты оценок пересчитываются целиком
+    from app.services.rating_stats import rebuild_rating_stats
+    rebuild_rating_stats()
+    
+    return len(user_ids), len(restaurant_ids), reviews
+
 if __name__ == "__main__":
     init_db()
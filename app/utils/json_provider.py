@@ -0,0 +1,118 @@
+import abc
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - необязательная зависимость
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - необязательная зависимость
+    msgspec = None
+
+JSON_PROVIDERS = ('auto', 'orjson', 'msgspec', 'stdlib')
+
+def _default(value):
+    """
+    Сериализация типов, которые не поддерживает стандартный json
+    Даты и время отдаются в ISO 8601, как в to_dict моделей
+    """
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Объект типа {type(value).__name__} не сериализуется в JSON')
+
+class _BytesJSONProvider(JSONProvider, abc.ABC):
+    """
+    Базовый провайдер для библиотек, которые сериализуют сразу в bytes:
+    тело ответа формируется без промежуточной строки
+    """
+    
+    mimetype = 'application/json'
+    
+    @abc.abstractmethod
+    def dumps_bytes(self, obj):
+        """
+        Сериализация объекта в bytes
+        """
+    
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj).decode('utf-8')
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
+
+class OrjsonProvider(_BytesJSONProvider):
+    """
+    JSON провайдер на orjson: datetime, dataclass и UUID сериализуются нативно
+    """
+    
+    def dumps_bytes(self, obj):
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+class MsgspecProvider(_BytesJSONProvider):
+    """
+    JSON провайдер на msgspec
+    """
+    
+    def __init__(self, app):
+        super().__init__(app)
+        self._encoder = msgspec.json.Encoder(enc_hook=_default)
+        self._decoder = msgspec.json.Decoder()
+    
+    def dumps_bytes(self, obj):
+        return self._encoder.encode(obj)
+    
+    def loads(self, s, **kwargs):
+        return self._decoder.decode(s)
+
+class StdlibJSONProvider(JSONProvider):
+    """
+    JSON провайдер на стандартном модуле json (если быстрые библиотеки не установлены)
+    """
+    
+    mimetype = 'application/json'
+    
+    def dumps(self, obj, **kwargs):
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('ensure_ascii', False)
+        kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs)
+    
+    def loads(self, s, **kwargs):
+        return json.loads(s, **kwargs)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(f'{self.dumps(obj)}\n', mimetype=self.mimetype)
+
+def json_provider_class(name='auto'):
+    """
+    Класс JSON провайдера по имени: orjson, msgspec, stdlib или auto (первый доступный)
+    """
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f"Неизвестный JSON провайдер {name!r}. Допустимые значения: {', '.join(JSON_PROVIDERS)}")
+    
+    if name in ('auto', 'orjson') and orjson is not None:
+        return OrjsonProvider
+    if name in ('auto', 'msgspec') and msgspec is not None:
+        return MsgspecProvider
+    if name != 'auto' and name != 'stdlib':
+        raise ValueError(f'JSON провайдер {name} недоступен: библиотека не установлена')
+    
+    return StdlibJSONProvider
@@ -0,0 +1,200 @@
+import bisect
+import hmac
+import threading
+import time
+from flask import current_app, g, has_request_context, jsonify, request
+from sqlalchemy import event
+
+# Границы корзин гистограмм
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+RESPONSE_SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+class Histogram:
+    """
+    Гистограмма в формате Prometheus: накопительные корзины, сумма и количество наблюдений
+    """
+    
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+class RequestMetrics:
+    """
+    Метрики запросов текущего процесса по эндпоинтам: задержка, количество и время
+    SQL запросов, размер ответа и количество ответов по статусам
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}
+        self.sql_queries = {}
+        self.sql_seconds = {}
+        self.response_size = {}
+        self.responses = {}
+    
+    def observe(self, endpoint, method, status, duration, queries, sql_seconds, size):
+        key = (endpoint, method)
+        with self._lock:
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(duration)
+            self.sql_queries.setdefault(key, Histogram(QUERY_COUNT_BUCKETS)).observe(queries)
+            self.sql_seconds[key] = self.sql_seconds.get(key, 0.0) + sql_seconds
+            if size is not None:
+                self.response_size.setdefault(key, Histogram(RESPONSE_SIZE_BUCKETS)).observe(size)
+            status_key = (endpoint, method, str(status))
+            self.responses[status_key] = self.responses.get(status_key, 0) + 1
+    
+    def render(self):
+        """
+        Метрики в текстовом формате Prometheus
+        """
+        lines = []
+        with self._lock:
+            _render_counter(
+                lines, 'http_requests_total', 'Количество обработанных запросов',
+                ('endpoint', 'method', 'status'), self.responses
+            )
+            _render_histogram(
+                lines, 'http_request_duration_seconds', 'Время обработки запроса', self.latency
+            )
+            _render_histogram(
+                lines, 'http_request_sql_queries', 'Количество SQL запросов за один HTTP запрос', self.sql_queries
+            )
+            _render_counter(
+                lines, 'http_request_sql_duration_seconds_total', 'Суммарное время выполнения SQL запросов',
+                ('endpoint', 'method'), self.sql_seconds
+            )
+            _render_histogram(
+                lines, 'http_response_size_bytes', 'Размер тела ответа', self.response_size
+            )
+        return '\n'.join(lines) + '\n'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+def _render_counter(lines, name, help_text, label_names, values):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} counter')
+    for key, value in sorted(values.items()):
+        lines.append(f'{name}{{{_labels(label_names, key)}}} {value}')
+
+def _render_histogram(lines, name, help_text, histograms):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for key, histogram in sorted(histograms.items()):
+        labels = _labels(('endpoint', 'method'), key)
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{{{labels},le="{_format_bound(bound)}"}} {count}')
+        lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+        lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    if has_request_context() and hasattr(g, '_metrics_started'):
+        g._sql_queries += 1
+        g._sql_seconds += time.perf_counter() - started
+
+def _handle_error(context):
+    # После ошибки after_cursor_execute не вызывается, убираем отметку времени сами
+    if context.connection is not None and context.connection.info.get('query_started'):
+        context.connection.info['query_started'].pop()
+
+def instrument_engine(engine):
+    """
+    Подсчет SQL запросов и времени их выполнения в рамках HTTP запроса
+    """
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+
+def _start_timer():
+    g._metrics_started = time.perf_counter()
+    g._sql_queries = 0
+    g._sql_seconds = 0.0
+
+def _record_request(response):
+    started = g.pop('_metrics_started', None)
+    if started is None:
+        return response
+    
+    duration = time.perf_counter() - started
+    queries = g.get('_sql_queries', 0)
+    sql_seconds = g.get('_sql_seconds', 0.0)
+    endpoint = request.endpoint or 'unmatched'
+    
+    current_app.extensions['request_metrics'].observe(
+        endpoint, request.method, response.status_code, duration, queries, sql_seconds,
+        None if response.is_streamed else response.calculate_content_length()
+    )
+    
+    if current_app.config['SERVER_TIMING_ENABLED']:
+        response.headers.add(
+            'Server-Timing',
+            f'app;dur={duration * 1000:.2f}, db;dur={sql_seconds * 1000:.2f};desc="{queries} queries"'
+        )
+    
+    threshold = current_app.config['METRICS_QUERY_WARN_THRESHOLD']
+    if threshold and queries > threshold:
+        current_app.logger.warning(
+            'Запрос %s %s (%s) выполнил %d SQL запросов при пороге %d',
+            request.method, request.path, endpoint, queries, threshold
+        )
+    
+    return response
+
+def _render_metrics():
+    body = current_app.extensions['request_metrics'].render()
+    return current_app.response_class(body, mimetype=None, content_type=PROMETHEUS_CONTENT_TYPE)
+
+def metrics_view():
+    """
+    Метрики запросов текущего процесса в формате Prometheus
+    Доступ по токену METRICS_TOKEN в заголовке Authorization: Bearer, а если он не задан -
+    только администраторам (JWT)
+    """
+    token = current_app.config['METRICS_TOKEN']
+    if not token:
+        from app.utils.auth import admin_required
+        return admin_required()(_render_metrics)()
+    
+    authorization = request.headers.get('Authorization', '').encode('utf-8')
+    if not hmac.compare_digest(authorization, f'Bearer {token}'.encode('utf-8')):
+        return jsonify({'message': 'Неверный токен доступа к метрикам'}), 401
+    return _render_metrics()
+
+def init_metrics(app, engines):
+    """
+    Подключение сбора метрик запросов к приложению и движкам БД
+    """
+    app.extensions['request_metrics'] = RequestMetrics()
+    for engine in engines:
+        instrument_engine(engine)
+    
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -0,0 +1,119 @@
+import base64
+import json
+from datetime import datetime
+from flask import current_app, request
+from sqlalchemy import and_, or_
+
+class PaginationError(ValueError):
+    """
+    Ошибка разбора параметров пагинации (limit / cursor)
+    """
+
+def encode_cursor(created_at, item_id):
+    """
+    Кодирует позицию (created_at, id) в непрозрачную строку курсора
+    """
+    payload = json.dumps([created_at.isoformat(), item_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Декодирует курсор обратно в пару (created_at, id)
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        created_at = datetime.fromisoformat(created_at)
+        if not isinstance(item_id, int):
+            raise ValueError
+    except (ValueError, TypeError, UnicodeError):
+        raise PaginationError('Некорректный курсор')
+    return created_at, item_id
+
+def get_limit_arg():
+    """
+    Извлекает limit из строки запроса с учетом серверного максимума
+    """
+    default_limit = current_app.config['PAGINATION_DEFAULT_LIMIT']
+    max_limit = current_app.config['PAGINATION_MAX_LIMIT']
+    
+    try:
+        limit = int(request.args.get('limit', default_limit))
+    except ValueError:
+        raise PaginationError('Параметр limit должен быть целым числом')
+    if limit < 1:
+        raise PaginationError('Параметр limit должен быть положительным')
+    
+    return min(limit, max_limit)
+
+def get_sort_arg():
+    """
+    Направление сортировки по дате создания: sort=created_at (по умолчанию) или sort=-created_at
+    Возвращает True для сортировки по убыванию
+    """
+    sort = request.args.get('sort', 'created_at')
+    if sort not in ('created_at', '-created_at'):
+        raise PaginationError('Параметр sort должен быть created_at или -created_at')
+    return sort.startswith('-')
+
+def get_pagination_args():
+    """
+    Извлекает limit и cursor из строки запроса с учетом серверного максимума
+    """
+    cursor = request.args.get('cursor')
+    position = decode_cursor(cursor) if cursor else None
+    
+    return get_limit_arg(), position
+
+def paginate_query(query, model, limit, position=None, descending=False):
+    """
+    Keyset-пагинация запроса по паре (created_at, id)
+    При descending=True записи идут от новых к старым, курсор должен быть получен с той же сортировкой
+    Возвращает элементы страницы и курсор следующей страницы (или None)
+    """
+    if position is not None:
+        created_at, item_id = position
+        if descending:
+            query = query.filter(or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < item_id)
+            ))
+        else:
+            query = query.filter(or_(
+                model.created_at > created_at,
+                and_(model.created_at == created_at, model.id > item_id)
+            ))
+    
+    if descending:
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        query = query.order_by(model.created_at, model.id)
+    
+    # Запрашиваем на одну запись больше, чтобы узнать, есть ли следующая страница
+    items = query.limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    
+    return items, next_cursor
+
+def row_to_dict(row):
+    """
+    Строка запроса по колонкам в виде словаря (даты сериализует JSON провайдер)
+    """
+    return row._asdict()
+
+def paginated_response(items, next_cursor, serialize=None):
+    """
+    Формирует тело ответа для постраничного списка
+    По умолчанию элементы сериализуются через to_dict, для запросов по колонкам
+    передается serialize (например, row_to_dict)
+    """
+    serialize = serialize or (lambda item: item.to_dict())
+    return {
+        'items': [serialize(item) for item in items],
+        'next_cursor': next_cursor
+    }
@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import jsonify
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class PasswordHasherBusy(Exception):
+    """
+    Пул хэширования паролей перегружен, операция не выполнена вовремя
+    """
+
+class PasswordHasher:
+    """
+    Хэширование и проверка паролей с настраиваемым алгоритмом и стоимостью
+    
+    Вычисления выполняются в ограниченном пуле потоков (hashlib освобождает GIL),
+    поэтому всплеск входов занимает не больше workers потоков и не блокирует
+    обработку остальных запросов. При workers=0 хэширование выполняется в текущем потоке.
+    
+    timeout ограничивает только ожидание результата потоком запроса: уже начатое
+    хэширование прервать нельзя, оно доработает в потоке пула, и пул остается занят.
+    Снимаются лишь задачи, которые еще ждали в очереди.
+    """
+    
+    def __init__(self, method='scrypt', workers=0, timeout=None):
+        self.method = method
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hasher') if workers > 0 else None
+        # Префикс хэша с полными параметрами, например "scrypt:32768:8:1"
+        self.method_prefix = generate_password_hash('', method=method).split('$', 1)[0]
+    
+    def _run(self, fn, *args):
+        if self._executor is None:
+            return fn(*args)
+        
+        future = self._executor.submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Задача из очереди не запустится; начатое хэширование продолжится до конца
+            future.cancel()
+            raise PasswordHasherBusy()
+    
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+    
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+    
+    def needs_rehash(self, password_hash):
+        """
+        Хэш создан с другим алгоритмом или параметрами, чем настроены сейчас
+        """
+        return password_hash.split('$', 1)[0] != self.method_prefix
+    
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+def handle_password_hasher_busy(error):
+    """
+    Ответ на запрос, который не дождался свободного потока хэширования
+    """
+    return jsonify({'message': 'Сервер перегружен, повторите попытку позже'}), 503
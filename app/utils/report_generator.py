@@ -1,24 +1,140 @@
 import csv
 import io
-from sqlalchemy import func
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, select
 from app import db
-from app.models import Restaurant, Review
+from app.models import Restaurant, RestaurantRatingStats, RestaurantDailyRatingStats
 
-def generate_restaurants_report():
+# Количество строк отчета, которые выбираются из БД и отдаются клиенту за один раз
+REPORT_CHUNK_SIZE = 500
+# Наибольшая длина скользящего окна отчета в днях
+REPORT_MAX_WINDOW_DAYS = 366
+
+class ReportParamsError(ValueError):
     """
-    Генерирует CSV отчет со средними оценками по всем ресторанам
+    Некорректные параметры отчета
+    """
+
+def parse_report_date(name, value):
+    """
+    Дата из параметра отчета: объект date или строка ГГГГ-ММ-ДД (None, если не задана)
+    """
+    if value is None or value == '' or isinstance(value, date):
+        return value or None
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ReportParamsError(f'Параметр {name} должен быть датой в формате ГГГГ-ММ-ДД')
+
+def resolve_report_period(date_from=None, date_to=None, days=None, today=None):
+    """
+    Период отчета: даты начала и конца включительно (None - без ограничения)
+    days задает скользящее окно из days последних дней, включая сегодняшний (UTC),
+    и не сочетается с явными датами
+    """
+    date_from = parse_report_date('date_from', date_from)
+    date_to = parse_report_date('date_to', date_to)
+    
+    if days is not None and days != '':
+        if date_from or date_to:
+            raise ReportParamsError('Параметр days нельзя указывать вместе с date_from и date_to')
+        try:
+            days = int(days)
+        except (TypeError, ValueError):
+            raise ReportParamsError('Параметр days должен быть целым числом')
+        if days < 1 or days > REPORT_MAX_WINDOW_DAYS:
+            raise ReportParamsError(f'Параметр days должен быть от 1 до {REPORT_MAX_WINDOW_DAYS}')
+        date_to = today or datetime.utcnow().date()
+        date_from = date_to - timedelta(days=days - 1)
+    
+    if date_from and date_to and date_from > date_to:
+        raise ReportParamsError('Дата начала периода позже даты окончания')
+    
+    return date_from, date_to
+
+def report_period_params(source):
+    """
+    Параметры периода отчета из строки запроса или тела: date_from и date_to (ГГГГ-ММ-ДД)
+    или скользящее окно days; окно сразу переводится в даты
+    """
+    date_from, date_to = resolve_report_period(source.get('date_from'), source.get('date_to'), source.get('days'))
+    return {
+        name: value.isoformat()
+        for name, value in (('date_from', date_from), ('date_to', date_to))
+        if value is not None
+    }
+
+def _period_stats(date_from, date_to):
+    """
+    Количество отзывов и суммы оценок ресторанов за период по суточным агрегатам
+    Обходится не больше дней периода × ресторанов строк вместо всех отзывов
     """
-    # Получаем средние оценки для каждого ресторана
-    report_data = db.session.query(
+    daily = RestaurantDailyRatingStats
+    query = select(
+        daily.restaurant_id,
+        func.sum(daily.reviews_count).label('reviews_count'),
+        func.sum(daily.food_rating_sum).label('food_rating_sum'),
+        func.sum(daily.drinks_rating_sum).label('drinks_rating_sum'),
+        func.sum(daily.overall_rating_sum).label('overall_rating_sum')
+    ).group_by(daily.restaurant_id)
+    
+    if date_from:
+        query = query.where(daily.day >= date_from)
+    if date_to:
+        query = query.where(daily.day <= date_to)
+    
+    return query.subquery('period_stats')
+
+def _drain(output):
+    """
+    Возвращает накопленное содержимое буфера и очищает его
+    """
+    chunk = output.getvalue()
+    output.seek(0)
+    output.truncate(0)
+    return chunk
+
+def restaurants_report_rows(chunk_size=REPORT_CHUNK_SIZE, date_from=None, date_to=None):
+    """
+    Строки сводного отчета: ID и название ресторана, количество отзывов и суммы оценок
+    Читаются серверным курсором порциями по chunk_size
+    Если задан период (даты включительно), учитываются только отзывы, созданные в этот период
+    """
+    date_from = parse_report_date('date_from', date_from)
+    date_to = parse_report_date('date_to', date_to)
+    
+    if date_from or date_to:
+        # Агрегаты за период собираются из суточных строк
+        stats = _period_stats(date_from, date_to)
+        return db.session.query(
+            Restaurant.id,
+            Restaurant.name,
+            stats.c.reviews_count,
+            stats.c.food_rating_sum,
+            stats.c.drinks_rating_sum,
+            stats.c.overall_rating_sum
+        ).outerjoin(stats, stats.c.restaurant_id == Restaurant.id).order_by(Restaurant.id).yield_per(chunk_size)
+    
+    # Получаем сохраненные агрегаты оценок для каждого ресторана (без обхода таблицы отзывов)
+    return db.session.query(
         Restaurant.id,
         Restaurant.name,
-        func.avg(Review.food_rating).label('avg_food_rating'),
-        func.avg(Review.drinks_rating).label('avg_drinks_rating'),
-        func.avg(Review.overall_rating).label('avg_overall_rating'),
-        func.count(Review.id).label('reviews_count')
-    ).outerjoin(Review).group_by(Restaurant.id).all()
+        RestaurantRatingStats.reviews_count,
+        RestaurantRatingStats.food_rating_sum,
+        RestaurantRatingStats.drinks_rating_sum,
+        RestaurantRatingStats.overall_rating_sum
+    ).outerjoin(RestaurantRatingStats).order_by(Restaurant.id).yield_per(chunk_size)
+
+def generate_restaurants_report(chunk_size=REPORT_CHUNK_SIZE, date_from=None, date_to=None):
+    """
+    Генерирует CSV отчет со средними оценками по всем ресторанам
+    Отчет отдается частями по chunk_size строк, строки читаются из БД
+    серверным курсором, поэтому потребление памяти не зависит от размера отчета
+    Если задан период (даты включительно), учитываются только отзывы, созданные в этот период
+    """
+    report_data = restaurants_report_rows(chunk_size, date_from, date_to)
     
-    # Создаем CSV файл в памяти
+    # Буфер для очередной порции CSV
     output = io.StringIO()
     writer = csv.writer(output)
     
@@ -31,18 +147,28 @@ def generate_restaurants_report():
         'Средняя общая оценка', 
         'Количество отзывов'
     ])
+    yield _drain(output)
     
     # Записываем данные
-    for row in report_data:
+    for index, row in enumerate(report_data, start=1):
+        reviews_count = row.reviews_count or 0
+        avg_food_rating = RestaurantRatingStats.average(row.food_rating_sum, reviews_count)
+        avg_drinks_rating = RestaurantRatingStats.average(row.drinks_rating_sum, reviews_count)
+        avg_overall_rating = RestaurantRatingStats.average(row.overall_rating_sum, reviews_count)
+        
         writer.writerow([
             row.id,
             row.name,
-            round(row.avg_food_rating, 2) if row.avg_food_rating else 'Нет данных',
-            round(row.avg_drinks_rating, 2) if row.avg_drinks_rating else 'Нет данных',
-            round(row.avg_overall_rating, 2) if row.avg_overall_rating else 'Нет данных',
-            row.reviews_count
+            avg_food_rating if avg_food_rating is not None else 'Нет данных',
+            avg_drinks_rating if avg_drinks_rating is not None else 'Нет данных',
+            avg_overall_rating if avg_overall_rating is not None else 'Нет данных',
+            reviews_count
         ])
+        
+        if index % chunk_size == 0:
+            yield _drain(output)
     
-    # Получаем содержимое CSV файла
-    output.seek(0)
-    return output.getvalue()
+    # Отдаем остаток
+    chunk = _drain(output)
+    if chunk:
+        yield chunk
@@ -0,0 +1,237 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+from flask import current_app, request
+from app.utils.cache import TTLCache
+
+# Заголовки, которые сохраняются вместе с телом ответа
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+class SQLiteCacheBackend:
+    """
+    Общий для всех процессов кэш в файле SQLite
+    Подходит для нескольких воркеров на одной машине и для тестов
+    """
+    
+    PURGE_EVERY = 500
+    
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._sets = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        
+        with self._connection() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS response_cache '
+                '(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)'
+            )
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS response_cache_generations '
+                '(namespace TEXT PRIMARY KEY, generation INTEGER NOT NULL)'
+            )
+    
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
+    
+    def get(self, key):
+        """
+        Значение и оставшееся время жизни записи в секундах или None, если записи нет
+        """
+        now = time.time()
+        row = self._connection().execute(
+            'SELECT value, expires_at FROM response_cache WHERE key = ? AND expires_at > ?', (key, now)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return row[0], row[1] - now
+    
+    def set(self, key, value, ttl):
+        connection = self._connection()
+        connection.execute(
+            'INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, value, time.time() + ttl)
+        )
+        
+        # Периодически удаляем устаревшие записи
+        self._sets += 1
+        if self._sets % self.PURGE_EVERY == 0:
+            cursor = connection.execute('DELETE FROM response_cache WHERE expires_at <= ?', (time.time(),))
+            self.evictions += cursor.rowcount
+    
+    def get_generation(self, namespace):
+        row = self._connection().execute(
+            'SELECT generation FROM response_cache_generations WHERE namespace = ?', (namespace,)
+        ).fetchone()
+        return row[0] if row else 0
+    
+    def bump_generation(self, namespace):
+        self._connection().execute(
+            'INSERT INTO response_cache_generations (namespace, generation) VALUES (?, 1) '
+            'ON CONFLICT(namespace) DO UPDATE SET generation = generation + 1',
+            (namespace,)
+        )
+    
+    def clear(self):
+        connection = self._connection()
+        connection.execute('DELETE FROM response_cache')
+        connection.execute('DELETE FROM response_cache_generations')
+    
+    def stats(self):
+        size = self._connection().execute('SELECT COUNT(*) FROM response_cache').fetchone()[0]
+        return {
+            'size': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+class ResponseCache:
+    """
+    Кэш ответов: локальный LRU в процессе и, опционально, общий бэкенд
+    
+    Ключ строится из пространства имен, пути и строки запроса. Инвалидация
+    увеличивает поколение пространства имен, поэтому записи, созданные до нее,
+    больше не находятся ни в одном процессе, использующем общий бэкенд.
+    Без общего бэкенда поколения хранятся в процессе: после инвалидации остальные
+    процессы отдают прежние ответы, пока не истечет их TTL.
+    """
+    
+    def __init__(self, maxsize=1024, default_ttl=60, route_ttls=None, shared=None):
+        self.local = TTLCache(maxsize, default_ttl)
+        self.default_ttl = default_ttl
+        self.route_ttls = route_ttls or {}
+        self.shared = shared
+        self._generations = {}
+        self._lock = threading.Lock()
+    
+    def ttl_for(self, endpoint, default=None):
+        return self.route_ttls.get(endpoint, default if default is not None else self.default_ttl)
+    
+    def _generation(self, namespace):
+        if self.shared is not None:
+            return self.shared.get_generation(namespace)
+        return self._generations.get(namespace, 0)
+    
+    def make_key(self, namespace, path, query_string):
+        query = '&'.join(sorted(query_string.split('&'))) if query_string else ''
+        return f'{namespace}:{self._generation(namespace)}:{path}?{query}'
+    
+    def get(self, key):
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            item = self.shared.get(key)
+            if item is not None:
+                # Локальная копия живет не дольше записи в общем кэше (TTL эндпоинта)
+                value, ttl = item
+                self.local.set(key, value, ttl)
+        return value
+    
+    def set(self, key, value, ttl):
+        self.local.set(key, value, ttl)
+        if self.shared is not None:
+            self.shared.set(key, value, ttl)
+    
+    def invalidate(self, namespace):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        if self.shared is not None:
+            self.shared.bump_generation(namespace)
+    
+    def clear(self):
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+    
+    def stats(self):
+        return {
+            'local': self.local.stats(),
+            'shared': self.shared.stats() if self.shared is not None else None
+        }
+
+def create_response_cache(config):
+    """
+    Создание кэша ответов по настройкам приложения (None, если кэш отключен)
+    """
+    if not config['RESPONSE_CACHE_ENABLED']:
+        return None
+    
+    shared = None
+    if config['RESPONSE_CACHE_SHARED_PATH']:
+        shared = SQLiteCacheBackend(config['RESPONSE_CACHE_SHARED_PATH'])
+    
+    return ResponseCache(
+        maxsize=config['RESPONSE_CACHE_SIZE'],
+        default_ttl=config['RESPONSE_CACHE_DEFAULT_TTL'],
+        route_ttls=config['RESPONSE_CACHE_ROUTE_TTLS'],
+        shared=shared
+    )
+
+def parse_route_ttls(value):
+    """
+    Разбор строки вида "restaurants.get_restaurants=30,restaurants.get_restaurant=120"
+    """
+    route_ttls = {}
+    for item in filter(None, (part.strip() for part in (value or '').split(','))):
+        endpoint, ttl = item.split('=', 1)
+        route_ttls[endpoint.strip()] = int(ttl)
+    return route_ttls
+
+def _serialize(response):
+    headers = [(name, response.headers[name]) for name in CACHED_HEADERS if name in response.headers]
+    meta = json.dumps({'status': response.status_code, 'headers': headers}).encode('utf-8')
+    return meta + b'\n' + response.get_data()
+
+def _deserialize(value):
+    meta, body = value.split(b'\n', 1)
+    meta = json.loads(meta)
+    return current_app.response_class(body, status=meta['status'], headers=meta['headers'])
+
+def cached_response(namespace, ttl=None):
+    """
+    Декоратор для кэширования успешных (200) ответов публичных эндпоинтов
+    TTL задается аргументом ttl или RESPONSE_CACHE_ROUTE_TTLS для эндпоинта
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            cache = current_app.extensions.get('response_cache')
+            if cache is None:
+                return fn(*args, **kwargs)
+            
+            key = cache.make_key(namespace, request.path, request.query_string.decode('utf-8'))
+            cached = cache.get(key)
+            if cached is not None:
+                return _deserialize(cached).make_conditional(request)
+            
+            response = current_app.make_response(fn(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                cache.set(key, _serialize(response), cache.ttl_for(request.endpoint, ttl))
+            
+            return response
+        return decorator
+    return wrapper
+
+def invalidate_response_cache(namespace):
+    """
+    Инвалидация всех закэшированных ответов пространства имен
+    """
+    cache = current_app.extensions.get('response_cache')
+    if cache is not None:
+        cache.invalidate(namespace)
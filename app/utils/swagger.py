@@ -1,10 +1,19 @@
+import hashlib
 import json
 import os
+import threading
 from apispec import APISpec
 from apispec.ext.marshmallow import MarshmallowPlugin
-from flask import current_app
+from flask import current_app, request
 
-def generate_swagger_spec(app):
+_spec_lock = threading.Lock()
+
+# Типы содержимого выгрузок отчетов
+REPORT_MEDIA_TYPES = (
+    'text/csv', 'application/x-ndjson', 'application/vnd.apache.arrow.stream', 'application/vnd.apache.parquet'
+)
+
+def build_swagger_spec():
     """
     Генерирует Swagger спецификацию для API
     """
@@ -32,9 +41,19 @@ def generate_swagger_spec(app):
         "type": "object",
         "properties": {
             "id": {"type": "integer"},
+            "external_id": {"type": "string", "nullable": True},
             "name": {"type": "string"},
             "address": {"type": "string"},
             "description": {"type": "string"},
+            "ratings": {
+                "type": "object",
+                "properties": {
+                    "reviews_count": {"type": "integer"},
+                    "avg_food_rating": {"type": "number", "nullable": True},
+                    "avg_drinks_rating": {"type": "number", "nullable": True},
+                    "avg_overall_rating": {"type": "number", "nullable": True}
+                }
+            },
             "created_at": {"type": "string", "format": "date-time"},
             "updated_at": {"type": "string", "format": "date-time"}
         }
@@ -55,6 +74,65 @@ def generate_swagger_spec(app):
         }
     })
     
+    # Постраничные списки
+    for name in ("User", "Restaurant", "Review"):
+        spec.components.schema(f"{name}Page", {
+            "type": "object",
+            "properties": {
+                "items": {
+                    "type": "array",
+                    "items": {"$ref": f"#/components/schemas/{name}"}
+                },
+                "next_cursor": {
+                    "type": "string",
+                    "nullable": True,
+                    "description": "Курсор следующей страницы (null, если страница последняя)"
+                }
+            }
+        })
+    
+    spec.components.parameter("Limit", "query", {
+        "name": "limit",
+        "schema": {"type": "integer", "minimum": 1},
+        "description": "Размер страницы (ограничен серверным максимумом)"
+    })
+    
+    spec.components.parameter("Sort", "query", {
+        "name": "sort",
+        "schema": {"type": "string", "enum": ["created_at", "-created_at"], "default": "created_at"},
+        "description": "Сортировка по дате создания, \"-\" - от новых к старым"
+    })
+    
+    spec.components.parameter("Cursor", "query", {
+        "name": "cursor",
+        "schema": {"type": "string"},
+        "description": "Курсор из поля next_cursor предыдущей страницы"
+    })
+    
+    spec.components.parameter("ReportDateFrom", "query", {
+        "name": "date_from",
+        "schema": {"type": "string", "format": "date"},
+        "description": "Учитывать отзывы, созданные начиная с этой даты (UTC, включительно)"
+    })
+    
+    spec.components.parameter("ReportDateTo", "query", {
+        "name": "date_to",
+        "schema": {"type": "string", "format": "date"},
+        "description": "Учитывать отзывы, созданные по эту дату (UTC, включительно)"
+    })
+    
+    spec.components.parameter("ReportDays", "query", {
+        "name": "days",
+        "schema": {"type": "integer", "minimum": 1, "maximum": 366},
+        "description": "Скользящее окно: отзывы за последние days дней, включая сегодняшний (например, 7 или 30)"
+    })
+    
+    spec.components.parameter("ReportFormat", "query", {
+        "name": "format",
+        "schema": {"type": "string", "enum": ["csv", "ndjson", "arrow", "parquet"], "default": "csv"},
+        "description": "Формат выгрузки; arrow (Arrow IPC stream) и parquet доступны при установленном pyarrow"
+    })
+    
     # Определение безопасности
     spec.components.security_scheme("BearerAuth", {
         "type": "http",
@@ -154,15 +232,16 @@ def generate_swagger_spec(app):
                 "tags": ["Users"],
                 "summary": "Получение списка пользователей (только для администраторов)",
                 "security": [{"BearerAuth": []}],
+                "parameters": [
+                    "Limit",
+                    "Cursor"
+                ],
                 "responses": {
                     "200": {
-                        "description": "Список пользователей",
+                        "description": "Страница списка пользователей",
                         "content": {
                             "application/json": {
-                                "schema": {
-                                    "type": "array",
-                                    "items": {"$ref": "#/components/schemas/User"}
-                                }
+                                "schema": {"$ref": "#/components/schemas/UserPage"}
                             }
                         }
                     },
@@ -323,15 +402,16 @@ def generate_swagger_spec(app):
             "get": {
                 "tags": ["Restaurants"],
                 "summary": "Получение списка ресторанов",
+                "parameters": [
+                    "Limit",
+                    "Cursor"
+                ],
                 "responses": {
                     "200": {
-                        "description": "Список ресторанов",
+                        "description": "Страница списка ресторанов",
                         "content": {
                             "application/json": {
-                                "schema": {
-                                    "type": "array",
-                                    "items": {"$ref": "#/components/schemas/Restaurant"}
-                                }
+                                "schema": {"$ref": "#/components/schemas/RestaurantPage"}
                             }
                         }
                     }
@@ -376,6 +456,91 @@ def generate_swagger_spec(app):
         }
     )
     
+    spec.path(
+        path="/api/v1/restaurants/search",
+        operations={
+            "get": {
+                "tags": ["Restaurants"],
+                "summary": "Полнотекстовый поиск ресторанов по названию и описанию",
+                "parameters": [
+                    {
+                        "name": "q",
+                        "in": "query",
+                        "required": True,
+                        "description": "Поисковый запрос, слова ищутся по префиксу",
+                        "schema": {"type": "string"}
+                    },
+                    "Limit",
+                    "Cursor"
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Страница результатов в порядке релевантности",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/RestaurantPage"}
+                            }
+                        }
+                    },
+                    "400": {
+                        "description": "Пустой запрос или некорректные параметры"
+                    }
+                }
+            }
+        }
+    )
+    
+    spec.path(
+        path="/api/v1/restaurants/top",
+        operations={
+            "get": {
+                "tags": ["Restaurants"],
+                "summary": "Лучшие рестораны по средней оценке",
+                "parameters": [
+                    {
+                        "name": "by",
+                        "in": "query",
+                        "schema": {"type": "string", "enum": ["food", "drinks", "overall"], "default": "overall"}
+                    },
+                    {
+                        "name": "min_reviews",
+                        "in": "query",
+                        "description": "Минимальное количество отзывов",
+                        "schema": {"type": "integer", "minimum": 1, "default": 1}
+                    },
+                    {
+                        "name": "limit",
+                        "in": "query",
+                        "schema": {"type": "integer", "minimum": 1, "default": 10}
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Рестораны в порядке убывания средней оценки",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "by": {"type": "string"},
+                                        "min_reviews": {"type": "integer"},
+                                        "items": {
+                                            "type": "array",
+                                            "items": {"$ref": "#/components/schemas/Restaurant"}
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    },
+                    "400": {
+                        "description": "Некорректные параметры запроса"
+                    }
+                }
+            }
+        }
+    )
+    
     spec.path(
         path="/api/v1/restaurants/{restaurant_id}",
         operations={
@@ -478,25 +643,315 @@ def generate_swagger_spec(app):
     )
     
     # Отчеты
+    spec.path(
+        path="/api/v1/restaurants/{restaurant_id}/reviews",
+        operations={
+            "get": {
+                "tags": ["Restaurants"],
+                "summary": "Отзывы ресторана с именами авторов (только для администраторов)",
+                "security": [{"BearerAuth": []}],
+                "parameters": [
+                    {
+                        "name": "restaurant_id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "integer"}
+                    },
+                    {
+                        "name": "include_ratings",
+                        "in": "query",
+                        "schema": {"type": "boolean", "default": False},
+                        "description": "Добавить в ответ средние оценки ресторана"
+                    },
+                    "Sort",
+                    "Limit",
+                    "Cursor"
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Страница отзывов ресторана",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "items": {
+                                            "type": "array",
+                                            "items": {
+                                                "allOf": [
+                                                    {"$ref": "#/components/schemas/Review"},
+                                                    {
+                                                        "type": "object",
+                                                        "properties": {"username": {"type": "string"}}
+                                                    }
+                                                ]
+                                            }
+                                        },
+                                        "next_cursor": {"type": "string", "nullable": True},
+                                        "ratings": {"$ref": "#/components/schemas/Restaurant/properties/ratings"}
+                                    }
+                                }
+                            }
+                        }
+                    },
+                    "403": {
+                        "description": "Доступ запрещен"
+                    },
+                    "404": {
+                        "description": "Ресторан не найден"
+                    }
+                }
+            }
+        }
+    )
+    
     spec.path(
         path="/api/v1/restaurants/report",
         operations={
             "get": {
                 "tags": ["Reports"],
                 "summary": "Выгрузка сводного отчета по всем ресторанам (только для администраторов)",
+                "description": "Пока рестораны и отзывы не менялись, отчет отдается из сохраненного снимка "
+                               "(сжатым gzip, если клиент его поддерживает). ETag меняется вместе с версией данных.",
                 "security": [{"BearerAuth": []}],
+                "parameters": [
+                    "ReportFormat",
+                    "ReportDateFrom",
+                    "ReportDateTo",
+                    "ReportDays",
+                    {
+                        "name": "If-None-Match",
+                        "in": "header",
+                        "schema": {"type": "string"}
+                    }
+                ],
                 "responses": {
                     "200": {
-                        "description": "Сводный отчет в формате CSV",
+                        "description": "Сводный отчет в выбранном формате",
+                        "headers": {
+                            "ETag": {"schema": {"type": "string"}}
+                        },
                         "content": {
-                            "text/csv": {
+                            media_type: {
                                 "schema": {
                                     "type": "string",
                                     "format": "binary"
                                 }
                             }
+                            for media_type in REPORT_MEDIA_TYPES
+                        }
+                    },
+                    "400": {
+                        "description": "Некорректный период или неподдерживаемый формат"
+                    },
+                    "304": {
+                        "description": "Отчет не изменился"
+                    },
+                    "403": {
+                        "description": "Доступ запрещен"
+                    }
+                }
+            }
+        }
+    )
+    
+    spec.components.schema("ReportJob", {
+        "type": "object",
+        "properties": {
+            "id": {"type": "string"},
+            "kind": {"type": "string", "enum": ["restaurants", "reviews"]},
+            "status": {"type": "string", "enum": ["pending", "running", "done", "failed"]},
+            "file_size": {"type": "integer", "nullable": True},
+            "error": {"type": "string", "nullable": True},
+            "created_at": {"type": "string", "format": "date-time"},
+            "started_at": {"type": "string", "format": "date-time", "nullable": True},
+            "finished_at": {"type": "string", "format": "date-time", "nullable": True},
+            "status_url": {"type": "string"},
+            "download_url": {"type": "string"}
+        }
+    })
+    
+    spec.path(
+        path="/api/v1/restaurants/report/jobs",
+        operations={
+            "post": {
+                "tags": ["Reports"],
+                "summary": "Постановка формирования отчета в фоновую очередь (только для администраторов)",
+                "security": [{"BearerAuth": []}],
+                "requestBody": {
+                    "required": False,
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "kind": {"type": "string", "enum": ["restaurants", "reviews"], "default": "restaurants"},
+                                    "format": {"type": "string", "enum": ["csv", "ndjson", "arrow", "parquet"], "default": "csv"},
+                                    "date_from": {"type": "string", "format": "date"},
+                                    "date_to": {"type": "string", "format": "date"},
+                                    "days": {"type": "integer", "minimum": 1, "maximum": 366}
+                                }
+                            }
+                        }
+                    }
+                },
+                "responses": {
+                    "202": {
+                        "description": "Задание принято; если такой же отчет уже формируется, возвращается его задание",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/ReportJob"}
+                            }
                         }
                     },
+                    "400": {
+                        "description": "Неизвестный вид отчета, формат или некорректный период"
+                    },
+                    "403": {
+                        "description": "Доступ запрещен"
+                    }
+                }
+            }
+        }
+    )
+    
+    spec.path(
+        path="/api/v1/restaurants/report/jobs/{job_id}",
+        operations={
+            "get": {
+                "tags": ["Reports"],
+                "summary": "Состояние задания на формирование отчета (только для администраторов)",
+                "security": [{"BearerAuth": []}],
+                "parameters": [
+                    {
+                        "name": "job_id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "string"}
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Состояние задания",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/ReportJob"}
+                            }
+                        }
+                    },
+                    "403": {
+                        "description": "Доступ запрещен"
+                    },
+                    "404": {
+                        "description": "Задание не найдено"
+                    }
+                }
+            }
+        }
+    )
+    
+    spec.path(
+        path="/api/v1/restaurants/report/jobs/{job_id}/download",
+        operations={
+            "get": {
+                "tags": ["Reports"],
+                "summary": "Скачивание готового отчета (только для администраторов)",
+                "security": [{"BearerAuth": []}],
+                "parameters": [
+                    {
+                        "name": "job_id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "string"}
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Файл отчета",
+                        "content": {
+                            media_type: {
+                                "schema": {
+                                    "type": "string",
+                                    "format": "binary"
+                                }
+                            }
+                            for media_type in REPORT_MEDIA_TYPES
+                        }
+                    },
+                    "403": {
+                        "description": "Доступ запрещен"
+                    },
+                    "404": {
+                        "description": "Задание не найдено"
+                    },
+                    "409": {
+                        "description": "Отчет еще не готов или задание завершилось с ошибкой"
+                    },
+                    "410": {
+                        "description": "Файл отчета удален"
+                    }
+                }
+            }
+        }
+    )
+    
+    spec.path(
+        path="/api/v1/restaurants/import",
+        operations={
+            "post": {
+                "tags": ["Restaurants"],
+                "summary": "Пакетный импорт ресторанов с обновлением по external_id (только для администраторов)",
+                "security": [{"BearerAuth": []}],
+                "parameters": [
+                    {
+                        "name": "format",
+                        "in": "query",
+                        "schema": {"type": "string", "enum": ["csv", "ndjson"], "default": "csv"}
+                    }
+                ],
+                "requestBody": {
+                    "content": {
+                        "text/csv": {
+                            "schema": {"type": "string", "format": "binary"}
+                        },
+                        "application/x-ndjson": {
+                            "schema": {"type": "string", "format": "binary"}
+                        }
+                    }
+                },
+                "responses": {
+                    "200": {
+                        "description": "Итоги импорта: обработанные строки и ошибки"
+                    },
+                    "400": {
+                        "description": "Некорректный формат данных"
+                    },
+                    "403": {
+                        "description": "Доступ запрещен"
+                    }
+                }
+            }
+        }
+    )
+    
+    spec.path(
+        path="/api/v1/restaurants/export",
+        operations={
+            "get": {
+                "tags": ["Restaurants"],
+                "summary": "Потоковая выгрузка ресторанов (только для администраторов)",
+                "security": [{"BearerAuth": []}],
+                "parameters": [
+                    {
+                        "name": "format",
+                        "in": "query",
+                        "schema": {"type": "string", "enum": ["csv", "ndjson"], "default": "csv"}
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Рестораны в формате CSV или NDJSON"
+                    },
                     "403": {
                         "description": "Доступ запрещен"
                     }
@@ -524,18 +979,40 @@ def generate_swagger_spec(app):
                         "name": "user_id",
                         "in": "query",
                         "schema": {"type": "integer"},
-                        "description": "Фильтр по ID пользователя"
-                    }
+                        "description": "Фильтр по ID пользователя (только для администраторов)"
+                    },
+                    *[
+                        {
+                            "name": f"{bound}_{field}",
+                            "in": "query",
+                            "schema": {"type": "integer", "minimum": 1, "maximum": 5},
+                            "description": f"{'Минимальная' if bound == 'min' else 'Максимальная'} оценка {field}"
+                        }
+                        for field in ("food_rating", "drinks_rating", "overall_rating")
+                        for bound in ("min", "max")
+                    ],
+                    {
+                        "name": "created_after",
+                        "in": "query",
+                        "schema": {"type": "string", "format": "date-time"},
+                        "description": "Отзывы, созданные не раньше указанного момента"
+                    },
+                    {
+                        "name": "created_before",
+                        "in": "query",
+                        "schema": {"type": "string", "format": "date-time"},
+                        "description": "Отзывы, созданные раньше указанного момента"
+                    },
+                    "Sort",
+                    "Limit",
+                    "Cursor"
                 ],
                 "responses": {
                     "200": {
-                        "description": "Список отзывов",
+                        "description": "Страница списка отзывов",
                         "content": {
                             "application/json": {
-                                "schema": {
-                                    "type": "array",
-                                    "items": {"$ref": "#/components/schemas/Review"}
-                                }
+                                "schema": {"$ref": "#/components/schemas/ReviewPage"}
                             }
                         }
                     },
@@ -588,6 +1065,144 @@ def generate_swagger_spec(app):
         }
     )
     
+    spec.path(
+        path="/api/v1/reviews/bulk",
+        operations={
+            "post": {
+                "tags": ["Reviews"],
+                "summary": "Пакетное создание отзывов",
+                "description": "Все отзывы создаются от имени текущего пользователя. "
+                               "Ошибки отдельных отзывов не прерывают пакет.",
+                "security": [{"BearerAuth": []}],
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "array",
+                                "items": {"$ref": "#/components/schemas/Review"}
+                            }
+                        },
+                        "application/x-ndjson": {
+                            "schema": {
+                                "type": "string",
+                                "description": "По одному отзыву в формате JSON в каждой строке"
+                            }
+                        }
+                    }
+                },
+                "responses": {
+                    "200": {
+                        "description": "Результаты по каждому отзыву пакета",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "created": {"type": "integer"},
+                                        "failed": {"type": "integer"},
+                                        "results": {
+                                            "type": "array",
+                                            "items": {
+                                                "type": "object",
+                                                "properties": {
+                                                    "index": {"type": "integer"},
+                                                    "status": {"type": "string", "enum": ["created", "error"]},
+                                                    "id": {"type": "integer"},
+                                                    "message": {"type": "string"}
+                                                }
+                                            }
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    },
+                    "400": {
+                        "description": "Некорректный формат пакета"
+                    },
+                    "401": {
+                        "description": "Требуется аутентификация"
+                    }
+                }
+            }
+        }
+    )
+    
+    spec.path(
+        path="/api/v1/reviews/search",
+        operations={
+            "get": {
+                "tags": ["Reviews"],
+                "summary": "Полнотекстовый поиск по комментариям отзывов (только для администраторов)",
+                "security": [{"BearerAuth": []}],
+                "parameters": [
+                    {
+                        "name": "q",
+                        "in": "query",
+                        "required": True,
+                        "description": "Поисковый запрос, слова ищутся по префиксу",
+                        "schema": {"type": "string"}
+                    },
+                    "Limit",
+                    "Cursor"
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Страница результатов в порядке релевантности",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/ReviewPage"}
+                            }
+                        }
+                    },
+                    "400": {
+                        "description": "Пустой запрос или некорректные параметры"
+                    },
+                    "403": {
+                        "description": "Доступ запрещен"
+                    }
+                }
+            }
+        }
+    )
+    
+    spec.path(
+        path="/api/v1/reviews/export",
+        operations={
+            "get": {
+                "tags": ["Reports"],
+                "summary": "Потоковая выгрузка всех отзывов (только для администраторов)",
+                "security": [{"BearerAuth": []}],
+                "parameters": [
+                    "ReportFormat",
+                    "ReportDateFrom",
+                    "ReportDateTo",
+                    "ReportDays"
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Отзывы по одному в строке в выбранном формате",
+                        "content": {
+                            media_type: {
+                                "schema": {
+                                    "type": "string",
+                                    "format": "binary"
+                                }
+                            }
+                            for media_type in REPORT_MEDIA_TYPES
+                        }
+                    },
+                    "400": {
+                        "description": "Некорректный период или неподдерживаемый формат"
+                    },
+                    "403": {
+                        "description": "Доступ запрещен"
+                    }
+                }
+            }
+        }
+    )
+    
     spec.path(
         path="/api/v1/reviews/{review_id}",
         operations={
@@ -623,9 +1238,106 @@ def generate_swagger_spec(app):
         }
     )
     
-    # Сохранение спецификации в JSON файл
-    static_dir = os.path.join(app.root_path, 'static')
-    os.makedirs(static_dir, exist_ok=True)
+    # Администрирование
+    spec.path(
+        path="/api/v1/admin/cache",
+        operations={
+            "get": {
+                "tags": ["Admin"],
+                "summary": "Счетчики кэша ответов текущего процесса (только для администраторов)",
+                "security": [{"BearerAuth": []}],
+                "responses": {
+                    "200": {
+                        "description": "Размер кэша, попадания, промахи и вытеснения"
+                    },
+                    "403": {
+                        "description": "Доступ запрещен"
+                    }
+                }
+            },
+            "delete": {
+                "tags": ["Admin"],
+                "summary": "Очистка кэша ответов (только для администраторов)",
+                "security": [{"BearerAuth": []}],
+                "responses": {
+                    "204": {
+                        "description": "Кэш очищен"
+                    },
+                    "403": {
+                        "description": "Доступ запрещен"
+                    }
+                }
+            }
+        }
+    )
+    
+    spec.path(
+        path="/api/v1/admin/db-pool",
+        operations={
+            "get": {
+                "tags": ["Admin"],
+                "summary": "Состояние пулов соединений с БД текущего процесса (только для администраторов)",
+                "security": [{"BearerAuth": []}],
+                "responses": {
+                    "200": {
+                        "description": "Размер пула, занятые и сверхлимитные соединения, время ожидания"
+                    },
+                    "403": {
+                        "description": "Доступ запрещен"
+                    }
+                }
+            }
+        }
+    )
+    
+    return spec.to_dict()
+
+def generate_swagger_spec(app, path=None):
+    """
+    Сохраняет спецификацию в JSON файл (по умолчанию static/swagger.json)
+    Используется при сборке, рабочие процессы файл не пишут
+    """
+    path = path or os.path.join(app.root_path, 'static', 'swagger.json')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    
+    with open(path, 'w') as f:
+        json.dump(build_swagger_spec(), f)
+    
+    return path
+
+def _load_swagger_spec(app):
+    """
+    Сериализованная спецификация: готовый файл SWAGGER_SPEC_PATH или сборка в памяти
+    """
+    path = app.config.get('SWAGGER_SPEC_PATH')
+    if path:
+        with open(path, 'rb') as f:
+            return f.read()
+    
+    return json.dumps(build_swagger_spec()).encode('utf-8')
+
+def get_swagger_spec(app):
+    """
+    Спецификация и ее ETag, собираются при первом обращении и хранятся в памяти процесса
+    """
+    cached = app.extensions.get('swagger_spec')
+    if cached is None:
+        with _spec_lock:
+            cached = app.extensions.get('swagger_spec')
+            if cached is None:
+                body = _load_swagger_spec(app)
+                cached = (body, hashlib.sha1(body).hexdigest())
+                app.extensions['swagger_spec'] = cached
+    
+    return cached
+
+def swagger_spec_view():
+    """
+    Отдача спецификации с поддержкой If-None-Match
+    """
+    body, etag = get_swagger_spec(current_app._get_current_object())
     
-    with open(os.path.join(static_dir, 'swagger.json'), 'w') as f:
-        json.dump(spec.to_dict(), f)
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
@@ -0,0 +1,8 @@
+import os
+from app import create_app
+from app.utils.asgi import WSGIToASGI
+
+# Точка входа для ASGI серверов: uvicorn asgi:app
+# Обработчики те же, что и в WSGI режиме (run.py), и выполняются в пуле из ASGI_WORKER_THREADS потоков
+flask_app = create_app()
+app = WSGIToASGI(flask_app, workers=int(os.getenv('ASGI_WORKER_THREADS', 32)))
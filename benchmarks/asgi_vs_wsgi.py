@@ -0,0 +1,159 @@
+"""
+Сравнение пропускной способности WSGI (gunicorn, синхронные воркеры) и ASGI (uvicorn, asgi.py)
+при большом числе одновременных соединений, часть из которых - медленные клиенты
+
+Запуск: python benchmarks/asgi_vs_wsgi.py [--connections C] [--slow-clients S] [--requests R]
+Нужны установленные gunicorn и uvicorn. Оба сервера запускаются с одинаковым числом
+процессов (--processes) на одной заранее заполненной SQLite базе. Медленный клиент
+отправляет заголовки запроса по частям в течение --slow-delay секунд.
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PATHS = ('/api/v1/reviews?limit=20', '/api/v1/restaurants?limit=20', '/api/v1/restaurants/top')
+
+def prepare_database(args):
+    path = os.path.join(tempfile.mkdtemp(), 'asgi_bench.db')
+    os.environ['DATABASE_URI'] = f'sqlite:///{path}'
+    os.environ['RESPONSE_CACHE_ENABLED'] = 'false'
+    
+    from app import create_app, db
+    from app.models import User, UserRole
+    from app.utils.init_db import seed_synthetic_data
+    
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add(User('admin', 'admin@example.com', 'admin123', UserRole.ADMIN.value))
+        db.session.commit()
+        seed_synthetic_data(args.users, args.restaurants, args.reviews, seed=42)
+    app.extensions['password_hasher'].shutdown()
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Сервер на порту {port} не запустился')
+
+def login(port):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    connection.request(
+        'POST', '/api/v1/auth/login',
+        body=json.dumps({'username': 'admin', 'password': 'admin123'}),
+        headers={'Content-Type': 'application/json'}
+    )
+    token = json.loads(connection.getresponse().read())['access_token']
+    connection.close()
+    return token
+
+def slow_client(port, delay, stop):
+    """
+    Держит соединение, отправляя заголовки запроса по одной строке
+    """
+    while not stop.is_set():
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=delay + 30) as sock:
+                lines = [b'GET /api/v1/restaurants/top HTTP/1.1\r\n', b'Host: localhost\r\n', b'X-Slow: 1\r\n', b'\r\n']
+                for line in lines:
+                    sock.sendall(line)
+                    if stop.wait(delay / len(lines)):
+                        return
+                sock.recv(65536)
+        except OSError:
+            time.sleep(0.1)
+
+def run_load(port, token, args):
+    local = threading.local()
+    
+    def request(index):
+        connection = getattr(local, 'connection', None)
+        if connection is None:
+            connection = local.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        started = time.perf_counter()
+        try:
+            connection.request('GET', PATHS[index % len(PATHS)], headers={'Authorization': f'Bearer {token}'})
+            response = connection.getresponse()
+            response.read()
+            ok = response.status == 200
+        except (OSError, http.client.HTTPException):
+            local.connection = None
+            ok = False
+        return time.perf_counter() - started, ok
+    
+    stop = threading.Event()
+    slow_threads = [
+        threading.Thread(target=slow_client, args=(port, args.slow_delay, stop), daemon=True)
+        for _ in range(args.slow_clients)
+    ]
+    for thread in slow_threads:
+        thread.start()
+    time.sleep(0.5)
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.connections) as pool:
+        results = list(pool.map(request, range(args.requests)))
+    elapsed = time.perf_counter() - started
+    
+    stop.set()
+    latencies = [latency for latency, ok in results if ok]
+    quantiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else [0.0] * 99
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50': quantiles[49] * 1000,
+        'p99': quantiles[98] * 1000,
+        'errors': len(results) - len(latencies)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--restaurants', type=int, default=100)
+    parser.add_argument('--reviews', type=int, default=10000)
+    parser.add_argument('--processes', type=int, default=2)
+    parser.add_argument('--connections', type=int, default=64, help='одновременных соединений с обычными запросами')
+    parser.add_argument('--slow-clients', type=int, default=16)
+    parser.add_argument('--slow-delay', type=float, default=2.0)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+    
+    prepare_database(args)
+    
+    servers = [
+        ('WSGI (gunicorn sync)', 8701, ['gunicorn', '-w', str(args.processes), '-b', '127.0.0.1:8701', 'run:app']),
+        ('ASGI (uvicorn, asgi.py)', 8702, [
+            'uvicorn', '--workers', str(args.processes), '--port', '8702', '--log-level', 'warning', 'asgi:app'
+        ]),
+    ]
+    
+    print(f"Соединений: {args.connections}, медленных клиентов: {args.slow_clients}, запросов: {args.requests}")
+    print(f"{'Режим':<28}{'запр/с':>10}{'p50, мс':>10}{'p99, мс':>10}{'ошибки':>8}")
+    for name, port, command in servers:
+        process = subprocess.Popen(command, cwd=ROOT, env=os.environ.copy(),
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(port)
+            stats = run_load(port, login(port), args)
+        finally:
+            process.terminate()
+            process.wait()
+        print(f"{name:<28}{stats['rps']:>10.1f}{stats['p50']:>10.2f}{stats['p99']:>10.2f}{stats['errors']:>8}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Бенчмарк сериализации списка отзывов: ORM объекты + to_dict + стандартный json
+против запроса по колонкам + быстрого JSON провайдера
+
+Запуск: python benchmarks/json_serialization.py [--reviews N] [--repeat R]
+Для каждого варианта выводится лучшее время из R повторов (выборка + сериализация).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def seed(db, reviews):
+    from sqlalchemy import insert
+    from app.models import User, Restaurant, Review
+    
+    # Каждый пользователь оставляет по одному отзыву в каждом ресторане
+    side = int(reviews ** 0.5) + 1
+    now = datetime.utcnow()
+    db.session.execute(insert(User.__table__), [
+        {'username': f'user{i}', 'email': f'user{i}@example.com', 'password_hash': '-', 'role': 'respondent',
+         'token_version': 0, 'created_at': now, 'updated_at': now}
+        for i in range(side)
+    ])
+    db.session.execute(insert(Restaurant.__table__), [
+        {'name': f'Ресторан {i}', 'description': 'Описание', 'created_at': now, 'updated_at': now}
+        for i in range(side)
+    ])
+    db.session.execute(insert(Review.__table__), [
+        {'restaurant_id': index % side + 1, 'user_id': index // side + 1, 'food_rating': 1 + index % 5,
+         'drinks_rating': 1 + index % 4, 'overall_rating': 1 + index % 3, 'comment': 'Хороший ресторан',
+         'created_at': now, 'updated_at': now}
+        for index in range(reviews)
+    ])
+    db.session.commit()
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reviews', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    os.environ['DATABASE_URI'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    
+    from flask.json.provider import DefaultJSONProvider
+    from app import create_app, db
+    from app.models import Review
+    from app.utils.json_provider import StdlibJSONProvider, json_provider_class
+    
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        seed(db, args.reviews)
+        
+        default_provider = DefaultJSONProvider(app)
+        stdlib_provider = StdlibJSONProvider(app)
+        fast_provider = json_provider_class('auto')(app)
+        
+        def orm_rows():
+            db.session.expunge_all()
+            return [review.to_dict() for review in Review.query.all()]
+        
+        def column_rows():
+            return [row._asdict() for row in Review.list_query().all()]
+        
+        variants = [
+            ('ORM + to_dict + Flask json', lambda: default_provider.dumps({'items': orm_rows()})),
+            ('ORM + to_dict + ' + type(fast_provider).__name__, lambda: fast_provider.dumps({'items': orm_rows()})),
+            ('колонки + StdlibJSONProvider', lambda: stdlib_provider.dumps({'items': column_rows()})),
+            ('колонки + ' + type(fast_provider).__name__, lambda: fast_provider.dumps({'items': column_rows()})),
+        ]
+        
+        print(f"Отзывов: {args.reviews}")
+        print(f"{'Вариант':<44}{'мс':>10}")
+        baseline = None
+        for name, fn in variants:
+            elapsed = best_of(args.repeat, fn) * 1000
+            baseline = baseline or elapsed
+            print(f"{name:<44}{elapsed:>10.1f}  x{baseline / elapsed:.1f}")
+
+if __name__ == '__main__':
+    main()
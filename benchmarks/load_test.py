@@ -0,0 +1,343 @@
+"""
+Нагрузочный тест эндпоинтов API на синтетических данных
+
+Запуск: python benchmarks/load_test.py [--users N] [--restaurants M] [--reviews K]
+                                       [--requests R] [--concurrency C] [--route NAME]
+                                       [--base-url URL]
+
+Без --base-url создается временная SQLite база, заполняется seed_synthetic_data
+и запросы выполняются тестовым клиентом Flask (время работы приложения без сети).
+С --base-url запросы отправляются по HTTP к запущенному серверу с уже заполненной
+базой (flask seed), в ней должен быть администратор admin/admin123.
+
+Измеряются маршруты на чтение и на запись (вход, регистрация, создание, изменение и
+удаление ресторанов и пользователей, отзывы, пакетные загрузки, задания отчетов, очистка кэша);
+маршруты на запись создают собственные записи с уникальными именами прогона, а для
+отзывов и удаления заранее создается пул свежих ресторанов или пользователей. --read-only оставляет
+только чтение. Для каждого маршрута выводятся p50/p95/p99 задержки в миллисекундах,
+пропускная способность и количество ответов с ошибкой. Генератор случайных чисел фиксирован
+(--seed), поэтому повторные прогоны выполняют одинаковые запросы.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ADMIN_CREDENTIALS = {'username': 'admin', 'password': 'admin123'}
+SEARCH_TERMS = ('кухня', 'бистро', 'итальянская', 'бар', 'таверна')
+# Записей в одном пакетном запросе (отзывы, импорт ресторанов)
+BULK_SIZE = 10
+# При регистрации и создании пользователей проверяется доставляемость email (MX запись домена),
+# example.com почту не принимает
+EMAIL_DOMAIN = 'mail.ru'
+
+# Маршруты на чтение: имя, нужна ли авторизация администратора, функция построения пути
+READ_ROUTES = [
+    ('restaurants.get_restaurants', False, lambda rng, s: '/api/v1/restaurants?limit=50'),
+    ('restaurants.get_restaurant', False, lambda rng, s: f"/api/v1/restaurants/{rng.randint(1, s['restaurants'])}"),
+    ('restaurants.get_top_restaurants', False, lambda rng, s: f"/api/v1/restaurants/top?by={rng.choice(['food', 'drinks', 'overall'])}&min_reviews=5"),
+    ('restaurants.search_restaurants_view', False, lambda rng, s: f"/api/v1/restaurants/search?q={urllib.request.quote(rng.choice(SEARCH_TERMS))}"),
+    ('restaurants.get_restaurant_reviews', True, lambda rng, s: f"/api/v1/restaurants/{rng.randint(1, s['restaurants'])}/reviews?include_ratings=true"),
+    ('restaurants.get_restaurants_report', True, lambda rng, s: f"/api/v1/restaurants/report?days={rng.choice([7, 30])}"),
+    ('restaurants.export_restaurants_bulk', True, lambda rng, s: '/api/v1/restaurants/export?format=ndjson'),
+    ('reviews.get_reviews', True, lambda rng, s: f"/api/v1/reviews?limit=50&min_overall_rating={rng.randint(1, 5)}"),
+    ('reviews.get_review', True, lambda rng, s: f"/api/v1/reviews/{rng.randint(1, s['reviews'])}"),
+    ('restaurants.get_report_job', True, lambda rng, s: f"/api/v1/restaurants/report/jobs/{s['report_job']}"),
+    ('restaurants.download_report_job', True, lambda rng, s: f"/api/v1/restaurants/report/jobs/{s['report_job']}/download"),
+    ('reviews.export_reviews', True, lambda rng, s: '/api/v1/reviews/export?format=ndjson'),
+    ('reviews.search_reviews_view', True, lambda rng, s: f"/api/v1/reviews/search?q={urllib.request.quote('вкусные')}"),
+    ('users.get_users', True, lambda rng, s: '/api/v1/users?limit=50'),
+    ('users.get_user', True, lambda rng, s: f"/api/v1/users/{rng.randint(1, s['users'])}"),
+    ('admin.get_cache_stats', True, lambda rng, s: '/api/v1/admin/cache'),
+    ('admin.get_db_pool_status', True, lambda rng, s: '/api/v1/admin/db-pool'),
+]
+
+# Маршруты на запись: имя, метод, нужна ли авторизация администратора, пул свежих записей (вид и
+# количество на один запрос, чтобы отзывы не упирались в unique_user_restaurant_review, а удаление
+# не повторялось) и функция построения пути и тела. Записи создаются с уникальными именами прогона.
+WRITE_ROUTES = [
+    ('auth.login', 'POST', False, None, lambda rng, s, i: ('/api/v1/auth/login', ADMIN_CREDENTIALS)),
+    ('auth.register', 'POST', False, None, lambda rng, s, i: ('/api/v1/auth/register', {
+        'username': f"{s['run']}_reg{i}", 'email': f"{s['run']}_reg{i}@{EMAIL_DOMAIN}", 'password': 'user123'
+    })),
+    ('users.create_user', 'POST', True, None, lambda rng, s, i: ('/api/v1/users', {
+        'username': f"{s['run']}_usr{i}", 'email': f"{s['run']}_usr{i}@{EMAIL_DOMAIN}",
+        'password': 'user123', 'role': 'respondent'
+    })),
+    ('users.update_user', 'PUT', True, None, lambda rng, s, i: (
+        f"/api/v1/users/{rng.randint(2, s['users'])}", {'email': f"{s['run']}_upd{i}@{EMAIL_DOMAIN}"}
+    )),
+    ('restaurants.create_restaurant', 'POST', True, None, lambda rng, s, i: ('/api/v1/restaurants', {
+        'name': f"{s['run']} ресторан {i}", 'address': 'ул. Нагрузочная, 1', 'description': 'Создан нагрузочным тестом'
+    })),
+    ('restaurants.update_restaurant', 'PUT', True, None, lambda rng, s, i: (
+        f"/api/v1/restaurants/{rng.randint(1, s['restaurants'])}", {'description': f"Обновлен нагрузочным тестом {i}"}
+    )),
+    ('restaurants.delete_restaurant', 'DELETE', True, ('restaurants', 1), lambda rng, s, i: (
+        f"/api/v1/restaurants/{s['pool'][i]}", None
+    )),
+    ('restaurants.import_restaurants_bulk', 'POST', True, None, lambda rng, s, i: (
+        '/api/v1/restaurants/import?format=ndjson',
+        [{'external_id': f"{s['run']}_imp{i}_{k}", 'name': f'Импорт {i}.{k}'} for k in range(BULK_SIZE)]
+    )),
+    ('restaurants.create_report_job', 'POST', True, None, lambda rng, s, i: (
+        '/api/v1/restaurants/report/jobs', {'days': rng.choice([7, 30])}
+    )),
+    ('reviews.create_review', 'POST', True, ('restaurants', 1), lambda rng, s, i: ('/api/v1/reviews', {
+        'restaurant_id': s['pool'][i], 'food_rating': rng.randint(1, 5), 'drinks_rating': rng.randint(1, 5),
+        'overall_rating': rng.randint(1, 5), 'comment': rng.choice(('Вкусно', 'Неплохо', 'Шумно'))
+    })),
+    ('reviews.create_reviews_bulk', 'POST', True, ('restaurants', BULK_SIZE), lambda rng, s, i: ('/api/v1/reviews/bulk', [
+        {'restaurant_id': restaurant_id, 'food_rating': rng.randint(1, 5), 'drinks_rating': rng.randint(1, 5),
+         'overall_rating': rng.randint(1, 5)}
+        for restaurant_id in s['pool'][i * BULK_SIZE:(i + 1) * BULK_SIZE]
+    ])),
+    ('users.delete_user', 'DELETE', True, ('users', 1), lambda rng, s, i: (f"/api/v1/users/{s['pool'][i]}", None)),
+    ('admin.clear_cache', 'DELETE', True, None, lambda rng, s, i: ('/api/v1/admin/cache', None)),
+]
+
+class TestClientTransport:
+    """
+    Запросы через тестовый клиент Flask внутри процесса
+    """
+    
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+    
+    def _client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        return client
+    
+    def request(self, method, path, headers, body=None):
+        """
+        Выполняет запрос, возвращает статус и разобранный JSON ответа (None, если ответ не JSON)
+        """
+        if isinstance(body, list) and path.endswith('format=ndjson'):
+            response = self._client().open(path, method=method, headers=headers, data=_ndjson(body),
+                                           content_type='application/x-ndjson')
+        else:
+            response = self._client().open(path, method=method, headers=headers, json=body)
+        data = response.get_json(silent=True)
+        response.close()
+        return response.status_code, data
+    
+    def login(self, credentials):
+        return self.request('POST', '/api/v1/auth/login', {}, credentials)[1]['access_token']
+
+class HTTPTransport:
+    """
+    Запросы по HTTP к запущенному серверу
+    """
+    
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+    
+    def request(self, method, path, headers, body=None):
+        """
+        Выполняет запрос, возвращает статус и разобранный JSON ответа (None, если ответ не JSON)
+        """
+        headers = dict(headers)
+        data = None
+        if body is not None:
+            if isinstance(body, list) and path.endswith('format=ndjson'):
+                data = _ndjson(body)
+                headers['Content-Type'] = 'application/x-ndjson'
+            else:
+                data = json.dumps(body).encode('utf-8')
+                headers['Content-Type'] = 'application/json'
+        
+        request = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, _json_or_none(response)
+        except urllib.error.HTTPError as e:
+            return e.code, _json_or_none(e)
+    
+    def login(self, credentials):
+        return self.request('POST', '/api/v1/auth/login', {}, credentials)[1]['access_token']
+
+def _ndjson(records):
+    return ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records).encode('utf-8')
+
+def _json_or_none(response):
+    body = response.read()
+    if 'json' not in (response.headers.get('Content-Type') or ''):
+        return None
+    return json.loads(body)
+
+def prepare_local_app(args):
+    # База, готовые отчеты и снимки во временном каталоге, а не в instance/ репозитория
+    directory = tempfile.mkdtemp()
+    os.environ['DATABASE_URI'] = 'sqlite:///' + os.path.join(directory, 'load_test.db')
+    os.environ['REPORT_JOB_DIR'] = os.path.join(directory, 'reports')
+    os.environ['REPORT_SNAPSHOT_DIR'] = os.path.join(directory, 'report_snapshots')
+    if not args.response_cache:
+        os.environ['RESPONSE_CACHE_ENABLED'] = 'false'
+    
+    from app import create_app, db
+    from app.models import User, UserRole
+    from app.utils.init_db import seed_synthetic_data
+    
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(role=UserRole.ADMIN.value, email='admin@example.com', **ADMIN_CREDENTIALS))
+        db.session.commit()
+        
+        started = time.perf_counter()
+        seed_synthetic_data(args.users, args.restaurants, args.reviews, seed=args.seed)
+        print(f"Данные созданы за {time.perf_counter() - started:.1f} с: "
+              f"{args.users} пользователей, {args.restaurants} ресторанов, {args.reviews} отзывов")
+    
+    return app
+
+def create_pool(transport, headers, run, kind, count):
+    """
+    Свежие записи для маршрутов, которые нельзя повторять на одних и тех же данных:
+    рестораны без отзывов (создание отзывов, удаление) и пользователи (удаление)
+    """
+    pool = []
+    for index in range(count):
+        if kind == 'restaurants':
+            path = '/api/v1/restaurants'
+            body = {'name': f'{run} пул {index}', 'address': 'ул. Нагрузочная, 2', 'description': 'Пул нагрузочного теста'}
+        else:
+            path = '/api/v1/users'
+            body = {'username': f'{run}_pool{index}', 'email': f'{run}_pool{index}@{EMAIL_DOMAIN}',
+                    'password': 'user123', 'role': 'respondent'}
+        status, data = transport.request('POST', path, headers, body)
+        if status != 201:
+            raise RuntimeError(f'Не удалось создать запись пула {kind}: {status} {data}')
+        pool.append(data['id'])
+    return pool
+
+def prepare_report_job(transport, headers, timeout=60):
+    """
+    Готовое задание отчета для маршрутов статуса и скачивания
+    """
+    status, data = transport.request('POST', '/api/v1/restaurants/report/jobs', headers, {'days': 30})
+    if status != 202:
+        raise RuntimeError(f'Не удалось поставить задание отчета: {status} {data}')
+    
+    deadline = time.monotonic() + timeout
+    while 'download_url' not in data:
+        if data.get('status') == 'failed' or time.monotonic() > deadline:
+            raise RuntimeError(f'Задание отчета не выполнено: {data}')
+        time.sleep(0.1)
+        _, data = transport.request('GET', data['status_url'], headers)
+    return data['id']
+
+def percentile(quantiles, value):
+    return quantiles[value - 1] * 1000
+
+def measure(transport, requests, args):
+    """
+    Выполняет запросы (метод, путь, заголовки, тело) с заданной конкурентностью
+    Первые запросы выполняются как прогрев и в статистику не попадают
+    """
+    def call(item):
+        started = time.perf_counter()
+        status, _ = transport.request(*item)
+        return time.perf_counter() - started, status
+    
+    warmup = min(5, len(requests) - 1)
+    for item in requests[:warmup]:
+        transport.request(*item)
+    requests = requests[warmup:]
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(call, requests))
+    elapsed = time.perf_counter() - started
+    
+    latencies = [latency for latency, _ in results]
+    errors = sum(1 for _, status in results if status >= 400)
+    quantiles = statistics.quantiles(latencies, n=100, method='inclusive')
+    
+    return {
+        'p50': percentile(quantiles, 50),
+        'p95': percentile(quantiles, 95),
+        'p99': percentile(quantiles, 99),
+        'rps': len(results) / elapsed,
+        'errors': errors
+    }
+
+def scale_of(args):
+    return {'users': args.users + 1, 'restaurants': args.restaurants, 'reviews': args.reviews}
+
+def run_read_route(transport, name, build_path, headers, scale, args):
+    # Свой генератор для каждого маршрута: одинаковая последовательность запросов при повторных прогонах
+    rng = random.Random(f'{args.seed}:{name}')
+    return measure(transport, [('GET', build_path(rng, scale), headers) for _ in range(args.requests)], args)
+
+def run_write_route(transport, name, method, pool, build, headers, args):
+    rng = random.Random(f'{args.seed}:{name}')
+    state = dict(scale_of(args), run=f'lt{args.seed}_{int(time.time() * 1000)}', pool=[])
+    if pool is not None:
+        kind, per_request = pool
+        state['pool'] = create_pool(transport, headers, state['run'], kind, per_request * args.requests)
+    
+    requests = []
+    for index in range(args.requests):
+        path, body = build(rng, state, index)
+        requests.append((method, path, headers, body))
+    return measure(transport, requests, args)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--restaurants', type=int, default=200)
+    parser.add_argument('--reviews', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=200, help='запросов на маршрут')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--route', action='append', help='имя маршрута (можно указать несколько раз)')
+    parser.add_argument('--base-url', help='адрес запущенного сервера вместо тестового клиента')
+    parser.add_argument('--response-cache', action='store_true', help='не отключать кэш ответов')
+    parser.add_argument('--read-only', action='store_true', help='не измерять маршруты на запись')
+    args = parser.parse_args()
+    
+    if args.base_url:
+        transport = HTTPTransport(args.base_url)
+    else:
+        transport = TestClientTransport(prepare_local_app(args))
+    
+    admin_headers = {'Authorization': f'Bearer {transport.login(ADMIN_CREDENTIALS)}'}
+    
+    print(f"{'Маршрут':<40}{'p50, мс':>10}{'p95, мс':>10}{'p99, мс':>10}{'запр/с':>10}{'ошибки':>8}")
+    
+    def report(name, stats):
+        print(f"{name:<40}{stats['p50']:>10.2f}{stats['p95']:>10.2f}{stats['p99']:>10.2f}"
+              f"{stats['rps']:>10.1f}{stats['errors']:>8}")
+    
+    scale = scale_of(args)
+    scale['report_job'] = prepare_report_job(transport, admin_headers)
+    
+    for name, needs_admin, build_path in READ_ROUTES:
+        if args.route and name not in args.route:
+            continue
+        report(name, run_read_route(transport, name, build_path, admin_headers if needs_admin else {}, scale, args))
+    
+    if args.read_only:
+        return
+    for name, method, needs_admin, pool, build in WRITE_ROUTES:
+        if args.route and name not in args.route:
+            continue
+        headers = admin_headers if needs_admin else {}
+        report(name, run_write_route(transport, name, method, pool, build, headers, args))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Бенчмарк входа в систему при разных параметрах хэширования паролей
+
+Запуск: python benchmarks/password_hashing.py [--logins N] [--concurrency C]
+Для каждого метода выводится количество успешных входов в секунду.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+METHODS = [
+    'scrypt:32768:8:1',
+    'scrypt:16384:8:1',
+    'pbkdf2:sha256:600000',
+    'pbkdf2:sha256:260000',
+]
+
+def run(method, logins, concurrency, workers):
+    os.environ['PASSWORD_HASH_METHOD'] = method
+    os.environ['PASSWORD_HASH_WORKERS'] = str(workers)
+    os.environ['DATABASE_URI'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    
+    from app import create_app, db
+    from app.models import User
+    
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add(User('bench', 'bench@example.com', 'bench-password'))
+        db.session.commit()
+    
+    def login(_):
+        with app.test_client() as client:
+            response = client.post('/api/v1/auth/login', json={'username': 'bench', 'password': 'bench-password'})
+            return response.status_code == 200
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        succeeded = sum(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+    
+    app.extensions['password_hasher'].shutdown()
+    return succeeded / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=4, help='PASSWORD_HASH_WORKERS')
+    parser.add_argument('--method', action='append', help='метод хэширования (можно указать несколько раз)')
+    args = parser.parse_args()
+    
+    print(f"{'Метод':<28}{'входов/с':>12}")
+    for method in args.method or METHODS:
+        rate = run(method, args.logins, args.concurrency, args.workers)
+        print(f"{method:<28}{rate:>12.1f}")
+
+if __name__ == '__main__':
+    main()
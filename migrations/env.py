@@ -31,6 +31,23 @@ app = create_app()
 config.set_main_option('sqlalchemy.url', app.config['SQLALCHEMY_DATABASE_URI'])
 target_metadata = db.metadata
 
+# Полнотекстовые индексы создаются миграцией add_full_text_search напрямую SQL и не описаны в моделях:
+# таблицы FTS5 SQLite с теневыми таблицами (restaurants_fts_data, ..._idx, ..._docsize, ..._config),
+# а в PostgreSQL колонки search_vector и их GIN индексы. Без фильтра автогенерация удалила бы их
+SEARCH_TABLES = ('restaurants_fts', 'reviews_fts')
+SEARCH_COLUMN = 'search_vector'
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Исключение объектов полнотекстового поиска из автогенерации миграций."""
+    if type_ == 'table' and any(name == table or name.startswith(f'{table}_') for table in SEARCH_TABLES):
+        return False
+    if type_ == 'column' and name == SEARCH_COLUMN:
+        return False
+    if type_ == 'index' and name and name.endswith(f'_{SEARCH_COLUMN}'):
+        return False
+    return True
+
 
 def run_migrations_offline():
     """Запуск миграций в 'offline' режиме без подключения к БД."""
@@ -38,6 +55,7 @@ def run_migrations_offline():
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -56,7 +74,8 @@ def run_migrations_online():
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
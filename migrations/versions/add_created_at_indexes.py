@@ -0,0 +1,28 @@
+"""add created_at indexes for keyset pagination
+
+Revision ID: 2b3c4d5e6f70
+Revises: 1a2b3c4d5e6f
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b3c4d5e6f70'
+down_revision = '1a2b3c4d5e6f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_restaurants_created_at_id', 'restaurants', ['created_at', 'id'], unique=False)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_reviews_created_at_id', 'reviews', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_reviews_created_at_id', table_name='reviews')
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_index('ix_restaurants_created_at_id', table_name='restaurants')
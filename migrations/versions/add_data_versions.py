@@ -0,0 +1,30 @@
+"""add data versions
+
+Revision ID: b4c5d6e7f809
+Revises: a3b4c5d6e7f8
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4c5d6e7f809'
+down_revision = 'a3b4c5d6e7f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('data_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("INSERT INTO data_versions (name, version, updated_at) VALUES ('global', 1, CURRENT_TIMESTAMP)")
+
+
+def downgrade():
+    op.drop_table('data_versions')
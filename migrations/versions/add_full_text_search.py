@@ -0,0 +1,85 @@
+"""add full text search
+
+Revision ID: 8192a3b4c5d6
+Revises: 708192a3b4c5
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8192a3b4c5d6'
+down_revision = '708192a3b4c5'
+branch_labels = None
+depends_on = None
+
+# Поля, попадающие в полнотекстовые индексы SQLite
+FTS_TABLES = {
+    'restaurants': ('name', 'description'),
+    'reviews': ('comment',),
+}
+
+
+def _normalize(value):
+    # "ё" не раскладывается токенизатором unicode61, приводим к "е"
+    return f"replace(replace({value}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def _sqlite_upgrade():
+    for source, fields in FTS_TABLES.items():
+        fts = f'{source}_fts'
+        columns = ', '.join(fields)
+        new_values = ', '.join(_normalize(f'new.{field}') for field in fields)
+        old_values = ', '.join(_normalize(f'old.{field}') for field in fields)
+        insert_new = f'INSERT INTO {fts} (rowid, {columns}) VALUES (new.id, {new_values});'
+        delete_old = f"INSERT INTO {fts} ({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+
+        op.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({columns}, content='{source}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(f'CREATE TRIGGER {fts}_ai AFTER INSERT ON {source} BEGIN {insert_new} END')
+        op.execute(f'CREATE TRIGGER {fts}_ad AFTER DELETE ON {source} BEGIN {delete_old} END')
+        op.execute(f'CREATE TRIGGER {fts}_au AFTER UPDATE OF {columns} ON {source} BEGIN {delete_old} {insert_new} END')
+
+        # Индексация уже существующих данных
+        op.execute(
+            f"INSERT INTO {fts} (rowid, {columns}) "
+            f"SELECT id, {', '.join(_normalize(field) for field in fields)} FROM {source}"
+        )
+
+
+def _postgresql_upgrade():
+    op.execute(
+        "ALTER TABLE restaurants ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('russian', coalesce(description, '')), 'B')) STORED"
+    )
+    op.execute('CREATE INDEX ix_restaurants_search_vector ON restaurants USING GIN (search_vector)')
+    op.execute(
+        "ALTER TABLE reviews ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "to_tsvector('russian', coalesce(comment, ''))) STORED"
+    )
+    op.execute('CREATE INDEX ix_reviews_search_vector ON reviews USING GIN (search_vector)')
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        _sqlite_upgrade()
+    elif dialect == 'postgresql':
+        _postgresql_upgrade()
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for source in FTS_TABLES:
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f'DROP TRIGGER IF EXISTS {source}_fts_{suffix}')
+            op.execute(f'DROP TABLE IF EXISTS {source}_fts')
+    elif dialect == 'postgresql':
+        for source in FTS_TABLES:
+            op.execute(f'DROP INDEX IF EXISTS ix_{source}_search_vector')
+            op.execute(f'ALTER TABLE {source} DROP COLUMN IF EXISTS search_vector')
@@ -0,0 +1,50 @@
+"""add rating stats averages
+
+Revision ID: 708192a3b4c5
+Revises: 6f708192a3b4
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '708192a3b4c5'
+down_revision = '6f708192a3b4'
+branch_labels = None
+depends_on = None
+
+RATINGS = ('food', 'drinks', 'overall')
+
+
+def upgrade():
+    with op.batch_alter_table('restaurant_rating_stats') as batch_op:
+        for rating in RATINGS:
+            batch_op.add_column(sa.Column(f'avg_{rating}_rating', sa.Float(), nullable=True))
+
+    # Заполнение средних оценок по уже накопленным суммам
+    op.execute(
+        'UPDATE restaurant_rating_stats SET '
+        + ', '.join(
+            f'avg_{rating}_rating = CASE WHEN reviews_count > 0 '
+            f'THEN CAST({rating}_rating_sum AS FLOAT) / reviews_count ELSE NULL END'
+            for rating in RATINGS
+        )
+    )
+
+    for rating in RATINGS:
+        op.create_index(
+            f'ix_restaurant_rating_stats_{rating}',
+            'restaurant_rating_stats',
+            [f'avg_{rating}_rating', 'reviews_count'],
+            unique=False
+        )
+
+
+def downgrade():
+    for rating in RATINGS:
+        op.drop_index(f'ix_restaurant_rating_stats_{rating}', table_name='restaurant_rating_stats')
+    with op.batch_alter_table('restaurant_rating_stats') as batch_op:
+        for rating in RATINGS:
+            batch_op.drop_column(f'avg_{rating}_rating')
@@ -0,0 +1,50 @@
+"""add restaurant daily rating stats
+
+Revision ID: c5d6e7f8091a
+Revises: b4c5d6e7f809
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d6e7f8091a'
+down_revision = 'b4c5d6e7f809'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('restaurant_daily_rating_stats',
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('reviews_count', sa.Integer(), nullable=False),
+    sa.Column('food_rating_sum', sa.Integer(), nullable=False),
+    sa.Column('drinks_rating_sum', sa.Integer(), nullable=False),
+    sa.Column('overall_rating_sum', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('restaurant_id', 'day')
+    )
+    op.create_index('ix_restaurant_daily_rating_stats_day', 'restaurant_daily_rating_stats', ['day', 'restaurant_id'], unique=False)
+    
+    # Заполнение суточных агрегатов по уже существующим отзывам
+    op.execute("""
+        INSERT INTO restaurant_daily_rating_stats
+            (restaurant_id, day, reviews_count, food_rating_sum, drinks_rating_sum, overall_rating_sum)
+        SELECT
+            restaurant_id,
+            DATE(created_at),
+            COUNT(id),
+            SUM(food_rating),
+            SUM(drinks_rating),
+            SUM(overall_rating)
+        FROM reviews
+        GROUP BY restaurant_id, DATE(created_at)
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_restaurant_daily_rating_stats_day', table_name='restaurant_daily_rating_stats')
+    op.drop_table('restaurant_daily_rating_stats')
@@ -0,0 +1,27 @@
+"""add restaurant external id
+
+Revision ID: 6f708192a3b4
+Revises: 5e6f708192a3
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6f708192a3b4'
+down_revision = '5e6f708192a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('restaurants', sa.Column('external_id', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_restaurants_external_id'), 'restaurants', ['external_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_restaurants_external_id'), table_name='restaurants')
+    with op.batch_alter_table('restaurants') as batch_op:
+        batch_op.drop_column('external_id')
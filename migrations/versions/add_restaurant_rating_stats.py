@@ -0,0 +1,49 @@
+"""add restaurant rating stats
+
+Revision ID: 3c4d5e6f7081
+Revises: 2b3c4d5e6f70
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c4d5e6f7081'
+down_revision = '2b3c4d5e6f70'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('restaurant_rating_stats',
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('reviews_count', sa.Integer(), nullable=False),
+    sa.Column('food_rating_sum', sa.Integer(), nullable=False),
+    sa.Column('drinks_rating_sum', sa.Integer(), nullable=False),
+    sa.Column('overall_rating_sum', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('restaurant_id')
+    )
+    
+    # Заполнение агрегатов по уже существующим отзывам
+    op.execute("""
+        INSERT INTO restaurant_rating_stats
+            (restaurant_id, reviews_count, food_rating_sum, drinks_rating_sum, overall_rating_sum, updated_at)
+        SELECT
+            restaurants.id,
+            COUNT(reviews.id),
+            COALESCE(SUM(reviews.food_rating), 0),
+            COALESCE(SUM(reviews.drinks_rating), 0),
+            COALESCE(SUM(reviews.overall_rating), 0),
+            CURRENT_TIMESTAMP
+        FROM restaurants
+        LEFT OUTER JOIN reviews ON reviews.restaurant_id = restaurants.id
+        GROUP BY restaurants.id
+    """)
+
+
+def downgrade():
+    op.drop_table('restaurant_rating_stats')
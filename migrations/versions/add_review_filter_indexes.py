@@ -0,0 +1,25 @@
+"""add review filter indexes
+
+Revision ID: 92a3b4c5d6e7
+Revises: 8192a3b4c5d6
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '92a3b4c5d6e7'
+down_revision = '8192a3b4c5d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_reviews_restaurant_id_created_at', 'reviews', ['restaurant_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_reviews_user_id_created_at', 'reviews', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_reviews_user_id_created_at', table_name='reviews')
+    op.drop_index('ix_reviews_restaurant_id_created_at', table_name='reviews')
@@ -0,0 +1,50 @@
+import pytest
+from app import create_app, db
+from app.models import User, UserRole
+
+@pytest.fixture
+def app_env():
+    """
+    Дополнительные переменные окружения приложения, переопределяется в модулях тестов
+    """
+    return {}
+
+@pytest.fixture
+def app(tmp_path, monkeypatch, app_env):
+    """
+    Приложение на временной SQLite базе, каталоги отчетов тоже временные
+    """
+    monkeypatch.setenv('DATABASE_URI', f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setenv('REPORT_JOB_DIR', str(tmp_path / 'reports'))
+    monkeypatch.setenv('REPORT_SNAPSHOT_DIR', str(tmp_path / 'report_snapshots'))
+    monkeypatch.setenv('RESPONSE_CACHE_ENABLED', 'false')
+    for name, value in app_env.items():
+        monkeypatch.setenv(name, value)
+    
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        # Только основная БД: db.metadatas общий для всех приложений тестов
+        # и хранит ключи реплик, заданных в других тестах
+        db.create_all(bind_key=None)
+    
+    yield app
+    
+    app.extensions['report_jobs'].shutdown(wait=True)
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def admin_headers(app, client):
+    with app.app_context():
+        db.session.add(User('admin', 'admin@example.com', 'admin123', UserRole.ADMIN.value))
+        db.session.commit()
+    
+    response = client.post('/api/v1/auth/login', json={'username': 'admin', 'password': 'admin123'})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
@@ -0,0 +1,61 @@
+import asyncio
+from flask import Flask, jsonify, request
+from app.utils.asgi import WSGIToASGI
+
+def make_app():
+    app = Flask(__name__)
+    
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        return jsonify({'body': request.get_data(as_text=True), 'json': request.get_json(silent=True)})
+    
+    return app
+
+def call(asgi_app, chunks, headers):
+    """
+    Выполняет POST /echo через ASGI приложение, тело передается частями chunks
+    """
+    messages = [
+        {'type': 'http.request', 'body': chunk, 'more_body': index < len(chunks) - 1}
+        for index, chunk in enumerate(chunks)
+    ]
+    sent = []
+    
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+    
+    async def send(message):
+        sent.append(message)
+    
+    scope = {
+        'type': 'http',
+        'method': 'POST',
+        'path': '/echo',
+        'query_string': b'',
+        'headers': headers,
+        'http_version': '1.1',
+    }
+    asyncio.run(asgi_app(scope, receive, send))
+    
+    status = next(message['status'] for message in sent if message['type'] == 'http.response.start')
+    body = b''.join(message.get('body', b'') for message in sent if message['type'] == 'http.response.body')
+    return status, body
+
+def test_chunked_body_reaches_handler():
+    asgi_app = WSGIToASGI(make_app(), workers=1)
+    status, body = call(
+        asgi_app,
+        [b'{"username": ', b'"admin"}'],
+        [(b'content-type', b'application/json'), (b'transfer-encoding', b'chunked')]
+    )
+    
+    assert status == 200
+    assert b'"username":"admin"' in body.replace(b' ', b'')
+
+def test_body_over_max_content_length_rejected():
+    app = make_app()
+    app.config['MAX_CONTENT_LENGTH'] = 10
+    asgi_app = WSGIToASGI(app, workers=1)
+    status, _ = call(asgi_app, [b'12345', b'67890', b'1'], [(b'transfer-encoding', b'chunked')])
+    
+    assert status == 413
@@ -0,0 +1,55 @@
+from app import db
+from app.models import User, UserRole
+
+def add_user(app, username, role=UserRole.RESPONDENT.value):
+    with app.app_context():
+        user = User(username, f'{username}@example.com', 'secret123', role)
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+def login(client, username):
+    response = client.post('/api/v1/auth/login', json={'username': username, 'password': 'secret123'})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+def test_demoted_admin_token_rejected(app, client, admin_headers):
+    user_id = add_user(app, 'manager', UserRole.ADMIN.value)
+    headers = login(client, 'manager')
+    assert client.get('/api/v1/users', headers=headers).status_code == 200
+    
+    response = client.put(f'/api/v1/users/{user_id}', json={'role': UserRole.RESPONDENT.value}, headers=admin_headers)
+    assert response.status_code == 200
+    
+    assert client.get('/api/v1/users', headers=headers).status_code == 401
+
+def test_change_in_other_process_applies_after_cache_expiry(app, client):
+    user_id = add_user(app, 'manager', UserRole.ADMIN.value)
+    headers = login(client, 'manager')
+    assert client.get('/api/v1/users', headers=headers).status_code == 200
+    
+    # Роль изменена в другом процессе: локальный кэш не сброшен
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        user.role = UserRole.RESPONDENT.value
+        user.token_version += 1
+        db.session.commit()
+    assert client.get('/api/v1/users', headers=headers).status_code == 200
+    
+    # Истечение USER_CACHE_TTL
+    app.extensions['user_cache'].clear()
+    assert client.get('/api/v1/users', headers=headers).status_code == 401
+
+def test_token_rejected_when_user_id_reused_with_other_role(app, client, admin_headers):
+    user_id = add_user(app, 'manager', UserRole.ADMIN.value)
+    headers = login(client, 'manager')
+    
+    with app.app_context():
+        db.session.delete(db.session.get(User, user_id))
+        db.session.commit()
+        user = User('newcomer', 'newcomer@example.com', 'secret123')
+        user.id = user_id
+        db.session.add(user)
+        db.session.commit()
+    app.extensions['user_cache'].clear()
+    
+    assert client.get('/api/v1/users', headers=headers).status_code == 401
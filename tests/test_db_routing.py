@@ -0,0 +1,77 @@
+import pytest
+from flask import g
+from app import db
+from app.models import Restaurant, Review, User, UserRole
+
+@pytest.fixture
+def app_env(tmp_path):
+    return {'DATABASE_REPLICA_URIS': f"sqlite:///{tmp_path / 'replica.db'}"}
+
+@pytest.fixture
+def databases(app):
+    """
+    Одинаковые пользователи в основной БД и реплике, рестораны и отзывы различаются
+    названием и комментарием, чтобы по ответу было видно, откуда прочитаны данные
+    """
+    with app.app_context():
+        primary = db.engine
+        replica = db.engines['replica_1']
+        db.metadata.create_all(replica)
+        
+        for engine, source in ((primary, 'primary'), (replica, 'replica')):
+            with db.Session(bind=engine) as session:
+                admin = User('admin', 'admin@example.com', 'admin123', UserRole.ADMIN.value)
+                restaurant = Restaurant(f'Ресторан {source}', 'ул. Тестовая, 1', source)
+                session.add_all([admin, restaurant])
+                session.flush()
+                session.add(Review(restaurant.id, admin.id, 5, 4, 5, source))
+                session.commit()
+    
+    return primary, replica
+
+@pytest.fixture
+def headers(client, databases):
+    response = client.post('/api/v1/auth/login', json={'username': 'admin', 'password': 'admin123'})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+def test_get_restaurants_reads_replica(client, headers):
+    items = client.get('/api/v1/restaurants', headers=headers).get_json()['items']
+    assert [item['name'] for item in items] == ['Ресторан replica']
+
+def test_get_restaurant_reads_replica(client, headers):
+    assert client.get('/api/v1/restaurants/1', headers=headers).get_json()['name'] == 'Ресторан replica'
+
+def test_get_reviews_reads_replica(client, headers):
+    items = client.get('/api/v1/reviews', headers=headers).get_json()['items']
+    assert [item['comment'] for item in items] == ['replica']
+
+def test_get_user_reads_replica(app, client, headers):
+    with app.app_context():
+        with db.Session(bind=db.engines['replica_1']) as session:
+            session.get(User, 1).email = 'replica@example.com'
+            session.commit()
+    
+    assert client.get('/api/v1/users/1', headers=headers).get_json()['email'] == 'replica@example.com'
+
+def test_report_reads_replica(client, headers):
+    response = client.get('/api/v1/restaurants/report?format=csv', headers=headers)
+    assert response.status_code == 200
+    assert 'Ресторан replica' in response.get_data(as_text=True)
+    assert 'Ресторан primary' not in response.get_data(as_text=True)
+
+def test_write_handlers_use_primary(app, client, headers):
+    response = client.put('/api/v1/restaurants/1', json={'description': 'updated'}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['name'] == 'Ресторан primary'
+
+def test_read_after_write_in_same_request_uses_primary(app, databases):
+    with app.test_request_context():
+        g._db_read_only = True
+        assert db.session.scalar(db.select(Restaurant.name)) == 'Ресторан replica'
+        
+        db.session.add(Restaurant('Новый', 'ул. Тестовая, 2'))
+        db.session.flush()
+        
+        names = set(db.session.scalars(db.select(Restaurant.name)))
+        assert names == {'Ресторан primary', 'Новый'}
+        db.session.rollback()
@@ -0,0 +1,13 @@
+def test_metrics_require_admin_without_token(client, admin_headers):
+    assert client.get('/metrics').status_code == 401
+    
+    response = client.get('/metrics', headers=admin_headers)
+    assert response.status_code == 200
+    assert b'# TYPE' in response.data
+
+def test_metrics_token(app, client):
+    app.config['METRICS_TOKEN'] = 'scrape-secret'
+    
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'}).status_code == 200
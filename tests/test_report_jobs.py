@@ -0,0 +1,64 @@
+import os
+from datetime import datetime, timedelta
+from app import db
+from app.models import ReportJob, ReportJobStatus
+
+def add_job(app, job_id, status, finished_ago):
+    path = os.path.join(app.extensions['report_jobs'].directory, f'{job_id}.csv')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as output:
+        output.write('id,name\n')
+    
+    db.session.add(ReportJob(
+        id=job_id,
+        kind='restaurants',
+        status=status,
+        file_path=path,
+        created_at=datetime.utcnow() - finished_ago,
+        finished_at=datetime.utcnow() - finished_ago if status != ReportJobStatus.RUNNING else None
+    ))
+    db.session.commit()
+    return path
+
+def test_prune_removes_expired_jobs_and_files(app):
+    queue = app.extensions['report_jobs']
+    queue.retention = 3600
+    
+    with app.app_context():
+        old_done = add_job(app, 'old_done', ReportJobStatus.DONE, timedelta(hours=2))
+        old_failed = add_job(app, 'old_failed', ReportJobStatus.FAILED, timedelta(hours=2))
+        fresh = add_job(app, 'fresh', ReportJobStatus.DONE, timedelta(minutes=5))
+        running = add_job(app, 'running', ReportJobStatus.RUNNING, timedelta(hours=2))
+        
+        assert queue.prune() == 2
+        
+        assert {job.id for job in ReportJob.query.all()} == {'fresh', 'running'}
+        assert not os.path.exists(old_done)
+        assert not os.path.exists(old_failed)
+        assert os.path.exists(fresh)
+        assert os.path.exists(running)
+
+def test_prune_disabled_with_zero_retention(app):
+    queue = app.extensions['report_jobs']
+    queue.retention = 0
+    
+    with app.app_context():
+        path = add_job(app, 'old_done', ReportJobStatus.DONE, timedelta(days=30))
+        
+        assert queue.prune() == 0
+        assert os.path.exists(path)
+
+def test_finished_job_prunes_expired(app, client, admin_headers):
+    queue = app.extensions['report_jobs']
+    
+    with app.app_context():
+        path = add_job(app, 'old_done', ReportJobStatus.DONE, timedelta(seconds=queue.retention + 60))
+    
+    response = client.post('/api/v1/restaurants/report/jobs', json={'days': 7}, headers=admin_headers)
+    assert response.status_code == 202
+    queue.shutdown(wait=True)
+    
+    with app.app_context():
+        assert db.session.get(ReportJob, response.get_json()['id']).status == ReportJobStatus.DONE
+        assert db.session.get(ReportJob, 'old_done') is None
+    assert not os.path.exists(path)
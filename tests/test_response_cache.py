@@ -0,0 +1,42 @@
+import time
+from app.utils.response_cache import ResponseCache, SQLiteCacheBackend
+
+def make_workers(tmp_path, count=2, **kwargs):
+    """
+    Кэши нескольких процессов с общим SQLite файлом
+    """
+    path = str(tmp_path / 'response_cache.db')
+    return [ResponseCache(default_ttl=60, shared=SQLiteCacheBackend(path), **kwargs) for _ in range(count)]
+
+def local_ttl(cache, key):
+    _, expires_at = cache.local._data[key]
+    return expires_at - time.monotonic()
+
+def test_shared_hit_keeps_route_ttl(tmp_path):
+    first, second = make_workers(tmp_path)
+    key = first.make_key('restaurants', '/api/v1/restaurants', '')
+    first.set(key, b'body', ttl=5)
+    
+    assert second.get(key) == b'body'
+    assert 0 < local_ttl(second, key) <= 5
+
+def test_invalidation_reaches_other_workers_through_shared_backend(tmp_path):
+    first, second = make_workers(tmp_path)
+    key = second.make_key('restaurants', '/api/v1/restaurants', 'limit=10')
+    second.set(key, b'body', ttl=60)
+    
+    first.invalidate('restaurants')
+    
+    new_key = second.make_key('restaurants', '/api/v1/restaurants', 'limit=10')
+    assert new_key != key
+    assert second.get(new_key) is None
+
+def test_invalidation_without_shared_backend_is_local():
+    first, second = ResponseCache(default_ttl=60), ResponseCache(default_ttl=60)
+    key = second.make_key('restaurants', '/api/v1/restaurants', '')
+    second.set(key, b'body', ttl=60)
+    
+    first.invalidate('restaurants')
+    
+    assert second.make_key('restaurants', '/api/v1/restaurants', '') == key
+    assert second.get(key) == b'body'
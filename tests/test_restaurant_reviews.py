@@ -0,0 +1,37 @@
+from sqlalchemy import event
+from app import db
+from app.models import Restaurant, Review, User
+
+def test_feed_loads_authors_in_one_query(app, client, admin_headers):
+    with app.app_context():
+        restaurant = Restaurant('Бистро', 'ул. Тестовая, 1', 'Описание')
+        users = [User(f'author{index}', f'author{index}@example.com', 'secret123') for index in range(5)]
+        db.session.add_all([restaurant, *users])
+        db.session.commit()
+        db.session.add_all([Review(restaurant.id, user.id, 5, 4, 3, f'Отзыв {user.username}') for user in users])
+        db.session.commit()
+        restaurant_id = restaurant.id
+        engine = db.engine
+    
+    statements = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM reviews' in statement:
+            statements.append(statement)
+    
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = client.get(f'/api/v1/restaurants/{restaurant_id}/reviews?include_ratings=true', headers=admin_headers)
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    
+    assert response.status_code == 200
+    data = response.get_json()
+    assert sorted(item['username'] for item in data['items']) == [f'author{index}' for index in range(5)]
+    assert all(item['comment'] == f"Отзыв {item['username']}" for item in data['items'])
+    assert 'ratings' in data
+    # Авторы загружаются вместе с отзывами, без отдельного запроса на каждого
+    assert len(statements) == 1
+    assert 'JOIN users' in statements[0]
+
+def test_feed_requires_admin(client):
+    assert client.get('/api/v1/restaurants/1/reviews').status_code == 401
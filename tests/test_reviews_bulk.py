@@ -0,0 +1,48 @@
+from app import db
+from app.models import Restaurant, Review, User
+
+def add_restaurants(app, count):
+    with app.app_context():
+        restaurants = [Restaurant(f'Ресторан {index}', 'ул. Тестовая, 1') for index in range(count)]
+        db.session.add_all(restaurants)
+        db.session.commit()
+        return [restaurant.id for restaurant in restaurants]
+
+def test_bulk_reviews_created_as_current_user(app, client, admin_headers):
+    first, second = add_restaurants(app, 2)
+    with app.app_context():
+        other = User('other', 'other@example.com', 'secret123')
+        db.session.add(other)
+        db.session.commit()
+        other_id = other.id
+    
+    response = client.post('/api/v1/reviews/bulk', headers=admin_headers, json=[
+        {'restaurant_id': first, 'user_id': other_id, 'food_rating': 5, 'drinks_rating': 4, 'overall_rating': 5},
+        {'restaurant_id': second, 'food_rating': 3, 'drinks_rating': 3, 'overall_rating': 1},
+    ])
+    
+    assert response.status_code == 200
+    assert response.get_json()['created'] == 2
+    with app.app_context():
+        admin_id = User.query.filter_by(username='admin').one().id
+        assert {review.user_id for review in Review.query.all()} == {admin_id}
+
+def test_bulk_reports_item_errors_and_updates_ratings(app, client, admin_headers):
+    first, second = add_restaurants(app, 2)
+    
+    response = client.post('/api/v1/reviews/bulk', headers=admin_headers, json=[
+        {'restaurant_id': first, 'food_rating': 4, 'drinks_rating': 2, 'overall_rating': 4},
+        {'restaurant_id': first, 'food_rating': 1, 'drinks_rating': 1, 'overall_rating': 1},
+        {'restaurant_id': 'first', 'food_rating': 1, 'drinks_rating': 1, 'overall_rating': 1},
+        {'restaurant_id': 9999, 'food_rating': 1, 'drinks_rating': 1, 'overall_rating': 1},
+        {'restaurant_id': second, 'food_rating': 6, 'drinks_rating': 1, 'overall_rating': 1},
+    ])
+    
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['created'] == 1
+    assert [result['status'] for result in data['results']] == ['created', 'error', 'error', 'error', 'error']
+    
+    ratings = client.get(f'/api/v1/restaurants/{first}').get_json()['ratings']
+    assert ratings['reviews_count'] == 1
+    assert ratings['avg_food_rating'] == 4
@@ -0,0 +1,38 @@
+from app import db
+from app.models import Restaurant
+
+def add_restaurants(app, *restaurants):
+    with app.app_context():
+        objects = [Restaurant(name, 'ул. Тестовая, 1', description) for name, description in restaurants]
+        db.session.add_all(objects)
+        db.session.commit()
+        return [restaurant.id for restaurant in objects]
+
+def search(client, query):
+    response = client.get('/api/v1/restaurants/search', query_string={'q': query})
+    assert response.status_code == 200
+    return [item['name'] for item in response.get_json()['items']]
+
+def test_name_match_ranked_above_description(app, client):
+    add_restaurants(app, ('Уютное место', 'Лучшая пицца в городе'), ('Пицца у дома', 'Семейное кафе'))
+    
+    assert search(client, 'пицца') == ['Пицца у дома', 'Уютное место']
+
+def test_yo_matches_ye(app, client):
+    add_restaurants(app, ('Ёлка', 'Зелёный чай'))
+    
+    assert search(client, 'елка') == ['Ёлка']
+    assert search(client, 'зеленый') == ['Ёлка']
+
+def test_index_follows_updates_and_deletes(app, client, admin_headers):
+    restaurant_id, = add_restaurants(app, ('Таверна', 'Греческая кухня'))
+    
+    client.put(f'/api/v1/restaurants/{restaurant_id}', json={'name': 'Бистро'}, headers=admin_headers)
+    assert search(client, 'таверна') == []
+    assert search(client, 'бистро') == ['Бистро']
+    
+    client.delete(f'/api/v1/restaurants/{restaurant_id}', headers=admin_headers)
+    assert search(client, 'бистро') == []
+
+def test_empty_query_rejected(client):
+    assert client.get('/api/v1/restaurants/search?q=').status_code == 400